@@ -3,5 +3,11 @@ from django.contrib import admin
 from .models import Article
 from .models import Category
 
+
+@admin.register(Article)
+class ArticleAdmin(admin.ModelAdmin):
+    # Article.__str__ includes the category name
+    list_select_related = ('category',)
+
+
 admin.site.register(Category)
-admin.site.register(Article)
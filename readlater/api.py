@@ -0,0 +1,181 @@
+"""
+JSON API over the request user's articles and categories.
+
+Rows are read with values() so no model instances are created, and only the
+fields asked for with '?fields=id,name,progress' are fetched.  Pages are
+selected with opaque 'cursor' parameters using the same keyset pagination as
+the article list, and responses carry the same ETag as the article list and
+a Last-Modified so clients can make conditional requests.
+"""
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import FieldDoesNotExist
+from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .models import Article, Category
+from .pagination import KeysetPaginator
+from .views import ArticleQueryMixin, list_version_etag, list_version_last_modified
+
+# API field name -> lookup passed to values()
+ARTICLE_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'url': 'url',
+    'category': 'category_id',
+    'category_name': 'category__name',
+    'priority': 'priority',
+    'progress': 'progress',
+    'notes': 'notes',
+    'added_time': 'added_time',
+    'updated_time': 'updated_time',
+    'finished_time': 'finished_time',
+    'rank': 'rank',
+    'page_title': 'page_title',
+    'canonical_url': 'canonical_url',
+    'word_count': 'word_count',
+    'reading_time': 'reading_time',
+}
+
+CATEGORY_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'parent': 'parent_id',
+    'path': 'path',
+}
+
+# largest page a client may ask for with '?limit='
+MAX_PAGE_SIZE = 500
+
+# answer conditional GET with 304 without reading anything, responses hold no
+# relative times so they may also be validated by date
+api_list_version_condition = method_decorator(
+    condition(etag_func=list_version_etag, last_modified_func=list_version_last_modified),
+    name='get')
+
+
+class ApiError(Exception):
+    """Invalid request parameter, answered with status 400."""
+
+
+class ApiListMixin:
+    """
+    For use with views answering GET with a page of rows as JSON, listed
+    before LoginRequiredMixin so unauthenticated requests get 403.
+
+    Subclasses set 'fields' and implement get_queryset() and get_ordering().
+    """
+    # answer 403 instead of redirecting API clients to the login page
+    raise_exception = True
+
+    http_method_names = ['get', 'head', 'options']
+
+    # API field name -> lookup passed to values()
+    fields = {}
+
+    # fields returned when '?fields=' is not given, all fields if None
+    default_fields = None
+
+    # number of rows per page when '?limit=' is not given
+    paginate_by = 50
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_ordering(self):
+        """Return tuple of fields to order by, prefix with '-' for descending."""
+        raise NotImplementedError
+
+    def _get_fields(self):
+        """Return list of API field names asked for."""
+        names = self.request.GET.get('fields')
+        if not names:
+            return list(self.default_fields or self.fields)
+        names = [name.strip() for name in names.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise ApiError(f'fields must be a comma separated list of: {", ".join(self.fields)}')
+        return list(dict.fromkeys(names))
+
+    def _get_page_size(self):
+        limit = self.request.GET.get('limit')
+        if limit is None:
+            return self.paginate_by
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ApiError(f'limit must be an integer from 1 to {MAX_PAGE_SIZE}')
+        return limit
+
+    def _get_page_url(self, cursor):
+        """Return url of page with cursor keeping the other query parameters."""
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params['cursor'] = cursor
+        return f'{self.request.path}?{params.urlencode()}'
+
+    def get(self, request, *args, **kwargs):
+        try:
+            names = self._get_fields()
+            page_size = self._get_page_size()
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        lookups = [self.fields[name] for name in names]
+        try:
+            paginator = KeysetPaginator(self.get_queryset(), self.get_ordering(), page_size)
+        except FieldDoesNotExist:
+            return JsonResponse({'error': 'orderby must be a field name'}, status=400)
+        paginator.values(*lookups)
+
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except Http404:
+            return JsonResponse({'error': 'invalid cursor'}, status=400)
+
+        results = [{name: row[lookup] for name, lookup in zip(names, lookups)}
+                   for row in page]
+        return JsonResponse({
+            'results': results,
+            'next': self._get_page_url(page.next_cursor),
+            'previous': self._get_page_url(page.previous_cursor),
+        })
+
+
+@api_list_version_condition
+class ArticleApiView(ApiListMixin, LoginRequiredMixin, ArticleQueryMixin, generic.View):
+    """
+    Page of the request user's unread or read articles.
+
+    Takes the same 'orderby', 'filter_category' and 'filter_priority' query
+    parameters as ArticleList.
+    """
+    model = Article
+    fields = ARTICLE_FIELDS
+
+    def get(self, request, *args, **kwargs):
+        if kwargs.get('state') not in ['read', 'unread', None]:
+            return JsonResponse({'error': 'state must be "read" or "unread"'}, status=404)
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return self._filter_queryset(self._get_state_queryset())
+
+    def get_ordering(self):
+        return self._get_order_hier()
+
+
+@api_list_version_condition
+class CategoryApiView(ApiListMixin, LoginRequiredMixin, generic.View):
+    """Page of the request user's categories ordered by name."""
+    fields = CATEGORY_FIELDS
+
+    def get_queryset(self):
+        return Category.objects.filter(created_by=self.request.user)
+
+    def get_ordering(self):
+        return ('name',)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ReadlaterConfig(AppConfig):
     name = 'readlater'
+
+    def ready(self):
+        # connect signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,133 @@
+"""
+ASGI handler which reads streamed responses in a worker thread, and an ASGI
+application serving STATIC_ROOT.
+
+Django 3.2's ASGIHandler iterates a streamed response in the event loop, where
+database queries raise SynchronousOnlyOperation, so the article export and the
+streamed article list would end part way through.  StreamingASGIHandler takes
+each chunk of a streamed response with one hop to a worker thread instead.
+
+The WhiteNoise middleware is left out under ASGI (see READLATER_SERVER in
+settings.py), so StaticRootASGIHandler serves the collected static files.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+from whitenoise.base import WhiteNoise
+
+# returned by next() once the iterator is used up
+_END = object()
+
+
+async def iterate_in_thread(iterator):
+    """
+    Async generator yielding the items of iterator, taking each in a worker
+    thread.
+
+    All items are taken in the same thread, so queries of a lazy queryset use
+    the connection they were started on, and the thread's connection is closed
+    when done.  Setting READLATER_ASYNC_DB_THREAD_SENSITIVE uses Django's
+    shared sync thread instead, as for database_sync_to_async().
+    """
+    if getattr(settings, 'READLATER_ASYNC_DB_THREAD_SENSITIVE', False):
+        take = sync_to_async(next, thread_sensitive=True)
+        while (item := await take(iterator, _END)) is not _END:
+            yield item
+        return
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        while (item := await loop.run_in_executor(executor, next, iterator, _END)) is not _END:
+            yield item
+    finally:
+        executor.submit(connections.close_all)
+        executor.shutdown(wait=False)
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGIHandler which does not iterate streamed responses in the event loop."""
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+
+        # same headers as ASGIHandler.send_response()
+        response_headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            response_headers.append((bytes(header), bytes(value)))
+        for c in response.cookies.values():
+            response_headers.append(
+                (b'Set-Cookie', c.output(header='').encode('ascii').strip())
+            )
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': response_headers,
+        })
+        # iter(response) rather than streaming_content, as ASGIHandler does
+        async for part in iterate_in_thread(iter(response)):
+            for chunk, _ in self.chunk_bytes(part):
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+
+class StaticRootASGIHandler:
+    """
+    ASGI application serving the files in STATIC_ROOT at STATIC_URL, as the
+    WhiteNoise middleware does under WSGI, and passing other requests to
+    application.
+
+    WhiteNoise finds the file and sets its headers, the file is opened and
+    read in worker threads.
+    """
+    # bytes sent in each message
+    chunk_size = 64 * 1024
+
+    def __init__(self, application):
+        self.application = application
+        self.whitenoise = WhiteNoise(None, root=settings.STATIC_ROOT, prefix=settings.STATIC_URL)
+
+    async def __call__(self, scope, receive, send):
+        static_file = self.whitenoise.files.get(scope['path']) if scope['type'] == 'http' else None
+        if static_file is None:
+            await self.application(scope, receive, send)
+            return
+
+        # request headers as in a WSGI environ, which is what WhiteNoise reads
+        environ = {'HTTP_' + name.decode('latin1').upper().replace('-', '_'): value.decode('latin1')
+                   for name, value in scope['headers']}
+        response = await sync_to_async(static_file.get_response, thread_sensitive=False)(
+            scope['method'], environ)
+        await send({
+            'type': 'http.response.start',
+            'status': response.status,
+            'headers': [(name.encode('latin1'), value.encode('latin1'))
+                        for name, value in response.headers],
+        })
+        if response.file is None:
+            await send({'type': 'http.response.body'})
+            return
+        read = sync_to_async(functools.partial(response.file.read, self.chunk_size),
+                             thread_sensitive=False)
+        try:
+            while chunk := await read():
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body'})
+        finally:
+            response.file.close()
@@ -0,0 +1,129 @@
+"""
+Async versions of the article list, progress update, API read and article
+events views used when serving with ASGI (see readlater_django/asgi.py).
+
+Under ASGI Django 3.2 runs every synchronous view, and anything else
+synchronous it is handed, on one thread shared by all requests, so requests
+for sync views never overlap.  Django 3.2 has no async ORM interface either,
+so the async views here run all of a request's database work, including
+loading the user from the session, in a single hop to a worker thread from a
+pool.  Requests then overlap up to the size of the pool and the event loop is
+free while they wait on the database.
+"""
+import asyncio
+import functools
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from .api import ArticleApiView, CategoryApiView
+from .events import ArticleEventsView, get_events
+from .views import ArticleList, ArticleProgressView
+
+
+def database_sync_to_async(func):
+    """
+    Return coroutine function running func in a worker thread.
+
+    The worker thread's database connection is closed before and after func if
+    it is broken or older than CONN_MAX_AGE, as Django only does this for the
+    thread handling request signals.  Setting
+    READLATER_ASYNC_DB_THREAD_SENSITIVE runs func on Django's shared sync
+    thread instead, which tests need to see data in their transaction.
+    """
+    if getattr(settings, 'READLATER_ASYNC_DB_THREAD_SENSITIVE', False):
+        return sync_to_async(func, thread_sensitive=True)
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def _finish_response(response):
+    """
+    Render template response so no template work is left for the ASGI
+    handler.  Streamed content is read later by StreamingASGIHandler, in a
+    worker thread as it makes queries.
+    """
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    return response
+
+
+class AsyncViewMixin:
+    """
+    Serve a synchronous view class as an async view.
+
+    List before the view class.  The view's own dispatch(), including its
+    login check, conditional GET handling and rendering, runs in one
+    database_sync_to_async() call.
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        # keep view_class and csrf_exempt set by as_view()
+        functools.update_wrapper(async_view, view)
+        return async_view
+
+    def _dispatch_sync(self, request, *args, **kwargs):
+        return _finish_response(super().dispatch(request, *args, **kwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        return await database_sync_to_async(self._dispatch_sync)(request, *args, **kwargs)
+
+
+class AsyncArticleList(AsyncViewMixin, ArticleList):
+    """Async version of ArticleList."""
+
+
+class AsyncArticleProgressView(AsyncViewMixin, ArticleProgressView):
+    """Async version of ArticleProgressView."""
+
+
+class AsyncArticleApiView(AsyncViewMixin, ArticleApiView):
+    """Async version of ArticleApiView."""
+
+
+class AsyncCategoryApiView(AsyncViewMixin, CategoryApiView):
+    """Async version of CategoryApiView."""
+
+
+class AsyncArticleEventsView(AsyncViewMixin, ArticleEventsView):
+    """
+    Async version of ArticleEventsView which waits up to
+    READLATER_EVENTS_WAIT seconds for an event before answering, checking
+    every READLATER_EVENTS_POLL_INTERVAL seconds without holding a thread.
+
+    Django 3.2 can not stream a response from an async view so the response
+    ends after the first events and the browser reconnects straight away.
+    """
+    retry = getattr(settings, 'READLATER_ASYNC_EVENTS_RETRY', 100)
+    wait = getattr(settings, 'READLATER_EVENTS_WAIT', 25)
+    poll_interval = getattr(settings, 'READLATER_EVENTS_POLL_INTERVAL', 1)
+
+    async def dispatch(self, request, *args, **kwargs):
+        # login check and first look for events
+        response = await super().dispatch(request, *args, **kwargs)
+        since = getattr(self, 'waiting_since', None)
+        if since is None:
+            return response
+
+        deadline = time.monotonic() + self.wait
+        user_id = request.user.pk
+        while time.monotonic() + self.poll_interval < deadline:
+            await asyncio.sleep(self.poll_interval)
+            events = await database_sync_to_async(get_events)(user_id, since)
+            if events:
+                return self.render_events(events, since)
+        return response
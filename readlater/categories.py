@@ -0,0 +1,105 @@
+"""
+Deleting categories without holding up the request.
+
+A deleted category is hidden straight away by marking it deleted.  Its
+articles are then moved to the chosen category, or Uncategorized, a batch at
+a time with each batch in its own short transaction, before the category
+itself is removed.  Sub-categories of a deleted category move up to its parent.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Article, ArticleEvent, ArticleListVersion, Category
+from .tasks import run_in_background
+
+# number of articles moved per transaction
+DELETE_BATCH_SIZE = getattr(settings, 'READLATER_CATEGORY_DELETE_BATCH_SIZE', 500)
+
+
+def delete_category(category, reassign_to=None):
+    """
+    Mark category deleted and start moving its articles in the background.
+
+    :param category: Category to delete.
+    :type category: Category
+    :param reassign_to: Category to move articles to, None for Uncategorized.
+    :type reassign_to: Category
+    """
+    with transaction.atomic():
+        # including children already marked deleted, the category can not be
+        # removed while any category refers to it as parent
+        for child in Category.all_objects.filter(parent=category):
+            child.parent_id = category.parent_id
+            child.save(update_fields=['parent'])
+    category.deleted_time = timezone.now()
+    category.reassign_to = reassign_to
+    category.save(update_fields=['deleted_time', 'reassign_to'])
+    run_in_background(reassign_deleted_category, category.pk)
+
+
+def _get_target_id(category):
+    """Return id of category articles should move to, following deleted targets."""
+    seen = {category.pk}
+    target_id = category.reassign_to_id
+    while target_id is not None and target_id not in seen:
+        seen.add(target_id)
+        target = Category.all_objects.filter(pk=target_id).values(
+            'deleted_time', 'reassign_to').first()
+        if target is None:
+            return None
+        if target['deleted_time'] is None:
+            return target_id
+        target_id = target['reassign_to']
+    return None
+
+
+def reassign_deleted_category(category_id, batch_size=None):
+    """
+    Move articles of a deleted category in batches then remove the category.
+
+    Safe to call again if stopped part way through.
+
+    :param category_id: Id of category marked deleted.
+    :type category_id: int
+    :param batch_size: Number of articles moved per transaction.
+    :type batch_size: int
+    :return: Number of articles moved.
+    :rtype: int
+    """
+    batch_size = batch_size or DELETE_BATCH_SIZE
+    category = Category.all_objects.filter(pk=category_id, deleted_time__isnull=False).first()
+    if category is None:
+        return 0
+
+    moved = 0
+    while True:
+        # target may be deleted while articles are moved
+        target_id = _get_target_id(category)
+        with transaction.atomic():
+            pks = list(Article.objects.filter(category_id=category_id).values_list(
+                'pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            moved += Article.objects.filter(pk__in=pks, category_id=category_id).update(
+                category_id=target_id)
+        # update does not send signals
+        ArticleListVersion.bump(category.created_by_id)
+
+    if moved:
+        ArticleEvent.publish(category.created_by_id, [None], ArticleEvent.ACTION_RELOAD)
+    # articles have all been moved so there is nothing left to set to NULL
+    category.delete()
+    return moved
+
+
+def process_deleted_categories(batch_size=None):
+    """
+    Finish deleting all categories marked deleted.
+
+    :return: List of (category id, articles moved).
+    :rtype: list
+    """
+    pending = Category.all_objects.filter(deleted_time__isnull=False).order_by(
+        'deleted_time').values_list('pk', flat=True)
+    return [(pk, reassign_deleted_category(pk, batch_size)) for pk in list(pending)]
@@ -0,0 +1,164 @@
+"""
+Live updates of open article lists.
+
+Views changing articles publish an ArticleEvent holding the article id and
+the changed values as shown in the article list.  The article list page
+listens with an EventSource on ArticleEventsView and patches its rows in place
+rather than reloading.  Events are kept in the database so they reach the
+user's lists whichever process or device they are served by.
+
+A sync worker is taken for as long as a request lasts, so under WSGI
+ArticleEventsView answers straight away with the events since the client's
+last one and the browser reconnects READLATER_EVENTS_RETRY milliseconds later.
+Under ASGI readlater.async_views.AsyncArticleEventsView waits for events
+without holding a thread instead.
+"""
+import datetime
+import json
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.db.models.functions import Greatest
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views import generic
+
+from .models import ArticleEvent, ArticleListVersion
+from .templatetags.only_days import nice_timesince_batch
+
+# article list columns which events carry values for
+EVENT_FIELDS = ('name', 'url', 'category', 'notes', 'priority', 'progress',
+                'updated_time', 'added_time', 'finished_time')
+
+# most events sent in one response, the client asks again for the rest
+EVENT_BATCH_SIZE = 100
+
+# seconds events are kept by the prune_article_events command, lists which
+# have not connected for longer are reloaded
+EVENTS_MAX_AGE = getattr(settings, 'READLATER_EVENTS_MAX_AGE', 24 * 3600)
+
+
+def get_event_fields(article, names=EVENT_FIELDS):
+    """
+    Return dict of article's values for fields names formatted as in the
+    article list rows.
+
+    :param article: Article, need not be saved, with 'category' fetched if
+        included in names.
+    """
+    now = timezone.now()
+    fields = {}
+    for name in names:
+        value = getattr(article, name)
+        if name == 'category':
+            value = value.name if value is not None else 'Uncategorized'
+        elif name == 'priority':
+            value = article.get_priority_display()
+        elif name.endswith('_time'):
+            value = nice_timesince_batch([value], now)[0] or ''
+        fields[name] = value
+    return fields
+
+
+def get_last_event_id(user_id):
+    """Return id of user's latest event or 0 if there is none."""
+    return ArticleEvent.objects.filter(user_id=user_id).aggregate(
+        last_id=Max('id'))['last_id'] or 0
+
+
+def get_events(user_id, since):
+    """
+    Return list of (id, article_id, action, fields) of user's events after
+    id since, oldest first.
+    """
+    return list(ArticleEvent.objects.filter(user_id=user_id, id__gt=since).order_by(
+        'id').values_list('id', 'article_id', 'action', 'fields')[:EVENT_BATCH_SIZE])
+
+
+def events_pruned_after(user_id, since):
+    """Return True if user's events after id since may have been removed."""
+    pruned_id = ArticleListVersion.objects.filter(user_id=user_id).values_list(
+        'pruned_event_id', flat=True).first()
+    return since < (pruned_id or 0)
+
+
+def prune_events(max_age):
+    """
+    Delete events older than max_age seconds, recording the latest id deleted
+    for each user in ArticleListVersion.pruned_event_id.
+
+    Each user's newest event is kept, so the id a page starts listening from
+    is never below the removed events, and SQLite, which gives new rows the id
+    after the highest one left, keeps issuing higher ids.
+
+    :return: Number of events deleted.
+    :rtype: int
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=max_age)
+    pruned = ArticleEvent.objects.filter(created_time__lt=cutoff).filter(Exists(
+        ArticleEvent.objects.filter(user_id=OuterRef('user_id'), id__gt=OuterRef('id'))))
+    deleted = 0
+    with transaction.atomic():
+        for user_id, pruned_id in pruned.values('user_id').annotate(
+                pruned_id=Max('id')).values_list('user_id', 'pruned_id'):
+            ArticleListVersion.objects.get_or_create(user_id=user_id)
+            ArticleListVersion.objects.filter(user_id=user_id).update(
+                pruned_event_id=Greatest('pruned_event_id', pruned_id))
+            deleted += ArticleEvent.objects.filter(user_id=user_id, id__lte=pruned_id).delete()[0]
+    return deleted
+
+
+class ArticleEventsView(LoginRequiredMixin, generic.View):
+    """
+    Request user's article events after the client's last one as a
+    text/event-stream for EventSource.
+
+    The last seen event id is taken from the Last-Event-ID header sent when
+    EventSource reconnects, then the 'since' query parameter set by the page,
+    else only events from now on are sent.  Each event's data is
+    {"id": article id, "fields": {...}} and its type is the event action.  A
+    'reload' event is sent when events since the last one have been removed.
+    """
+    http_method_names = ['get']
+    # answer 403 instead of redirecting EventSource to the login page
+    raise_exception = True
+
+    # milliseconds before the browser asks again once a response ends
+    retry = getattr(settings, 'READLATER_EVENTS_RETRY', 5000)
+
+    def _get_since(self, request):
+        """Return last event id seen by client or None if not given."""
+        for value in (request.META.get('HTTP_LAST_EVENT_ID'), request.GET.get('since')):
+            try:
+                return max(int(value), 0)
+            except (TypeError, ValueError):
+                pass
+        return None
+
+    def get(self, request, *args, **kwargs):
+        since = self._get_since(request)
+        if since is None:
+            since = get_last_event_id(request.user.pk)
+            events = []
+        elif events_pruned_after(request.user.pk, since):
+            events = [(get_last_event_id(request.user.pk), None, ArticleEvent.ACTION_RELOAD, {})]
+        else:
+            events = get_events(request.user.pk, since)
+        # nothing to send yet, AsyncArticleEventsView waits for more
+        self.waiting_since = None if events else since
+        return self.render_events(events, since)
+
+    def render_events(self, events, since):
+        """Return response sending events, since is the id sent if there are none."""
+        lines = [f'retry: {self.retry}\n\n']
+        for event_id, article_id, action, fields in events:
+            data = json.dumps({'id': article_id, 'fields': fields})
+            lines.append(f'id: {event_id}\nevent: {action}\ndata: {data}\n\n')
+        if not events:
+            # sets the id EventSource sends when it reconnects
+            lines.append(f'id: {since}\n\n')
+        response = HttpResponse(''.join(lines), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        return response
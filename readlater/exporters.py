@@ -0,0 +1,130 @@
+"""
+Export of a user's categories and articles.
+
+Exporters yield the output as a sequence of str chunks read from the database
+with iterator() so the memory used does not depend on the number of articles.
+The CSV and JSON Lines formats can be read back by readlater.importers.
+"""
+import csv
+import io
+import json
+
+from django.utils.text import compress_sequence
+
+from .models import Article, Category
+
+FORMATS = ('csv', 'jsonl')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# number of rows fetched from the database and written per chunk
+CHUNK_SIZE = 2000
+
+ARTICLE_FIELDS = ('name', 'url', 'category', 'priority', 'progress', 'notes',
+                  'added_time', 'updated_time', 'finished_time')
+
+
+def _get_article_rows(user, chunk_size):
+    """Yield a tuple of ARTICLE_FIELDS values for each article of user."""
+    queryset = Article.objects.filter(created_by=user).order_by('pk').values_list(
+        'name', 'url', 'category__name', 'priority', 'progress', 'notes',
+        'added_time', 'updated_time', 'finished_time')
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def _format_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _chunked(rows, chunk_size, write_row):
+    """Yield the text written by write_row(buffer, row) for each chunk_size rows."""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        write_row(buffer, row)
+        count += 1
+        if count == chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_csv(user, chunk_size=CHUNK_SIZE):
+    """
+    Yield CSV of user's articles, one row per article with the category name.
+
+    Categories without articles are not included, use JSON Lines to keep them.
+    """
+    header = io.StringIO()
+    csv.writer(header).writerow(ARTICLE_FIELDS)
+    yield header.getvalue()
+
+    def write_row(buffer, row):
+        csv.writer(buffer).writerow([_format_value(v) for v in row])
+
+    yield from _chunked(_get_article_rows(user, chunk_size), chunk_size, write_row)
+
+
+def export_jsonl(user, chunk_size=CHUNK_SIZE):
+    """
+    Yield JSON Lines of user's categories followed by their articles.
+
+    Each line has a 'type' key of either 'category' or 'article'.
+    """
+    categories = Category.objects.filter(created_by=user).order_by('pk').values_list(
+        'name', flat=True).iterator(chunk_size=chunk_size)
+
+    def write_category(buffer, name):
+        buffer.write(json.dumps({'type': 'category', 'name': name}))
+        buffer.write('\n')
+
+    def write_article(buffer, row):
+        record = {'type': 'article'}
+        record.update(zip(ARTICLE_FIELDS, map(_format_value, row)))
+        buffer.write(json.dumps(record))
+        buffer.write('\n')
+
+    yield from _chunked(categories, chunk_size, write_category)
+    yield from _chunked(_get_article_rows(user, chunk_size), chunk_size, write_article)
+
+
+EXPORTERS = {
+    'csv': export_csv,
+    'jsonl': export_jsonl,
+}
+
+
+def export_articles(user, file_format, compress=False, chunk_size=CHUNK_SIZE):
+    """
+    Export categories and articles of user.
+
+    :param user: Owner of exported articles.
+    :type user: User
+    :param file_format: One of FORMATS.
+    :type file_format: str
+    :param compress: If True compress output with gzip.
+    :type compress: bool
+    :param chunk_size: Number of rows fetched from the database per chunk.
+    :type chunk_size: int
+    :return: Iterator of bytes chunks of the UTF-8 encoded (and optionally
+             gzip compressed) export.
+    :rtype: iterator
+    """
+    chunks = (chunk.encode('utf-8')
+              for chunk in EXPORTERS[file_format](user, chunk_size=chunk_size))
+    if compress:
+        return compress_sequence(chunks)
+    return chunks
+
+
+def get_export_filename(user, file_format, compress=False):
+    """Return file name for an export of user's articles."""
+    return f'readlater-{user.username}.{file_format}' + ('.gz' if compress else '')
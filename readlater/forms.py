@@ -1,10 +1,31 @@
 from django import forms
+from django.db.models import Max
+from django.db.models.functions import Length
 from crispy_forms.helper import FormHelper
 
-from .models import Article, Category
+from .importers import FORMATS
+from .models import MAX_CATEGORY_DEPTH, PATH_SEGMENT_WIDTH, Article, Category
 
 
-class ArticleCreateForm(forms.ModelForm):
+class ArticleUniqueNameMixin:
+    """
+    Validate name is not used by another of the owner's articles.
+
+    The form instance must have created_by set before the form is validated.
+    """
+    def clean_name(self):
+        name = self.cleaned_data['name']
+        duplicates = Article.objects.filter(created_by_id=self.instance.created_by_id,
+                                            name=name)
+        if self.instance.pk is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise forms.ValidationError('You already have an article with this name.',
+                                        code='unique')
+        return name
+
+
+class ArticleCreateForm(ArticleUniqueNameMixin, forms.ModelForm):
     """Form for creating a new Article."""
 
     # optional hidden field holding the next url to visit after form submission
@@ -19,8 +40,16 @@ class ArticleCreateForm(forms.ModelForm):
 
         self.helper = FormHelper(self)
 
+    def clean_url(self):
+        url = self.cleaned_data['url']
+        duplicate = Article.find_by_url(self.instance.created_by_id, url)
+        if duplicate is not None:
+            raise forms.ValidationError(f'This URL is already saved as "{duplicate.name}".',
+                                        code='duplicate')
+        return url
+
 
-class ArticleEditForm(forms.ModelForm):
+class ArticleEditForm(ArticleUniqueNameMixin, forms.ModelForm):
     """Form for editing an existing Article record."""
 
     # optional hidden field holding the next url to visit after form submission
@@ -39,16 +68,138 @@ class ArticleEditForm(forms.ModelForm):
         self.fields['category'].queryset = self.fields['category'].queryset.order_by('name')
 
 
-class CategoryCreateForm(forms.ModelForm):
+class CategoryParentMixin:
+    """
+    Restrict parent choices to the owner's categories, leaving out the
+    category itself and its descendants so no cycle can be made, and keep the
+    tree within MAX_CATEGORY_DEPTH.
+
+    The form instance must have created_by set before the form is created.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        queryset = Category.objects.filter(created_by_id=self.instance.created_by_id)
+        if self.instance.pk is not None:
+            queryset = queryset.exclude(Category.subtree_q([self.instance.path]))
+        self.fields['parent'].queryset = queryset.order_by('name')
+
+    def clean_parent(self):
+        parent = self.cleaned_data['parent']
+        if parent is None:
+            return parent
+        # levels below the category move with it
+        height = 0
+        if self.instance.pk is not None:
+            longest = self.instance.get_descendants().aggregate(
+                longest=Max(Length('path')))['longest']
+            if longest is not None:
+                height = (longest - len(self.instance.path)) // PATH_SEGMENT_WIDTH
+        if parent.depth + 1 + height >= MAX_CATEGORY_DEPTH:
+            raise forms.ValidationError(
+                f'Categories can be nested at most {MAX_CATEGORY_DEPTH} deep.',
+                code='max_depth')
+        return parent
+
+
+class CategoryCreateForm(CategoryParentMixin, forms.ModelForm):
     """Form for creating a new Category."""
     class Meta:
         model = Category
-        fields = ['name']
+        fields = ['name', 'parent']
 
 
-class CategoryEditForm(forms.ModelForm):
+class CategoryEditForm(CategoryParentMixin, forms.ModelForm):
     """Form for editing an existing Category."""
 
     class Meta:
         model = Category
-        fields = ['name']
+        fields = ['name', 'parent']
+
+
+class CategoryDeleteForm(forms.Form):
+    """Form for choosing where articles of a deleted category are moved to."""
+    reassign_to = forms.ModelChoiceField(queryset=Category.objects.none(), required=False,
+                                         empty_label='Uncategorized',
+                                         label='Move articles to')
+
+    def __init__(self, *args, category=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.helper = FormHelper(self)
+        self.helper.form_tag = False
+
+        # only the owner's other categories can be chosen
+        self.fields['reassign_to'].queryset = Category.objects.filter(
+            created_by_id=category.created_by_id).exclude(pk=category.pk).order_by('name')
+
+
+class ArticleImportForm(forms.Form):
+    """Form for uploading a file of bookmarks to import as articles."""
+    file = forms.FileField(help_text='Netscape bookmark or Pocket HTML export, '
+                                     'CSV or JSON Lines file.')
+    format = forms.ChoiceField(choices=[('', 'Guess from file name')] +
+                                       [(f, f.upper()) for f in FORMATS],
+                               required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.helper = FormHelper(self)
+
+
+class ArticleIdsField(forms.Field):
+    """Field for a list of article ids submitted by checkboxes with the same name."""
+    widget = forms.MultipleHiddenInput
+
+    # most articles changed by one bulk action, below Django's limit of
+    # DATA_UPLOAD_MAX_NUMBER_FIELDS (1000) form fields
+    max_ids = 500
+
+    def to_python(self, value):
+        if not value:
+            return []
+        if len(value) > self.max_ids:
+            raise forms.ValidationError(f'Select at most {self.max_ids} articles.',
+                                        code='max_ids')
+        try:
+            return sorted({int(v) for v in value})
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Invalid article id.', code='invalid')
+
+
+class ArticleBulkActionForm(forms.Form):
+    """
+    Form for applying one action to the articles selected in the article list.
+
+    'priority' is required when setting priority, 'category' is used when
+    moving articles with an empty value meaning Uncategorized.
+    """
+    ACTION_MARK_READ = 'mark_read'
+    ACTION_SET_PRIORITY = 'set_priority'
+    ACTION_MOVE_CATEGORY = 'move_category'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = ((ACTION_MARK_READ, 'Mark read'),
+                      (ACTION_SET_PRIORITY, 'Set priority'),
+                      (ACTION_MOVE_CATEGORY, 'Move to category'),
+                      (ACTION_DELETE, 'Delete'))
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    articles = ArticleIdsField(error_messages={'required': 'No articles selected.'})
+    priority = forms.TypedChoiceField(choices=Article.PRIORITY_CHOICES, coerce=int,
+                                      empty_value=None, required=False)
+    category = forms.ModelChoiceField(queryset=Category.objects.none(), required=False)
+    next = forms.CharField(max_length=255, widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # only the user's own categories can be selected
+        self.fields['category'].queryset = Category.objects.filter(created_by=user)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if (cleaned_data.get('action') == self.ACTION_SET_PRIORITY
+                and cleaned_data.get('priority') is None):
+            self.add_error('priority', 'Select the priority to set.')
+        return cleaned_data
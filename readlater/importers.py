@@ -0,0 +1,386 @@
+"""
+Bulk import of bookmarks into Article records.
+
+Parsers read their input incrementally and yield one dict per bookmark with
+any of the keys 'name', 'url', 'category', 'priority', 'progress', 'notes'
+and 'added_time'.  Records with 'type' set to 'category' only create the
+category given by 'category'.  import_articles() inserts the records in batches so the
+memory used does not depend on the size of the input.
+"""
+import csv
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+from html.parser import HTMLParser
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Article, ArticleListVersion, Category, get_url_hash
+from .ranking import get_next_ranks
+
+# number of characters read from input at a time by the HTML parser
+READ_SIZE = 64 * 1024
+
+# names of sections in a Pocket export which hold finished articles
+POCKET_READ_SECTIONS = {'read archive', 'archive'}
+
+FORMATS = ('html', 'csv', 'jsonl')
+
+# bookmark exports also hold javascript:, place: and other links which must
+# not be shown as links in the article list
+_validate_url = URLValidator(schemes=['http', 'https'])
+
+
+class BookmarkHTMLParser(HTMLParser):
+    """
+    Parser for Netscape bookmark files (exported by all major browsers) and
+    Pocket HTML exports.
+
+    Folder names (<H3>) become the category.  For Pocket exports the first tag
+    is used as category and links under the 'Read Archive' heading (<H1>) are
+    marked as finished.
+    """
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._folders = []
+        self._pending_folder = None
+        self._section = None
+        self._link = None
+        self._text = []
+        self._in_heading = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'a' and attrs.get('href'):
+            self._link = attrs
+            self._text = []
+        elif tag in ('h1', 'h3'):
+            self._in_heading = tag
+            self._text = []
+        elif tag == 'dl':
+            # folder heading is followed by the list of its bookmarks
+            self._folders.append(self._pending_folder)
+            self._pending_folder = None
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._link is not None:
+            self._add_link(''.join(self._text).strip())
+            self._link = None
+        elif tag == self._in_heading:
+            text = ''.join(self._text).strip()
+            if tag == 'h1':
+                self._section = text.lower()
+            else:
+                self._pending_folder = text
+            self._in_heading = None
+        elif tag == 'dl' and self._folders:
+            self._folders.pop()
+
+    def handle_data(self, data):
+        if self._link is not None or self._in_heading:
+            self._text.append(data)
+
+    def _add_link(self, title):
+        link = self._link
+        record = {'name': title, 'url': link['href']}
+
+        added = link.get('add_date') or link.get('time_added')
+        if added:
+            record['added_time'] = added
+
+        tags = [t.strip() for t in (link.get('tags') or '').split(',') if t.strip()]
+        folders = [f for f in self._folders if f]
+        if folders:
+            record['category'] = folders[-1]
+        elif tags:
+            record['category'] = tags[0]
+
+        if self._section in POCKET_READ_SECTIONS:
+            record['progress'] = 100
+        self.records.append(record)
+
+
+def parse_html(stream):
+    """Yield records from a Netscape bookmark or Pocket HTML export."""
+    parser = BookmarkHTMLParser()
+    while True:
+        data = stream.read(READ_SIZE)
+        if not data:
+            break
+        parser.feed(data)
+        yield from parser.records
+        parser.records.clear()
+    parser.close()
+    yield from parser.records
+
+
+def _normalize_row(row):
+    """Map column names used by common exports (including Pocket CSV) to record keys."""
+    row = {str(k).strip().lower(): v for k, v in row.items() if k}
+    record = {
+        'name': row.get('name') or row.get('title'),
+        'url': row.get('url') or row.get('href'),
+        'category': row.get('category') or row.get('folder'),
+        'priority': row.get('priority'),
+        'progress': row.get('progress'),
+        'notes': row.get('notes'),
+        'added_time': row.get('added_time') or row.get('time_added'),
+    }
+    if not record['category'] and row.get('tags'):
+        # Pocket separates tags with '|'
+        tags = [t.strip() for t in str(row['tags']).replace('|', ',').split(',')]
+        record['category'] = next((t for t in tags if t), None)
+    if row.get('status') in ('archive', 'read'):
+        record['progress'] = 100
+    return {k: v for k, v in record.items() if v not in (None, '')}
+
+
+def parse_csv(stream):
+    """Yield records from a CSV file with a header row."""
+    for row in csv.DictReader(stream):
+        yield _normalize_row(row)
+
+
+def parse_jsonl(stream):
+    """Yield records from a file with one JSON object per line."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            # invalid lines produce an empty record which is counted as an error
+            yield {}
+        elif row.get('type') == 'category':
+            # written by readlater.exporters.export_jsonl
+            yield {'type': 'category', 'category': row.get('name')}
+        else:
+            yield _normalize_row(row)
+
+
+PARSERS = {
+    'html': parse_html,
+    'csv': parse_csv,
+    'jsonl': parse_jsonl,
+}
+
+
+def guess_format(filename):
+    """Return import format for filename based on extension or None if unknown."""
+    name = filename.lower()
+    if name.endswith(('.html', '.htm')):
+        return 'html'
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return None
+
+
+# larger unix timestamps are taken to be in milliseconds, as some exports give
+MAX_TIMESTAMP_SECONDS = 10 ** 11
+
+
+def _parse_time(value):
+    """Parse unix timestamp or ISO 8601 string, returns None if invalid."""
+    if isinstance(value, (int, float)) or str(value).isdigit():
+        seconds = int(value)
+        if seconds > MAX_TIMESTAMP_SECONDS:
+            seconds //= 1000
+        try:
+            return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+        except (ValueError, OverflowError, OSError):
+            return None
+    try:
+        parsed = parse_datetime(str(value))
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+_PRIORITY_VALUES = {name.lower(): value for value, name in Article.PRIORITY_CHOICES}
+
+
+def _parse_priority(value):
+    """Parse priority given as display name or value, returns None if invalid."""
+    if value is None:
+        return Article.PRIORITY_NORMAL
+    if str(value).lower() in _PRIORITY_VALUES:
+        return _PRIORITY_VALUES[str(value).lower()]
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value in _PRIORITY_VALUES.values() else None
+
+
+class ImportResult:
+    """Counts and timing for an import."""
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    @property
+    def rate(self):
+        """Records processed per second."""
+        total = self.created + self.skipped + self.errors
+        return total / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f'Imported {self.created} articles (skipped {self.skipped} '
+                f'duplicates, {self.errors} errors) in {self.elapsed:.2f} s '
+                f'({self.rate:.0f} records/s)')
+
+
+class ArticleImporter:
+    """
+    Insert records from a parser as Article records for a user.
+
+    Categories are looked up by name and created when missing.  Records whose
+    name or normalized URL is already used by another of the user's articles
+    are skipped.
+    """
+    def __init__(self, user, batch_size=1000):
+        self.user = user
+        self.batch_size = batch_size
+        self.result = ImportResult()
+        self._categories = dict(Category.objects.filter(
+            created_by=user).values_list('name', 'id'))
+        self._now = timezone.now()
+
+    def _get_category_id(self, name):
+        name = name.strip()[:Category._meta.get_field('name').max_length]
+        if name not in self._categories:
+            self._categories[name] = Category.objects.create(name=name,
+                                                             created_by=self.user).id
+        return self._categories[name]
+
+    def _make_article(self, record):
+        """Return unsaved Article for record or None if record is invalid."""
+        url = (record.get('url') or '').strip()
+        if not url or len(url) > Article._meta.get_field('url').max_length:
+            return None
+        try:
+            _validate_url(url)
+        except ValidationError:
+            return None
+        priority = _parse_priority(record.get('priority'))
+        if priority is None:
+            return None
+        try:
+            progress = min(max(int(record.get('progress') or 0), 0), 100)
+        except (TypeError, ValueError):
+            return None
+
+        added_time = None
+        if record.get('added_time'):
+            added_time = _parse_time(record['added_time'])
+        added_time = added_time or self._now
+
+        name = (record.get('name') or '').strip() or url
+        article = Article(name=name[:Article._meta.get_field('name').max_length],
+                          url=url,
+                          notes=(record.get('notes') or '')[:Article._meta.get_field('notes').max_length],
+                          priority=priority,
+                          progress=progress,
+                          added_time=added_time,
+                          created_by=self.user)
+        # bulk_create does not call save() which sets the hash
+        article.url_hash = get_url_hash(url)
+        if record.get('category'):
+            article.category_id = self._get_category_id(record['category'])
+        if progress > 0:
+            article.updated_time = self._now
+        if progress == 100:
+            article.finished_time = self._now
+        return article
+
+    def _insert_batch(self, records):
+        articles = []
+        names = set()
+        url_hashes = set()
+        for record in records:
+            if record.get('type') == 'category':
+                if record.get('category'):
+                    self._get_category_id(record['category'])
+                else:
+                    self.result.errors += 1
+                continue
+            article = self._make_article(record)
+            if article is None:
+                self.result.errors += 1
+            elif article.name in names or article.url_hash in url_hashes:
+                self.result.skipped += 1
+            else:
+                articles.append(article)
+                names.add(article.name)
+                url_hashes.add(article.url_hash)
+
+        # one query for each of the per user name constraint and URL index
+        existing_names = set(Article.objects.filter(
+            created_by=self.user, name__in=names).values_list('name', flat=True))
+        existing_hashes = set(Article.objects.filter(
+            created_by=self.user, url_hash__in=url_hashes).values_list('url_hash', flat=True))
+        new_articles = [a for a in articles
+                        if a.name not in existing_names and a.url_hash not in existing_hashes]
+        self.result.skipped += len(articles) - len(new_articles)
+
+        # spaced out ranks so moves between imported articles stay one row write
+        for article, rank in zip(new_articles, get_next_ranks(self.user.id, len(new_articles))):
+            article.rank = rank
+        with transaction.atomic():
+            Article.objects.bulk_create(new_articles, batch_size=self.batch_size)
+        self.result.created += len(new_articles)
+
+    def run(self, records):
+        """
+        Import records in batches.
+
+        :param records: Iterable of record dicts.
+        :type records: iterable
+        :return: Import counts and timing.
+        :rtype: ImportResult
+        """
+        start = time.perf_counter()
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            self._insert_batch(batch)
+
+        # bulk_create does not send signals
+        ArticleListVersion.bump(self.user.id)
+        self.result.elapsed = time.perf_counter() - start
+        return self.result
+
+
+def import_articles(user, stream, file_format, batch_size=1000):
+    """
+    Import bookmarks from a text stream as articles for user.
+
+    :param user: Owner of imported articles.
+    :type user: User
+    :param stream: Text stream to read bookmarks from.
+    :type stream: file
+    :param file_format: One of FORMATS.
+    :type file_format: str
+    :param batch_size: Number of records inserted per transaction.
+    :type batch_size: int
+    :return: Import counts and timing.
+    :rtype: ImportResult
+    """
+    return ArticleImporter(user, batch_size=batch_size).run(PARSERS[file_format](stream))
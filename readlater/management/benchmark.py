@@ -0,0 +1,47 @@
+"""
+Base class of the benchmark_* management commands.
+"""
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+    teardown_test_environment
+
+
+class BenchmarkCommand(BaseCommand):
+    """
+    Command running a benchmark in a temporary test database and reporting
+    each result dict as a JSON line on stdout or in the --output file.
+
+    Subclasses implement get_results() and add their own arguments after
+    calling add_arguments() of this class.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None,
+                            help='File to write JSON lines to (default stdout).')
+
+    def get_results(self, **options):
+        """Return iterable of result dicts for the command's options."""
+        raise NotImplementedError
+
+    def setup_databases(self):
+        """Create the test databases and return their config for teardown_databases()."""
+        return setup_databases(verbosity=0, interactive=False)
+
+    def teardown_databases(self, old_config):
+        teardown_databases(old_config, verbosity=0)
+
+    def handle(self, *args, **options):
+        out = open(options['output'], 'w') if options['output'] else self.stdout
+        setup_test_environment()
+        old_config = self.setup_databases()
+        try:
+            for result in self.get_results(**options):
+                out.write(json.dumps(result) + '\n')
+                out.flush()
+        finally:
+            self.teardown_databases(old_config)
+            teardown_test_environment()
+            if out is not self.stdout:
+                out.close()
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from readlater.management.benchmark import BenchmarkCommand
+from readlater.management.commands.benchmark_views import _percentile
+from readlater.management.commands.seed_articles import seed_articles
+from readlater.models import Article
+
+# how each mode serves requests: (handler, url configuration, middleware)
+#   wsgi       - sync views with the WSGI handler, a thread per concurrent request
+#                standing in for a sync gunicorn worker each
+#   asgi_sync  - the same sync views with the ASGI handler
+#   asgi_async - async views with the ASGI handler, as readlater_django/asgi.py
+ASGI_MIDDLEWARE = [m for m in settings.MIDDLEWARE
+                   if m != 'whitenoise.middleware.WhiteNoiseMiddleware']
+MODES = {
+    'wsgi': ('wsgi', 'readlater_django.urls', settings.MIDDLEWARE),
+    'asgi_sync': ('asgi', 'readlater_django.urls', ASGI_MIDDLEWARE),
+    'asgi_async': ('asgi', 'readlater_django.asgi_urls', ASGI_MIDDLEWARE),
+}
+
+
+def _get_targets(user):
+    """
+    Return list of (name, method, url, data) of requests to time.  Forms are
+    posted urlencoded as by browsers, Django 3.2's AsyncClient can not send
+    multipart data.
+    """
+    article = Article.objects.filter(created_by=user).order_by('id').first()
+    return [
+        ('article_list', 'get', reverse('article_list'), None),
+        ('api_article_list', 'get', reverse('api_article_list') + '?fields=id,name,progress',
+         None),
+        ('article_progress', 'post', reverse('article_progress', args=(article.pk,)),
+         'progress=50'),
+    ]
+
+
+def _send(client, method, url, data):
+    if method == 'post':
+        return client.post(url, data, content_type='application/x-www-form-urlencoded')
+    return client.get(url)
+
+
+def _summary(latencies, statuses, elapsed):
+    return {
+        'requests': len(latencies),
+        'errors': sum(1 for status in statuses if status >= 400),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+    }
+
+
+def run_wsgi(user, method, url, data, concurrency, requests):
+    """Send requests from concurrency threads, each with its own client."""
+    clients = []
+    for _ in range(concurrency):
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+
+    def send(i):
+        client = clients[i % concurrency]
+        start = time.perf_counter()
+        response = _send(client, method, url, data)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(requests)))
+    elapsed = time.perf_counter() - start
+    # connections opened by the threads are not closed by request signals
+    connections.close_all()
+    return _summary([r[0] for r in results], [r[1] for r in results], elapsed)
+
+
+def run_asgi(user, method, url, data, concurrency, requests):
+    """Send requests as concurrency tasks on one event loop."""
+    client = AsyncClient()
+    client.force_login(user)
+
+    async def send(semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await _send(client, method, url, data)
+            return (time.perf_counter() - start) * 1000, response.status_code
+
+    async def send_all():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(send(semaphore) for _ in range(requests)))
+
+    start = time.perf_counter()
+    # Django's single thread for synchronous code is then the calling thread
+    results = async_to_sync(send_all)()
+    elapsed = time.perf_counter() - start
+    return _summary([r[0] for r in results], [r[1] for r in results], elapsed)
+
+
+def run_benchmark(articles=10000, concurrency_levels=(1, 8, 32), requests=200,
+                  modes=tuple(MODES), seed=0):
+    """Yield result dict for each request, mode and concurrency level."""
+    user = seed_articles(1, 10, articles, prefix='benchmark_asgi', seed=seed)[0]
+    for name, method, url, data in _get_targets(user):
+        for mode in modes:
+            handler, urlconf, middleware = MODES[mode]
+            run = run_wsgi if handler == 'wsgi' else run_asgi
+            with override_settings(ROOT_URLCONF=urlconf, MIDDLEWARE=middleware):
+                for concurrency in concurrency_levels:
+                    # first request warms caches and connections
+                    run(user, method, url, data, 1, 1)
+                    result = {'target': name, 'mode': mode, 'articles': articles,
+                              'concurrency': concurrency}
+                    result.update(run(user, method, url, data, concurrency, requests))
+                    yield result
+
+
+class Command(BenchmarkCommand):
+    help = ('Compare requests per second and tail latency of the list, progress '
+            'update and API read paths served by sync views with WSGI against '
+            'sync and async views with ASGI, at increasing numbers of concurrent '
+            'requests, in a temporary test database.  Results are reported as '
+            'JSON lines.')
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--articles', type=int, default=10000,
+                            help='Number of articles of the benchmark user.')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                            help='Numbers of concurrent requests to benchmark at.')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Number of timed requests per measurement.')
+        parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES),
+                            help='Ways of serving requests to compare.')
+
+    def setup_databases(self):
+        self.tmp_dir = None
+        db_settings = settings.DATABASES['default']
+        if db_settings['ENGINE'] == 'django.db.backends.sqlite3':
+            # an in-memory test database can not be written while other
+            # threads read it, a file waits for the lock instead
+            self.tmp_dir = tempfile.TemporaryDirectory()
+            db_settings.setdefault('TEST', {})['NAME'] = os.path.join(self.tmp_dir.name, 'test.sqlite3')
+        return super().setup_databases()
+
+    def teardown_databases(self, old_config):
+        super().teardown_databases(old_config)
+        if self.tmp_dir is not None:
+            self.tmp_dir.cleanup()
+
+    def get_results(self, **options):
+        return run_benchmark(options['articles'], options['concurrency'],
+                             requests=options['requests'], modes=options['modes'])
@@ -0,0 +1,134 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from readlater.management.benchmark import BenchmarkCommand
+from readlater.management.commands.benchmark_views import _percentile
+from readlater.management.commands.seed_articles import _make_articles
+from readlater.models import MAX_CATEGORY_DEPTH, Article, ArticleListVersion, Category
+
+# shape name -> function returning number of children of a category at depth
+SHAPES = {
+    # a single chain as deep as categories may be nested
+    'deep': lambda depth: 1 if depth < MAX_CATEGORY_DEPTH - 1 else 0,
+    # many top level categories each with many children
+    'wide': lambda depth: 40 if depth < 2 else 0,
+    # a few children at every level
+    'bushy': lambda depth: 3 if depth < 6 else 0,
+}
+
+
+def build_tree(user, shape):
+    """Create tree of categories for user with given shape and return them root first."""
+    children = SHAPES[shape]
+    root = Category.objects.create(name=f'{shape} 0', created_by=user)
+    categories = [root]
+    level = [root]
+    depth = 0
+    while level and children(depth):
+        next_level = []
+        for parent in level:
+            for i in range(children(depth)):
+                next_level.append(Category.objects.create(
+                    name=f'{parent.name}.{i}', parent=parent, created_by=user))
+        categories.extend(next_level)
+        level = next_level
+        depth += 1
+    return categories
+
+
+def get_subtree_articles_recursive(category):
+    """Return ids of articles in category and its descendants walking the tree in Python."""
+    ids = []
+    pending = [category.pk]
+    while pending:
+        pk = pending.pop()
+        ids.extend(Article.objects.filter(category_id=pk).values_list('pk', flat=True))
+        pending.extend(Category.objects.filter(parent_id=pk).values_list('pk', flat=True))
+    return ids
+
+
+def get_subtree_articles(category):
+    """Return ids of articles in category and its descendants with one path range query."""
+    return list(Article.objects.filter(
+        Category.subtree_q([category.path], prefix='category__')).values_list('pk', flat=True))
+
+
+def _time(func, repeat, *args):
+    """Return (latencies in ms, number of queries of last call, result of last call)."""
+    latencies = []
+    for _ in range(repeat):
+        # the query log only keeps a limited number of queries
+        connection.queries_log.clear()
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            result = func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, len(queries), result
+
+
+def run_benchmark(shapes, articles=20000, repeat=20, seed=0):
+    """Yield result dict for each way of finding a subtree's articles for each tree shape."""
+    rng = random.Random(seed)
+    client = Client()
+    for shape in shapes:
+        user = User.objects.create_user(f'benchmark_category_{shape}')
+        categories = build_tree(user, shape)
+        # seeded articles favour the first categories so spread them over the tree
+        category_ids = [c.pk for c in categories]
+        rng.shuffle(category_ids)
+        with transaction.atomic():
+            Article.objects.bulk_create(
+                _make_articles(user, category_ids, 0, articles, rng, timezone.now()),
+                batch_size=5000)
+        ArticleListVersion.bump(user.id)
+
+        base = {'shape': shape, 'categories': len(categories),
+                'depth': max(c.depth for c in categories) + 1, 'articles': articles}
+        # the whole tree and the subtree under the first child of the root
+        for position, category in (('root', categories[0]), ('child', categories[1])):
+            expected = None
+            for method, func in (('path_range', get_subtree_articles),
+                                 ('recursive', get_subtree_articles_recursive)):
+                latencies, queries, ids = _time(func, repeat, category)
+                if expected is None:
+                    expected = sorted(ids)
+                assert sorted(ids) == expected, 'methods found different articles'
+                yield dict(base, subtree=position, method=method, matched=len(ids),
+                           queries=queries,
+                           p50_ms=round(_percentile(latencies, 50), 3),
+                           p95_ms=round(_percentile(latencies, 95), 3))
+
+        # settings page lists the whole tree in order
+        client.force_login(user)
+        url = reverse('settings')
+        latencies, queries, response = _time(client.get, repeat, url)
+        assert response.status_code == 200
+        yield dict(base, view='settings', queries=queries,
+                   p50_ms=round(_percentile(latencies, 50), 3),
+                   p95_ms=round(_percentile(latencies, 95), 3))
+
+
+class Command(BenchmarkCommand):
+    help = ('Compare finding articles in a category and all its sub-categories using '
+            'category paths against walking the tree in Python, on deep and wide '
+            'trees in a temporary test database.  Results are reported as JSON lines.')
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--shapes', nargs='+', choices=list(SHAPES), default=list(SHAPES),
+                            help='Category tree shapes to benchmark.')
+        parser.add_argument('--articles', type=int, default=20000,
+                            help='Number of articles spread over each tree.')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Number of timed runs per measurement.')
+
+    def get_results(self, **options):
+        return run_benchmark(options['shapes'], articles=options['articles'],
+                             repeat=options['repeat'])
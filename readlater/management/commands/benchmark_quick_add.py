@@ -0,0 +1,80 @@
+import json
+import time
+
+from django.test import Client
+from django.urls import reverse
+
+from readlater.management.benchmark import BenchmarkCommand
+from readlater.management.commands.benchmark_asgi import _summary
+from readlater.management.commands.seed_articles import seed_articles
+from readlater.models import ApiToken, Article
+
+FLOWS = ('quick_add', 'quick_add_batch', 'create_form')
+
+
+def _quick_add(client, token, urls):
+    response = client.post(reverse('api_quick_add'),
+                           data=json.dumps([{'url': url} for url in urls]),
+                           content_type='application/json',
+                           HTTP_AUTHORIZATION=f'Token {token}')
+    return [response.status_code]
+
+
+def _create_form(client, urls):
+    """Open the form, post it and follow the redirect to the list, as a browser."""
+    statuses = []
+    for url in urls:
+        statuses.append(client.get(reverse('article_create_form')).status_code)
+        statuses.append(client.post(reverse('article_create_form'), follow=True,
+                                    data={'name': url, 'url': url,
+                                          'priority': Article.PRIORITY_NORMAL}).status_code)
+    return statuses
+
+
+def run_benchmark(articles=10000, requests=100, batch_size=10, flows=FLOWS, seed=0):
+    """
+    Yield result dict for each way of saving articles in flows, timing
+    requests saves of new urls with batch_size urls in each 'quick_add_batch'
+    request.
+    """
+    user = seed_articles(1, 10, articles, prefix='benchmark_quick_add', seed=seed)[0]
+    token = ApiToken.create_for_user(user)
+    client = Client()
+    client.force_login(user)
+    for flow in flows:
+        per_request = batch_size if flow == 'quick_add_batch' else 1
+        latencies = []
+        statuses = []
+        start = time.perf_counter()
+        for i in range(requests):
+            urls = [f'https://benchmark.example.org/{flow}/{i}/{j}' for j in range(per_request)]
+            request_start = time.perf_counter()
+            if flow == 'create_form':
+                statuses.extend(_create_form(client, urls))
+            else:
+                statuses.extend(_quick_add(client, token, urls))
+            latencies.append((time.perf_counter() - request_start) * 1000)
+        elapsed = time.perf_counter() - start
+        result = {'flow': flow, 'articles': articles, 'urls_per_request': per_request}
+        result.update(_summary(latencies, statuses, elapsed))
+        yield result
+
+
+class Command(BenchmarkCommand):
+    help = ('Compare latency of saving a link with the token authenticated '
+            'quick-add endpoint, singly and in batches, against opening and '
+            'posting the article form, in a temporary test database.  Results '
+            'are reported as JSON lines.')
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--articles', type=int, default=10000,
+                            help='Number of articles of the benchmark user.')
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Number of timed saves per flow.')
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Number of urls per batch quick-add request.')
+
+    def get_results(self, **options):
+        return run_benchmark(options['articles'], requests=options['requests'],
+                             batch_size=options['batch_size'])
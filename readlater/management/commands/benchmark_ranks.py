@@ -0,0 +1,102 @@
+import random
+import time
+
+from django.db.models import F
+
+from readlater.management.benchmark import BenchmarkCommand
+from readlater.management.commands.benchmark_views import _percentile
+from readlater.management.commands.seed_articles import seed_articles
+from readlater.models import Article
+from readlater.ranking import get_min_rank_gap, move_article, rebalance_ranks, set_ranks
+
+
+def _summary(name, latencies, rows_written):
+    return {
+        'operation': name,
+        'moves': len(latencies),
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'rows_written_per_move': round(sum(rows_written) / len(rows_written), 1),
+    }
+
+
+def benchmark_moves(user, moves, rng):
+    """Time moving random articles after other random articles using gap ranks."""
+    pks = list(Article.objects.filter(created_by=user).values_list('pk', flat=True))
+    latencies = []
+    rows_written = []
+    for _ in range(moves):
+        article_pk, target_pk = rng.sample(pks, 2)
+        start = time.perf_counter()
+        articles = Article.objects.filter(pk__in=[article_pk, target_pk]).only(
+            'id', 'rank', 'created_by')
+        articles = {a.pk: a for a in articles}
+        # one row unless room had to be made after the target
+        rows_written.append(move_article(articles[article_pk], after=articles[target_pk]))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return _summary('gap_rank_move', latencies, rows_written)
+
+
+def benchmark_renumber_moves(user, moves, rng):
+    """
+    Time the same kind of moves when ranks are consecutive positions, which
+    needs every article between the old and new position renumbered.
+    """
+    pks = list(Article.objects.filter(created_by=user).order_by('rank', 'pk').values_list(
+        'pk', flat=True))
+    n = len(pks)
+    latencies = []
+    rows_written = []
+    for _ in range(moves):
+        old, new = rng.sample(range(n), 2)
+        start = time.perf_counter()
+        queryset = Article.objects.filter(created_by=user)
+        if old < new:
+            count = queryset.filter(rank__gt=old, rank__lte=new).update(rank=F('rank') - 1)
+        else:
+            count = queryset.filter(rank__gte=new, rank__lt=old).update(rank=F('rank') + 1)
+        # moved article itself, looked up by pk as its position was taken
+        Article.objects.filter(pk=pks[old]).update(rank=new)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rows_written.append(count + 1)
+    return _summary('renumber_move', latencies, rows_written)
+
+
+def run_benchmark(sizes, moves=200, seed=0):
+    """Yield result dict for each operation at each number of articles in sizes."""
+    rng = random.Random(seed)
+    for size in sorted(sizes):
+        user = seed_articles(1, 5, size, prefix='benchmark_rank', seed=seed)[0]
+        base = {'articles': size, 'min_gap_before': get_min_rank_gap(user.id)}
+
+        start = time.perf_counter()
+        rebalance_ranks(user.id)
+        yield dict(base, operation='rebalance',
+                   seconds=round(time.perf_counter() - start, 3))
+
+        yield dict(base, **benchmark_moves(user, moves, rng))
+
+        # renumbering needs ranks to be positions 0..n-1
+        pks = Article.objects.filter(created_by=user).order_by('rank', 'pk').values_list(
+            'pk', flat=True)
+        set_ranks((pk, position) for position, pk in enumerate(list(pks)))
+        yield dict(base, **benchmark_renumber_moves(user, moves, rng))
+
+        # leave gaps for the next size
+        rebalance_ranks(user.id)
+
+
+class Command(BenchmarkCommand):
+    help = ('Compare moving articles in the manually ordered list using gap ranks '
+            'against renumbering positions, in a temporary test database.  Results '
+            'are reported as JSON lines.')
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--sizes', type=int, nargs='+', default=[50000],
+                            help='Numbers of articles to benchmark at.')
+        parser.add_argument('--moves', type=int, default=200,
+                            help='Number of timed moves per size.')
+
+    def get_results(self, **options):
+        return run_benchmark(options['sizes'], moves=options['moves'])
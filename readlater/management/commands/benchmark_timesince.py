@@ -0,0 +1,75 @@
+import json
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+
+from readlater.templatetags.only_days import nice_timesince, nice_timesince_batch
+
+
+def nice_timesince_original(value, utc_offset=0):
+    """Copy of nice_timesince before the unit table was precomputed."""
+    if not isinstance(value, datetime):
+        return value
+
+    dt = datetime.now(timezone(timedelta(hours=utc_offset))) - value
+    secs = dt.total_seconds()
+
+    tunits_sm = {
+        'yr': 365.25 * 24 * 3600,
+        'mon': 30 * 24 * 3600,
+        'wk': 7 * 24 * 3600,
+        'd': 24 * 3600,
+        'h': 3600,
+        'min': 60,
+        'sec': 1
+    }
+    for u, s in tunits_sm.items():
+        sdiv = secs / s
+        if sdiv > 1:
+            ustr = u
+            return f'{int(sdiv)} {ustr}'
+    else:
+        return '0 seconds ago'
+
+
+def make_column(rows, seed=0):
+    """Return list of datetimes spread over the last two years with some None."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    return [None if rng.random() < 0.2 else now - timedelta(seconds=rng.uniform(0, 2 * 365 * 86400))
+            for _ in range(rows)]
+
+
+def run_benchmark(rows=10000, repeat=5):
+    """Yield result dict with the best per row cost of each implementation."""
+    column = make_column(rows)
+    now = datetime.now(timezone.utc)
+    impls = {
+        'original': lambda: [nice_timesince_original(v) for v in column],
+        'filter': lambda: [nice_timesince(v) for v in column],
+        'batch': lambda: nice_timesince_batch(column, now),
+    }
+    base = None
+    for name, func in impls.items():
+        ns_per_row = min(timeit.repeat(func, number=1, repeat=repeat)) / rows * 1e9
+        base = base or ns_per_row
+        yield {'implementation': name, 'rows': rows, 'ns_per_row': round(ns_per_row, 1),
+               'speedup': round(base / ns_per_row, 2)}
+
+
+class Command(BaseCommand):
+    help = ('Compare the per row cost of computing the relative times shown in the '
+            'article list with the original nice_timesince filter (reads the clock '
+            'and rebuilds its unit tables for each value), the current filter and '
+            'the batch function used by ArticleList, which computes a whole column '
+            'using one "now".  Results are reported as JSON lines.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Rows per column.')
+        parser.add_argument('--repeat', type=int, default=5, help='Number of timing runs.')
+
+    def handle(self, *args, **options):
+        for result in run_benchmark(options['rows'], options['repeat']):
+            self.stdout.write(json.dumps(result))
@@ -0,0 +1,141 @@
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from readlater import urls
+from readlater.management.benchmark import BenchmarkCommand
+from readlater.models import Article, Category
+from readlater.management.commands.seed_articles import seed_articles
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+
+def get_benchmark_urls(user):
+    """
+    Return list of (url name, url) for each page in readlater/urls.py which
+    answers GET requests, using one of user's articles or categories for urls
+    which need a primary key.
+    """
+    article = Article.objects.filter(created_by=user).order_by('id').first()
+    category = Category.objects.filter(created_by=user).order_by('id').first()
+    result = []
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is not None and 'get' not in view_class.http_method_names:
+            # form endpoints which only accept POST
+            continue
+        if 'state' in pattern.pattern.converters:
+            for state in ('unread', 'read'):
+                result.append((f'{pattern.name}:{state}',
+                               reverse(pattern.name, kwargs={'state': state})))
+        elif 'pk' in pattern.pattern.converters:
+            obj = category if pattern.name.startswith('category') else article
+            if obj is not None:
+                result.append((pattern.name, reverse(pattern.name, kwargs={'pk': obj.pk})))
+        else:
+            result.append((pattern.name, reverse(pattern.name)))
+    return result
+
+
+def _percentile(values, percent):
+    """Return percentile of values using linear interpolation."""
+    values = sorted(values)
+    pos = (len(values) - 1) * percent / 100
+    lower = int(pos)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (pos - lower)
+
+
+def benchmark_url(client, url, requests=20, warm=False):
+    """
+    Time GET requests for url.
+
+    :param client: Logged in test client.
+    :type client: Client
+    :param url: URL to request.
+    :type url: str
+    :param requests: Number of timed requests.
+    :type requests: int
+    :param warm: If False the cache is cleared before each request.
+    :type warm: bool
+    :return: Dict of results.
+    :rtype: dict
+    """
+    latencies = []
+    status = None
+    for _ in range(requests):
+        if not warm:
+            cache.clear()
+        start = time.perf_counter()
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        latencies.append((time.perf_counter() - start) * 1000)
+        status = response.status_code
+
+    # separate request for queries and memory as tracing slows requests down
+    if not warm:
+        cache.clear()
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'status': status,
+        'requests': requests,
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'queries': len(queries),
+        'peak_memory_kib': round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(sizes, categories=20, requests=20, warm=False, seed=0):
+    """
+    Yield result dict for each url at each number of articles in sizes.
+
+    Articles are added to a single seeded user so each size reuses the articles
+    created for the previous size.
+    """
+    client = Client()
+    for size in sorted(sizes):
+        seed_start = time.perf_counter()
+        user = seed_articles(1, categories, size, prefix='benchmark', seed=seed)[0]
+        seed_time = time.perf_counter() - seed_start
+        client.force_login(user)
+        for name, url in get_benchmark_urls(user):
+            result = {'articles': size, 'categories': categories, 'url_name': name,
+                      'url': url, 'warm_cache': warm, 'seed_seconds': round(seed_time, 3)}
+            result.update(benchmark_url(client, url, requests=requests, warm=warm))
+            yield result
+
+
+class Command(BenchmarkCommand):
+    help = ('Time each readlater page at increasing numbers of articles in a '
+            'temporary test database and report results as JSON lines.')
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                            help='Numbers of articles to benchmark at.')
+        parser.add_argument('--categories', type=int, default=20,
+                            help='Number of categories.')
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Number of timed requests per url.')
+        parser.add_argument('--warm', action='store_true',
+                            help='Leave cache between requests (default clears it).')
+
+    def get_results(self, **options):
+        return run_benchmark(options['sizes'], categories=options['categories'],
+                             requests=options['requests'], warm=options['warm'])
@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from readlater.models import ApiToken
+
+
+class Command(BaseCommand):
+    help = ('Create a quick-add token for a user, replacing any earlier one, and '
+            'print it.  The token is not stored so can not be shown again.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User to create the token for.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist.')
+        self.stdout.write(ApiToken.create_for_user(user))
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from readlater.exporters import CHUNK_SIZE, FORMATS, export_articles
+
+
+class Command(BaseCommand):
+    help = "Export a user's categories and articles as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User to export articles for.')
+        parser.add_argument('--format', choices=FORMATS, default='csv',
+                            help='File format (default csv).')
+        parser.add_argument('--gzip', action='store_true',
+                            help='Compress output with gzip, requires --output.')
+        parser.add_argument('-o', '--output', default=None,
+                            help='File to write to (default standard output).')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Number of rows fetched from the database at a time.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist.')
+        if options['gzip'] and not options['output']:
+            raise CommandError('--gzip requires --output.')
+
+        chunks = export_articles(user, options['format'], compress=options['gzip'],
+                                 chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode('utf-8'), ending='')
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from readlater.metadata import FETCH_BATCH_SIZE, FETCH_CONCURRENCY, FETCH_TIMEOUT, \
+    PER_HOST_CONNECTIONS, fetch_pending_metadata
+
+
+class Command(BaseCommand):
+    help = ('Fetch the pages of articles waiting for their title, canonical URL, '
+            'word count and reading time, reporting pages per second and the '
+            'number still queued after each batch.  Stops once none are left '
+            'unless --watch is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=FETCH_BATCH_SIZE,
+                            help='Number of articles fetched per batch.')
+        parser.add_argument('--concurrency', type=int, default=FETCH_CONCURRENCY,
+                            help='Number of pages fetched at once.')
+        parser.add_argument('--per-host', type=int, default=PER_HOST_CONNECTIONS,
+                            help='Number of pages fetched at once from one host.')
+        parser.add_argument('--timeout', type=float, default=FETCH_TIMEOUT,
+                            help='Seconds allowed for fetching one page.')
+        parser.add_argument('--watch', type=float, default=None, metavar='SECONDS',
+                            help='Keep running, checking for new articles this often.')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = fetch_pending_metadata(options['batch_size'], options['concurrency'],
+                                           options['per_host'], options['timeout'])
+            if stats['fetched'] or stats['failed']:
+                self.stdout.write(
+                    f'Fetched {stats["fetched"]} pages ({stats["failed"]} failed) in '
+                    f'{stats["seconds"]}s, {stats["pages_per_second"]} pages/s, '
+                    f'{stats["queued"]} queued')
+            elif options['watch'] is None:
+                break
+            else:
+                time.sleep(options['watch'])
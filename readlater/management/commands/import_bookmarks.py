@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from readlater.importers import FORMATS, guess_format, import_articles
+
+
+class Command(BaseCommand):
+    help = ('Import bookmarks for a user from a Netscape bookmark or Pocket HTML '
+            'export, CSV or JSON Lines file.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='User to import articles for.')
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument('--format', choices=FORMATS, default=None,
+                            help='File format (default guess from file extension).')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of articles inserted per transaction.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist.')
+
+        file_format = options['format'] or guess_format(options['path'])
+        if file_format is None:
+            raise CommandError(f'Cannot guess format of "{options["path"]}", use --format.')
+
+        with open(options['path'], encoding='utf-8', newline='') as stream:
+            result = import_articles(user, stream, file_format,
+                                     batch_size=options['batch_size'])
+        self.stdout.write(str(result))
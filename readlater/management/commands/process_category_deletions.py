@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from readlater.categories import DELETE_BATCH_SIZE, process_deleted_categories
+
+
+class Command(BaseCommand):
+    help = ('Move articles of deleted categories and remove the categories.  Needed '
+            'when READLATER_BACKGROUND_TASKS is "command", and picks up deletions '
+            'left unfinished by a stopped process otherwise.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DELETE_BATCH_SIZE,
+                            help='Number of articles moved per transaction.')
+
+    def handle(self, *args, **options):
+        for category_id, moved in process_deleted_categories(options['batch_size']):
+            self.stdout.write(f'Deleted category {category_id}, moved {moved} articles')
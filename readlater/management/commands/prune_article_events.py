@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from readlater.events import EVENTS_MAX_AGE, prune_events
+
+
+class Command(BaseCommand):
+    help = ('Delete article change events older than --max-age seconds.  Run '
+            'periodically, eg. from cron or a scheduler.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=EVENTS_MAX_AGE,
+                            help='Age in seconds of the oldest events to keep.')
+
+    def handle(self, *args, **options):
+        deleted = prune_events(options['max_age'])
+        self.stdout.write(f'Deleted {deleted} article events')
@@ -0,0 +1,43 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from readlater.models import ArticleListVersion
+from readlater.ranking import MIN_RANK_GAP, get_users_to_rebalance, rebalance_ranks
+
+
+class Command(BaseCommand):
+    help = ('Re-space article ranks of users whose manually ordered lists are '
+            'running out of room between articles.  Meant to be run periodically '
+            '(eg. from cron or a scheduler) so moving articles stays a single row write.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default=None,
+                            help='Only check this user (default all users).')
+        parser.add_argument('--min-gap', type=int, default=MIN_RANK_GAP,
+                            help=f'Rebalance lists with a smaller gap (default {MIN_RANK_GAP}).')
+        parser.add_argument('--force', action='store_true',
+                            help='Rebalance whatever the current gaps.')
+
+    def handle(self, *args, **options):
+        if options['username']:
+            try:
+                user_ids = [User.objects.get(username=options['username']).id]
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["username"]}" does not exist.')
+            if not options['force']:
+                user_ids = [user_id for user_id in get_users_to_rebalance(options['min_gap'])
+                            if user_id in user_ids]
+        elif options['force']:
+            user_ids = User.objects.filter(article__isnull=False).distinct().values_list(
+                'id', flat=True)
+        else:
+            user_ids = get_users_to_rebalance(options['min_gap'])
+
+        for user_id in user_ids:
+            start = time.perf_counter()
+            count = rebalance_ranks(user_id)
+            ArticleListVersion.bump(user_id)
+            self.stdout.write(f'Rebalanced {count} articles for user {user_id} in '
+                              f'{time.perf_counter() - start:.2f} s')
@@ -0,0 +1,158 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from readlater.models import Article, ArticleListVersion, Category, get_url_hash
+from readlater.ranking import get_next_ranks
+from readlater.registry import category_registry
+
+# relative frequency of each priority, most articles are left at 'Normal'
+PRIORITY_WEIGHTS = {
+    Article.PRIORITY_HIGHER: 5,
+    Article.PRIORITY_HIGH: 15,
+    Article.PRIORITY_NORMAL: 50,
+    Article.PRIORITY_LOW: 20,
+    Article.PRIORITY_LOWER: 10,
+}
+
+# fraction of articles which are finished, not started and uncategorized
+READ_FRACTION = 0.35
+UNSTARTED_FRACTION = 0.45
+UNCATEGORIZED_FRACTION = 0.1
+
+# mean age of an article in days
+MEAN_AGE_DAYS = 120
+
+
+def _make_articles(user, category_ids, start, count, rng, now):
+    """Yield unsaved Article records for user numbered from start."""
+    priorities = list(PRIORITY_WEIGHTS)
+    priority_weights = list(PRIORITY_WEIGHTS.values())
+    # a few categories hold most of the articles
+    category_weights = [1 / (i + 1) for i in range(len(category_ids))]
+
+    for n in range(start, start + count):
+        added_time = now - timedelta(days=rng.expovariate(1 / MEAN_AGE_DAYS))
+
+        r = rng.random()
+        if r < READ_FRACTION:
+            progress = 100
+        elif r < READ_FRACTION + UNSTARTED_FRACTION:
+            progress = 0
+        else:
+            progress = rng.randint(1, 99)
+
+        updated_time = finished_time = None
+        if progress > 0:
+            updated_time = added_time + (now - added_time) * rng.random()
+            if progress == 100:
+                finished_time = updated_time
+
+        category_id = None
+        if category_ids and rng.random() >= UNCATEGORIZED_FRACTION:
+            category_id = rng.choices(category_ids, category_weights)[0]
+
+        url = f'https://example.com/{user.username}/{n}'
+        yield Article(name=f'{user.username} article {n}',
+                      url=url,
+                      url_hash=get_url_hash(url),
+                      notes='' if rng.random() < 0.7 else f'Note {n}',
+                      category_id=category_id,
+                      priority=rng.choices(priorities, priority_weights)[0],
+                      progress=progress,
+                      added_time=added_time,
+                      updated_time=updated_time,
+                      finished_time=finished_time,
+                      created_by=user)
+
+
+def seed_articles(users, categories, articles, prefix='seed', batch_size=5000,
+                  seed=None):
+    """
+    Create users each with categories and articles.
+
+    Existing seeded users, categories and articles are reused so calling this
+    again with a larger number of articles only adds the difference.
+
+    :param users: Number of users.
+    :type users: int
+    :param categories: Number of categories per user.
+    :type categories: int
+    :param articles: Number of articles per user.
+    :type articles: int
+    :param prefix: Prefix for seeded user names.
+    :type prefix: str
+    :param batch_size: Number of articles inserted per query.
+    :type batch_size: int
+    :param seed: Random number generator seed.
+    :type seed: int
+    :return: List of seeded users.
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    seeded_users = []
+    for user_index in range(users):
+        user, created = User.objects.get_or_create(username=f'{prefix}_user_{user_index}')
+        if created:
+            user.set_unusable_password()
+            user.save()
+        seeded_users.append(user)
+
+        existing = Category.objects.filter(created_by=user).count()
+        Category.objects.bulk_create(
+            [Category(name=f'Category {i}', created_by=user)
+             for i in range(existing, categories)])
+        # bulk_create does not call save() which sets the tree path, or send signals
+        Category.fill_root_paths(Category.objects.filter(created_by=user))
+        category_registry.invalidate(user.id)
+        category_ids = list(Category.objects.filter(
+            created_by=user).order_by('id').values_list('id', flat=True)[:categories])
+
+        start = Article.objects.filter(created_by=user).count()
+        remaining = articles - start
+        while remaining > 0:
+            count = min(batch_size, remaining)
+            new_articles = list(_make_articles(user, category_ids, start, count, rng, now))
+            for article, rank in zip(new_articles, get_next_ranks(user.id, count)):
+                article.rank = rank
+            with transaction.atomic():
+                Article.objects.bulk_create(new_articles, batch_size=batch_size)
+            start += count
+            remaining -= count
+
+        # bulk_create does not send signals
+        ArticleListVersion.bump(user.id)
+
+    return seeded_users
+
+
+class Command(BaseCommand):
+    help = 'Create users with categories and articles for testing and benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1, help='Number of users.')
+        parser.add_argument('--categories', type=int, default=10,
+                            help='Number of categories per user.')
+        parser.add_argument('--articles', type=int, default=1000,
+                            help='Number of articles per user.')
+        parser.add_argument('--prefix', default='seed', help='Prefix for user names.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Number of articles inserted per query.')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Random number generator seed.')
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        users = seed_articles(options['users'], options['categories'], options['articles'],
+                              prefix=options['prefix'], batch_size=options['batch_size'],
+                              seed=options['seed'])
+        elapsed = time.perf_counter() - start_time
+        self.stdout.write(f'Seeded {len(users)} users with {options["categories"]} '
+                          f'categories and {options["articles"]} articles each '
+                          f'in {elapsed:.1f} s.')
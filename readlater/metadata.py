@@ -0,0 +1,357 @@
+"""
+Fetching the title, canonical URL, word count and reading time of saved pages.
+
+Articles with no metadata_time are waiting for their page to be fetched.  The
+fetch_article_metadata command takes them a batch at a time and fetches the
+pages from a pool of threads.  At most READLATER_METADATA_PER_HOST requests
+go to any one host at once, so a batch of links to one site does not flood
+it, and each request is given up after READLATER_METADATA_TIMEOUT seconds.
+Pages are only fetched from public addresses, also after redirects, so
+saved links can not be used to reach the server's own network unless
+READLATER_METADATA_ALLOW_PRIVATE is set.  Connections are made to the
+address which was checked so a host can not answer the check with a public
+address and the connection with a private one.
+The worker threads only fetch and parse pages, results are saved by the
+calling thread.
+
+Pages which can not be fetched get a metadata_error rather than being tried
+again.  Changing an article's url queues it to be fetched again.
+"""
+import collections
+import ipaddress
+import logging
+import math
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+from urllib.request import HTTPHandler, HTTPRedirectHandler, HTTPSHandler, ProxyHandler, \
+    Request, build_opener
+
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Article, ArticleListVersion
+
+logger = logging.getLogger(__name__)
+
+# number of articles fetched by each call of fetch_pending_metadata
+FETCH_BATCH_SIZE = getattr(settings, 'READLATER_METADATA_BATCH_SIZE', 100)
+# number of pages fetched at once
+FETCH_CONCURRENCY = getattr(settings, 'READLATER_METADATA_CONCURRENCY', 16)
+# number of pages fetched at once from the same host
+PER_HOST_CONNECTIONS = getattr(settings, 'READLATER_METADATA_PER_HOST', 2)
+# seconds allowed for fetching one page
+FETCH_TIMEOUT = getattr(settings, 'READLATER_METADATA_TIMEOUT', 10)
+
+# larger pages are not read
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+WORDS_PER_MINUTE = 230
+USER_AGENT = 'readlater-metadata/1.0'
+
+# elements whose text is not part of what is read
+NON_CONTENT_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'nav', 'aside',
+                    'form', 'iframe']
+
+
+class MetadataError(Exception):
+    """Page could not be fetched, message is saved as the article's metadata_error."""
+
+
+class HostLimiter:
+    """Limits the number of requests made to each host at once."""
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def get(self, url):
+        """Return semaphore to hold while requesting url."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+
+def _resolve(host, port):
+    """Return list of the IP addresses of host."""
+    return [info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)]
+
+
+def _is_public_address(address):
+    address = ipaddress.ip_address(address.split('%', 1)[0])
+    if address.version == 6 and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+    # is_global is False for private, loopback, link-local and reserved addresses
+    return address.is_global and not address.is_multicast
+
+
+def _create_public_connection(address, timeout, source_address):
+    """
+    Return socket connected to one of the addresses of host (host, port), as
+    socket.create_connection(), unless READLATER_METADATA_ALLOW_PRIVATE is set
+    only if all of them are public.
+
+    :raises MetadataError: If host has an address which is not public.
+    """
+    host, port = address
+    try:
+        addresses = _resolve(host, port)
+    except (UnicodeError, ValueError) as e:
+        raise MetadataError(f'host could not be resolved ({e})')
+    if not getattr(settings, 'READLATER_METADATA_ALLOW_PRIVATE', False) and \
+            not all(_is_public_address(address) for address in addresses):
+        raise MetadataError('not a public address')
+    error = OSError(f'no addresses for {host}')
+    for address in addresses:
+        try:
+            return socket.create_connection((address, port), timeout, source_address)
+        except OSError as e:
+            error = e
+    raise error
+
+
+class PublicHTTPConnection(HTTPConnection):
+    """HTTPConnection to a checked address, the Host header keeps the host name."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+
+class PublicHTTPSConnection(HTTPSConnection):
+    """HTTPSConnection to a checked address, SNI and certificate use the host name."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+
+class PublicHTTPHandler(HTTPHandler):
+    """HTTPHandler opening PublicHTTPConnections."""
+
+    def do_open(self, http_class, req, **http_conn_args):
+        return super().do_open(PublicHTTPConnection, req, **http_conn_args)
+
+
+class PublicHTTPSHandler(HTTPSHandler):
+    """HTTPSHandler opening PublicHTTPSConnections."""
+
+    def do_open(self, http_class, req, **http_conn_args):
+        return super().do_open(PublicHTTPSConnection, req, **http_conn_args)
+
+
+def check_url(url):
+    """Raise MetadataError if url is not http or https."""
+    if urlsplit(url).scheme not in ('http', 'https'):
+        raise MetadataError('not an http or https url')
+
+
+class CheckedRedirectHandler(HTTPRedirectHandler):
+    """
+    Follows redirects only to urls passing check_url(), the address of each
+    is checked by PublicHTTPHandler or PublicHTTPSHandler.
+    """
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        try:
+            check_url(newurl)
+        except MetadataError:
+            fp.close()
+            raise
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def build_page_opener():
+    """Return opener for pages, see module docstring."""
+    # no proxies as the address connected to would be the proxy's
+    return build_opener(ProxyHandler({}), PublicHTTPHandler, PublicHTTPSHandler,
+                        CheckedRedirectHandler)
+
+
+def fetch_page(url, timeout=FETCH_TIMEOUT):
+    """
+    Return (url after redirects, content, charset or None) of the HTML page at url.
+
+    :raises MetadataError: If the url or a redirect is not http or https or
+        its host has an address which is not public, or the page could not be
+        fetched within timeout seconds, is not HTML or is larger than
+        MAX_PAGE_BYTES.
+    """
+    check_url(url)
+    deadline = time.monotonic() + timeout
+    request = Request(url, headers={'User-Agent': USER_AGENT, 'Accept': 'text/html'})
+    try:
+        with build_page_opener().open(request, timeout=timeout) as response:
+            content_type = response.headers.get_content_type()
+            if content_type not in ('text/html', 'application/xhtml+xml'):
+                raise MetadataError(f'not an HTML page ({content_type})')
+            chunks = []
+            size = 0
+            while True:
+                chunk = response.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_PAGE_BYTES:
+                    raise MetadataError('page is too large')
+                # the socket timeout applies to each read, not the whole page
+                if time.monotonic() > deadline:
+                    raise MetadataError('timed out')
+                chunks.append(chunk)
+            return response.geturl(), b''.join(chunks), response.headers.get_content_charset()
+    except HTTPError as e:
+        raise MetadataError(f'HTTP status {e.code}')
+    except (OSError, HTTPException, ValueError) as e:
+        # urllib's URLError and socket timeouts are OSErrors
+        raise MetadataError(str(getattr(e, 'reason', None) or e) or e.__class__.__name__)
+
+
+def _clean_text(text, max_length):
+    return ' '.join(text.split())[:max_length]
+
+
+def _get_meta(soup, prop):
+    tag = soup.find('meta', attrs={'property': prop})
+    return tag.get('content', '') if tag is not None else ''
+
+
+def parse_metadata(content, url, charset=None):
+    """
+    Return dict of Article field values for the page content fetched from url.
+
+    :param content: Page HTML.
+    :type content: bytes or str
+    :param charset: Encoding given by the response, else taken from the page.
+    :type charset: str
+    :return: Dict with 'page_title', 'canonical_url', 'word_count' and
+        'reading_time'.
+    :rtype: dict
+    """
+    soup = BeautifulSoup(content, 'html.parser', from_encoding=charset)
+
+    title = soup.title.get_text(' ') if soup.title is not None else ''
+    if not title.strip():
+        title = _get_meta(soup, 'og:title') or (soup.h1.get_text(' ') if soup.h1 else '')
+
+    canonical_url = ''
+    link = soup.find('link', rel='canonical')
+    for href in (link.get('href', '') if link is not None else '', _get_meta(soup, 'og:url')):
+        href = urljoin(url, href.strip()) if href.strip() else ''
+        if urlsplit(href).scheme in ('http', 'https') and \
+                len(href) <= Article._meta.get_field('canonical_url').max_length:
+            canonical_url = href
+            break
+
+    for tag in soup(NON_CONTENT_TAGS):
+        tag.decompose()
+    body = soup.body or soup
+    word_count = len(body.get_text(' ').split())
+
+    return {
+        'page_title': _clean_text(title, Article._meta.get_field('page_title').max_length),
+        'canonical_url': canonical_url,
+        'word_count': word_count,
+        'reading_time': math.ceil(word_count / WORDS_PER_MINUTE),
+    }
+
+
+def fetch_metadata(url, limiter, timeout=FETCH_TIMEOUT):
+    """
+    Return dict of Article field values for the page at url, with
+    'metadata_error' set if it could not be fetched.
+
+    :param limiter: Limiter shared by all threads fetching pages.
+    :type limiter: HostLimiter
+    """
+    with limiter.get(url):
+        try:
+            page_url, content, charset = fetch_page(url, timeout)
+        except MetadataError as e:
+            max_length = Article._meta.get_field('metadata_error').max_length
+            return {'metadata_error': str(e)[:max_length]}
+    # parsed once the host is free for the next request
+    values = parse_metadata(content, page_url, charset)
+    values['metadata_error'] = ''
+    return values
+
+
+def _interleave_hosts(pending):
+    """
+    Return pending (id, url, user id) reordered to take one url from each
+    host in turn, so threads are not all left waiting for the same host.
+    """
+    by_host = collections.OrderedDict()
+    for item in pending:
+        by_host.setdefault(urlsplit(item[1]).netloc.lower(), collections.deque()).append(item)
+    result = []
+    while by_host:
+        for host in list(by_host):
+            result.append(by_host[host].popleft())
+            if not by_host[host]:
+                del by_host[host]
+    return result
+
+
+def get_queue_depth():
+    """Return number of articles waiting for their metadata to be fetched."""
+    return Article.objects.filter(metadata_time__isnull=True).count()
+
+
+def fetch_pending_metadata(batch_size=None, concurrency=None, per_host=None, timeout=None):
+    """
+    Fetch and save metadata for the next batch_size articles waiting for it,
+    oldest first.
+
+    :return: Dict with the number of pages 'fetched' and 'failed', 'seconds'
+        taken, 'pages_per_second' and 'queued', the number of articles still
+        waiting.
+    :rtype: dict
+    """
+    batch_size = batch_size or FETCH_BATCH_SIZE
+    timeout = timeout or FETCH_TIMEOUT
+    pending = list(Article.objects.filter(metadata_time__isnull=True).order_by('id').values_list(
+        'id', 'url', 'created_by_id')[:batch_size])
+    limiter = HostLimiter(per_host or PER_HOST_CONNECTIONS)
+
+    start = time.perf_counter()
+    fetched = failed = 0
+    user_ids = set()
+    if pending:
+        with ThreadPoolExecutor(max_workers=concurrency or FETCH_CONCURRENCY) as executor:
+            futures = {executor.submit(fetch_metadata, url, limiter, timeout): (pk, url, user_id)
+                       for pk, url, user_id in _interleave_hosts(pending)}
+            for future in as_completed(futures):
+                pk, url, user_id = futures[future]
+                try:
+                    values = future.result()
+                except Exception:
+                    logger.exception('Reading page of article %s failed', pk)
+                    values = {'metadata_error': 'page could not be read'}
+                values['metadata_time'] = timezone.now()
+                # skipped if the url was changed while the page was fetched
+                if Article.objects.filter(pk=pk, url=url).update(**values):
+                    user_ids.add(user_id)
+                if values['metadata_error']:
+                    failed += 1
+                else:
+                    fetched += 1
+    # update does not send signals
+    for user_id in user_ids:
+        ArticleListVersion.bump(user_id)
+
+    seconds = time.perf_counter() - start
+    return {
+        'fetched': fetched,
+        'failed': failed,
+        'seconds': round(seconds, 3),
+        'pages_per_second': round((fetched + failed) / seconds, 1) if seconds else 0.0,
+        'queued': get_queue_depth(),
+    }
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readlater', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress__lt', 100)), fields=['created_by', 'priority', '-progress', '-added_time', 'id'], name='rl_unread_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress__lt', 100)), fields=['created_by', 'category', 'priority', 'updated_time', '-added_time', '-progress', 'id'], name='rl_unread_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress__lt', 100)), fields=['created_by', '-progress', 'priority', 'updated_time', '-added_time', '-category', 'id'], name='rl_unread_progress_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress', 100)), fields=['created_by', 'priority', '-added_time', 'id'], name='rl_read_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress', 100)), fields=['created_by', 'category', 'priority', 'updated_time', '-added_time', 'id'], name='rl_read_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress', 100)), fields=['created_by', 'priority', 'updated_time', '-added_time', '-category', 'id'], name='rl_read_progress_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress', 100)), fields=['created_by', '-finished_time', 'id'], name='rl_read_finished_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created_by', '-added_time', 'id'], name='rl_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created_by', '-updated_time', 'id'], name='rl_updated_idx'),
+        ),
+    ]
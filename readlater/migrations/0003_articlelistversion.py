@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('readlater', '0002_article_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleListVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.PositiveBigIntegerField(default=0, help_text='Change counter for user data.')),
+                ('changed_time', models.DateTimeField(default=django.utils.timezone.now, help_text='Timestamp for last change to user data.')),
+            ],
+        ),
+    ]
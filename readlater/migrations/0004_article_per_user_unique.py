@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+from readlater.models import get_url_hash
+
+
+def fill_url_hash(apps, schema_editor):
+    Article = apps.get_model('readlater', 'Article')
+    batch = []
+    for article in Article.objects.only('id', 'url').iterator(chunk_size=2000):
+        article.url_hash = get_url_hash(article.url)
+        batch.append(article)
+        if len(batch) == 2000:
+            Article.objects.bulk_update(batch, ['url_hash'])
+            batch = []
+    Article.objects.bulk_update(batch, ['url_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readlater', '0003_articlelistversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='url_hash',
+            field=models.CharField(default='', editable=False, help_text='Hash of normalized URL for finding duplicates.', max_length=40),
+        ),
+        migrations.RunPython(fill_url_hash, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='article',
+            name='name',
+            field=models.CharField(help_text='Name of article, unique for each user.', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created_by', 'url_hash'], name='rl_url_hash_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='article',
+            constraint=models.UniqueConstraint(fields=('created_by', 'name'), name='rl_unique_user_name'),
+        ),
+    ]
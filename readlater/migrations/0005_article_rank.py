@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:48
+
+from django.db import migrations, models
+import readlater.models
+
+
+def fill_rank(apps, schema_editor):
+    # existing articles are ranked in the order they were added
+    Article = apps.get_model('readlater', 'Article')
+    batch = []
+    for article in Article.objects.only('id', 'added_time').iterator(chunk_size=2000):
+        article.rank = readlater.models.get_time_rank(article.added_time)
+        batch.append(article)
+        if len(batch) == 2000:
+            Article.objects.bulk_update(batch, ['rank'])
+            batch = []
+    Article.objects.bulk_update(batch, ['rank'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readlater', '0004_article_per_user_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='rank',
+            field=models.BigIntegerField(default=readlater.models.get_default_rank, editable=False, help_text='Position in manually ordered list, lowest first.'),
+        ),
+        migrations.RunPython(fill_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress__lt', 100)), fields=['created_by', 'rank', 'id'], name='rl_unread_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('progress', 100)), fields=['created_by', 'rank', 'id'], name='rl_read_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created_by', 'rank'], name='rl_rank_idx'),
+        ),
+    ]
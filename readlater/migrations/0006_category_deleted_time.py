@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readlater', '0005_article_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='deleted_time',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Timestamp for when category was deleted.', null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='reassign_to',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Category articles are moved to when deleted.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='readlater.category'),
+        ),
+    ]
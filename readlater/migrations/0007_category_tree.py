@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:57
+
+from django.db import migrations, models
+from django.db.models.functions import Cast, LPad
+import django.db.models.deletion
+
+
+def fill_path(apps, schema_editor):
+    # existing categories are all top level
+    Category = apps.get_model('readlater', 'Category')
+    Category.objects.update(path=LPad(Cast('id', models.CharField()), 10, models.Value('0')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readlater', '0006_category_deleted_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='parent',
+            field=models.ForeignKey(blank=True, help_text='Category this is a sub-category of.', null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='children', to='readlater.category'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(default='', editable=False, help_text='Ids of ancestors and this category.', max_length=200),
+        ),
+        migrations.RunPython(fill_path, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='rl_category_path_idx'),
+        ),
+    ]
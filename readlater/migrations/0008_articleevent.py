@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:23
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('readlater', '0007_category_tree'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('article_id', models.PositiveIntegerField(blank=True, help_text='Id of changed article.', null=True)),
+                ('action', models.CharField(choices=[('created', 'Created'), ('changed', 'Changed'), ('deleted', 'Deleted'), ('reload', 'Reload')], help_text='What happened to the article.', max_length=10)),
+                ('fields', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Changed values as shown in the article list.')),
+                ('created_time', models.DateTimeField(default=django.utils.timezone.now, help_text='Timestamp for when event happened.')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='articleevent',
+            index=models.Index(fields=['user', 'id'], name='rl_event_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articleevent',
+            index=models.Index(fields=['created_time'], name='rl_event_time_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('readlater', '0008_articleevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiToken',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='auth.user')),
+                ('token_hash', models.CharField(editable=False, help_text='Hash of token.', max_length=64, unique=True)),
+                ('created_time', models.DateTimeField(default=django.utils.timezone.now, help_text='Timestamp for when token was created.')),
+            ],
+        ),
+    ]
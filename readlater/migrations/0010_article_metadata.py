@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readlater', '0009_apitoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='canonical_url',
+            field=models.URLField(blank=True, editable=False, help_text='Canonical URL given by the page.', max_length=400),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='metadata_error',
+            field=models.CharField(blank=True, editable=False, help_text='Why page metadata could not be fetched.', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='metadata_time',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Timestamp for when page metadata was fetched, empty until then.', null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='page_title',
+            field=models.CharField(blank=True, editable=False, help_text='Title of the page at url.', max_length=300),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='reading_time',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Estimated minutes to read the page.', null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='word_count',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Number of words in the page text.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('metadata_time__isnull', True)), fields=['id'], name='rl_metadata_pending_idx'),
+        ),
+    ]
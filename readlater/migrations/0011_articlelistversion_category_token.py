@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:55
+
+from django.db import migrations, models
+import readlater.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readlater', '0010_article_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articlelistversion',
+            name='category_token',
+            field=models.CharField(default=readlater.models.get_category_token, help_text="Generation of cached copies of the user's categories.", max_length=32),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readlater', '0011_articlelistversion_category_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articlelistversion',
+            name='pruned_event_id',
+            field=models.PositiveBigIntegerField(default=0, help_text='Id of the latest removed article event.'),
+        ),
+    ]
@@ -1,17 +1,163 @@
+import datetime
+import hashlib
+import secrets
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Cast, Concat, LPad, Substr
 from django.urls import reverse
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+class CategoryManager(models.Manager):
+    """Default manager for Category which leaves out categories being deleted."""
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_time__isnull=True)
+
+
+# Category.path is the ids of the category's ancestors and its own id, each zero
+# padded to this many digits.  Paths of digits only sort the same with any
+# database collation so a subtree is a range of the path index.
+PATH_SEGMENT_WIDTH = 10
+MAX_CATEGORY_DEPTH = 20
+
+
+def get_path_segment(pk):
+    """Return Category.path segment for category id pk."""
+    return str(pk).zfill(PATH_SEGMENT_WIDTH)
+
+
+def get_subtree_range(path):
+    """
+    Return (lowest, highest) path bounds, lowest inclusive and highest
+    exclusive, of the category with path and all its descendants.
+    """
+    last = path[-PATH_SEGMENT_WIDTH:]
+    return path, path[:-PATH_SEGMENT_WIDTH] + get_path_segment(int(last) + 1)
+
+
 class Category(models.Model):
-    """Article categories definitions."""
+    """
+    Article categories definitions.
+
+    Categories form a tree through 'parent'.  'path' is maintained on save so
+    a category and all its descendants are found with a single range query
+    on the path index, see Category.subtree_q().
+
+    Deleting a category first sets 'deleted_time', which hides it, then its
+    articles are moved to 'reassign_to' (or Uncategorized) in the background
+    before the record is removed, see readlater.categories.
+    """
     name = models.CharField(max_length=100, help_text='Category name.')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    parent = models.ForeignKey('self', related_name='children', null=True, blank=True,
+                               on_delete=models.RESTRICT,
+                               help_text='Category this is a sub-category of.')
+    path = models.CharField(max_length=PATH_SEGMENT_WIDTH * MAX_CATEGORY_DEPTH,
+                            editable=False, default='',
+                            help_text='Ids of ancestors and this category.')
+    deleted_time = models.DateTimeField(null=True, blank=True, editable=False,
+                                        help_text='Timestamp for when category was deleted.')
+    reassign_to = models.ForeignKey('self', related_name='+', null=True, blank=True,
+                                    editable=False, on_delete=models.SET_NULL,
+                                    help_text='Category articles are moved to when deleted.')
+
+    objects = CategoryManager()
+    # includes categories waiting for their articles to be reassigned
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['path'], name='rl_category_path_idx'),
+        ]
+
+    @property
+    def depth(self):
+        """Number of ancestors of category."""
+        return max(len(self.path) // PATH_SEGMENT_WIDTH - 1, 0)
+
+    @property
+    def ancestor_ids(self):
+        """Ids of ancestors of category from the root down."""
+        return [int(self.path[i:i + PATH_SEGMENT_WIDTH])
+                for i in range(0, len(self.path) - PATH_SEGMENT_WIDTH, PATH_SEGMENT_WIDTH)]
+
+    @staticmethod
+    def subtree_q(paths, prefix=''):
+        """
+        Return Q matching categories with any of paths and their descendants.
+
+        :param paths: Paths of subtree roots.
+        :type paths: iterable
+        :param prefix: Prefix for the path lookup, ie. 'category__' to filter articles.
+        :type prefix: str
+        :rtype: Q
+        """
+        q = models.Q(pk__in=[])
+        for path in paths:
+            lowest, highest = get_subtree_range(path)
+            q |= models.Q(**{f'{prefix}path__gte': lowest, f'{prefix}path__lt': highest})
+        return q
+
+    def get_descendants(self, include_self=False):
+        """Return queryset of categories below this one in the tree."""
+        queryset = Category.objects.filter(Category.subtree_q([self.path]))
+        if not include_self:
+            queryset = queryset.exclude(pk=self.pk)
+        return queryset
+
+    def save(self, *args, **kwargs):
+        """Save category then set path of it and, if moved, its descendants."""
+        old_path = self.path
+        super().save(*args, **kwargs)
 
-    # FIXME might be nice to add parent or children fields so we can represent a
-    #       hierarchy of categories
+        parent_path = self.parent.path if self.parent_id is not None else ''
+        new_path = parent_path + get_path_segment(self.pk)
+        if new_path == old_path:
+            return
+        self.path = new_path
+        if old_path:
+            # category and its descendants are moved with a single UPDATE
+            queryset = Category.all_objects.filter(Category.subtree_q([old_path]))
+            queryset.update(path=Concat(models.Value(new_path),
+                                        Substr('path', len(old_path) + 1)))
+        else:
+            Category.all_objects.filter(pk=self.pk).update(path=new_path)
+
+        # post_save was sent before the paths were written so drop any copy
+        # loaded in between, imported here as the registry imports models
+        from .registry import category_registry
+        category_registry.invalidate(self.created_by_id)
+
+    @staticmethod
+    def fill_root_paths(queryset):
+        """
+        Set path of top level categories in queryset which have none, ie. after
+        bulk_create() which does not call save().
+        """
+        queryset.filter(parent__isnull=True, path='').update(
+            path=LPad(Cast('id', models.CharField()), PATH_SEGMENT_WIDTH, models.Value('0')))
+
+    @staticmethod
+    def tree_order(categories):
+        """
+        Return categories sorted so each is followed by its descendants, with
+        categories under the same parent sorted by name.
+
+        :param categories: All of a user's categories, eg. from a single query.
+        :type categories: iterable
+        :rtype: list
+        """
+        categories = list(categories)
+        names = {categ.pk: categ.name for categ in categories}
+
+        def key(categ):
+            return [(names.get(pk, ''), pk) for pk in categ.ancestor_ids] + \
+                [(categ.name, categ.pk)]
+        return sorted(categories, key=key)
 
     def __str__(self):
         return f'{self.name}'
@@ -27,6 +173,62 @@ class Category(models.Model):
 #     return Category.get_uncategorized()
 
 
+# query parameters which only track where a link was found
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid'}
+
+
+def normalize_url(url):
+    """
+    Return url in a canonical form used to detect duplicate articles.
+
+    The scheme, fragment, 'www.' prefix, default ports, trailing slashes and
+    tracking query parameters are dropped, the host is lower cased and the
+    remaining query parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port not in (80, 443):
+        host = f'{host}:{port}'
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in TRACKING_PARAMS and not k.startswith(TRACKING_PARAM_PREFIXES))
+    return urlunsplit(('', host, parts.path.rstrip('/'), urlencode(query), ''))
+
+
+def get_url_hash(url):
+    """Return hash of normalized url as stored in Article.url_hash."""
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+# spacing between ranks after a rebalance, allows about 20 moves into the same
+# gap before ranks of neighbouring articles run out of room
+RANK_GAP = 2 ** 20
+
+_RANK_EPOCH = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def get_time_rank(value):
+    """Return rank for an article added at datetime value."""
+    return (value - _RANK_EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def get_default_rank():
+    """
+    Return rank for a new article which puts it after all existing articles.
+
+    Ranks are microseconds since 2000 so no query is needed to find the end of
+    the list.  Articles added a second apart are RANK_GAP apart, articles
+    created together are given ranks by readlater.ranking.get_next_ranks().
+    """
+    return get_time_rank(timezone.now())
+
+
 class Article(models.Model):
     """
     Model definition for an article to be read later.
@@ -34,6 +236,8 @@ class Article(models.Model):
     Explanation of 'rank'' field:
       To allow the articles to be re-ordered by the user the 'rank' field with lower
       rank meaning the article should be closer to the top of the viewable list.
+      Ranks are spaced out so moving an article only changes its own rank, see
+      readlater.ranking.
 
     """
     PRIORITY_HIGHER = 0
@@ -45,11 +249,13 @@ class Article(models.Model):
                         (PRIORITY_NORMAL, 'Normal'), (PRIORITY_HIGH, 'High'),
                         (PRIORITY_HIGHER, 'Higher'))
 
-    name = models.CharField(max_length=100, unique=True,
-                            help_text='Name of article.')
+    name = models.CharField(max_length=100,
+                            help_text='Name of article, unique for each user.')
     notes = models.CharField(max_length=100, blank=True,
                              help_text='Notes about article.')
     url = models.URLField(max_length=400, help_text='URL for article.')
+    url_hash = models.CharField(max_length=40, editable=False, default='',
+                                help_text='Hash of normalized URL for finding duplicates.')
     category = models.ForeignKey(Category, related_name='article',
                                  null=True, blank=True,
                                  on_delete=models.SET_NULL,
@@ -66,8 +272,96 @@ class Article(models.Model):
                                          help_text='Timestamp for when article was finished.')
     updated_time = models.DateTimeField(null=True, blank=True, editable=False,
                                         help_text='Timestamp for when progress was updated.')
+    rank = models.BigIntegerField(default=get_default_rank, editable=False,
+                                  help_text='Position in manually ordered list, lowest first.')
+    # filled in from the page by the fetch_article_metadata command, see
+    # readlater.metadata
+    page_title = models.CharField(max_length=300, blank=True, editable=False,
+                                  help_text='Title of the page at url.')
+    canonical_url = models.URLField(max_length=400, blank=True, editable=False,
+                                    help_text='Canonical URL given by the page.')
+    word_count = models.PositiveIntegerField(null=True, blank=True, editable=False,
+                                             help_text='Number of words in the page text.')
+    reading_time = models.PositiveIntegerField(null=True, blank=True, editable=False,
+                                               help_text='Estimated minutes to read the page.')
+    metadata_time = models.DateTimeField(null=True, blank=True, editable=False,
+                                         help_text='Timestamp for when page metadata was '
+                                                   'fetched, empty until then.')
+    metadata_error = models.CharField(max_length=200, blank=True, editable=False,
+                                      help_text='Why page metadata could not be fetched.')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    class Meta:
+        # Indexes match the filter and ordering used by ArticleList for each
+        # ordering in ArticleList._order_hier.  Unread (progress < 100) and read
+        # (progress == 100) listings get their own partial indexes where the
+        # database supports them.  The read indexes leave out progress since it
+        # is constant for those rows.  The primary key is last as it is the
+        # tie breaker used for keyset pagination.
+        indexes = [
+            models.Index(fields=['created_by', 'priority', '-progress',
+                                 '-added_time', 'id'],
+                         condition=models.Q(progress__lt=100),
+                         name='rl_unread_priority_idx'),
+            models.Index(fields=['created_by', 'category', 'priority', 'updated_time',
+                                 '-added_time', '-progress', 'id'],
+                         condition=models.Q(progress__lt=100),
+                         name='rl_unread_category_idx'),
+            models.Index(fields=['created_by', '-progress', 'priority', 'updated_time',
+                                 '-added_time', '-category', 'id'],
+                         condition=models.Q(progress__lt=100),
+                         name='rl_unread_progress_idx'),
+            models.Index(fields=['created_by', 'priority', '-added_time', 'id'],
+                         condition=models.Q(progress=100),
+                         name='rl_read_priority_idx'),
+            models.Index(fields=['created_by', 'category', 'priority', 'updated_time',
+                                 '-added_time', 'id'],
+                         condition=models.Q(progress=100),
+                         name='rl_read_category_idx'),
+            models.Index(fields=['created_by', 'priority', 'updated_time',
+                                 '-added_time', '-category', 'id'],
+                         condition=models.Q(progress=100),
+                         name='rl_read_progress_idx'),
+            models.Index(fields=['created_by', '-finished_time', 'id'],
+                         condition=models.Q(progress=100),
+                         name='rl_read_finished_idx'),
+            models.Index(fields=['created_by', '-added_time', 'id'],
+                         name='rl_added_idx'),
+            models.Index(fields=['created_by', '-updated_time', 'id'],
+                         name='rl_updated_idx'),
+            models.Index(fields=['created_by', 'url_hash'],
+                         name='rl_url_hash_idx'),
+            models.Index(fields=['created_by', 'rank', 'id'],
+                         condition=models.Q(progress__lt=100),
+                         name='rl_unread_rank_idx'),
+            models.Index(fields=['created_by', 'rank', 'id'],
+                         condition=models.Q(progress=100),
+                         name='rl_read_rank_idx'),
+            # neighbour lookups when moving an article span both states
+            models.Index(fields=['created_by', 'rank'],
+                         name='rl_rank_idx'),
+            # articles waiting for their page metadata to be fetched
+            models.Index(fields=['id'], condition=models.Q(metadata_time__isnull=True),
+                         name='rl_metadata_pending_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['created_by', 'name'],
+                                    name='rl_unique_user_name'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.url_hash = get_url_hash(self.url)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def find_by_url(user, url):
+        """
+        Return user's article with the same normalized URL as url or None.
+
+        Uses the index on (created_by, url_hash) so is a single index lookup.
+        """
+        return Article.objects.filter(created_by=user, url_hash=get_url_hash(url)).first()
+
     @staticmethod
     def get_absolute_url():
         """ Default URL for display contents. """
@@ -75,3 +369,148 @@ class Article(models.Model):
 
     def __str__(self):
         return f'{self.name} - {self.category} - {self.get_priority_display()} - {self.progress}'
+
+
+def get_category_token():
+    """Return new random ArticleListVersion.category_token."""
+    return secrets.token_hex(16)
+
+
+class ArticleListVersion(models.Model):
+    """
+    Per user counter which is incremented whenever any of the user's articles
+    or categories are changed.  Used to version cached renderings of the
+    article list so stale data is never shown.
+
+    'category_token' is replaced whenever the user's categories change, see
+    readlater.registry.  'pruned_event_id' is the id of the user's latest
+    ArticleEvent removed by readlater.events.prune_events.
+    """
+    user = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE)
+    version = models.PositiveBigIntegerField(default=0,
+                                             help_text='Change counter for user data.')
+    changed_time = models.DateTimeField(default=timezone.now,
+                                        help_text='Timestamp for last change to user data.')
+    category_token = models.CharField(max_length=32, default=get_category_token,
+                                      help_text='Generation of cached copies of the '
+                                                'user\'s categories.')
+    pruned_event_id = models.PositiveBigIntegerField(default=0,
+                                                     help_text='Id of the latest removed '
+                                                               'article event.')
+
+    @staticmethod
+    def get_for_user(user):
+        """Returns ArticleListVersion for user, creating it if needed."""
+        return ArticleListVersion.objects.get_or_create(user=user)[0]
+
+    @staticmethod
+    def bump(user_id):
+        """
+        Increment version for user.
+
+        The record is only created when read so a user with no record has nothing
+        cached which needs to be invalidated.
+        """
+        ArticleListVersion.objects.filter(user_id=user_id).update(
+            version=models.F('version') + 1, changed_time=timezone.now())
+
+    def __str__(self):
+        return f'{self.user} - {self.version}'
+
+
+class ArticleEvent(models.Model):
+    """
+    Change to one of a user's articles, read by the user's other open article
+    lists so they can patch their rows in place, see readlater.events.
+
+    Ids only increase so clients ask for the events after the last id they
+    saw.  'fields' holds the changed values as shown in the article list.
+    """
+    ACTION_CREATED = 'created'
+    ACTION_CHANGED = 'changed'
+    ACTION_DELETED = 'deleted'
+    # many articles changed at once, eg. by an import, so lists are reloaded
+    ACTION_RELOAD = 'reload'
+    ACTION_CHOICES = ((ACTION_CREATED, 'Created'), (ACTION_CHANGED, 'Changed'),
+                      (ACTION_DELETED, 'Deleted'), (ACTION_RELOAD, 'Reload'))
+
+    user = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    # not a foreign key so events for deleted articles are kept
+    article_id = models.PositiveIntegerField(null=True, blank=True,
+                                             help_text='Id of changed article.')
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES,
+                              help_text='What happened to the article.')
+    fields = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder,
+                              help_text='Changed values as shown in the article list.')
+    created_time = models.DateTimeField(default=timezone.now,
+                                        help_text='Timestamp for when event happened.')
+
+    class Meta:
+        indexes = [
+            # events after a client's last seen id
+            models.Index(fields=['user', 'id'], name='rl_event_user_idx'),
+            # removing old events
+            models.Index(fields=['created_time'], name='rl_event_time_idx'),
+        ]
+
+    @staticmethod
+    def publish(user_id, article_ids, action, fields=None):
+        """
+        Record the same change to each of articles article_ids of user with a
+        single INSERT.
+
+        :param article_ids: Ids of changed articles, [None] for ACTION_RELOAD.
+        :type article_ids: list
+        :param fields: Changed values shared by all the articles, or a list of
+            them for each article.
+        :type fields: dict or list
+        """
+        if not isinstance(fields, list):
+            fields = [fields or {}] * len(article_ids)
+        now = timezone.now()
+        ArticleEvent.objects.bulk_create([
+            ArticleEvent(user_id=user_id, article_id=article_id, action=action,
+                         fields=article_fields, created_time=now)
+            for article_id, article_fields in zip(article_ids, fields)])
+
+    def __str__(self):
+        return f'{self.user} - {self.id} - {self.action} - {self.article_id}'
+
+
+def get_token_hash(token):
+    """Return hash of API token as stored in ApiToken.token_hash."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class ApiToken(models.Model):
+    """
+    Secret token authenticating a user's bookmarklets and browser extensions
+    to the quick-add endpoint, see readlater.quick_add.
+
+    Each user has at most one token.  Only its hash is stored so the token is
+    shown once when it is created.
+    """
+    user = models.OneToOneField(User, primary_key=True, related_name='+',
+                                on_delete=models.CASCADE)
+    token_hash = models.CharField(max_length=64, unique=True, editable=False,
+                                  help_text='Hash of token.')
+    created_time = models.DateTimeField(default=timezone.now,
+                                        help_text='Timestamp for when token was created.')
+
+    @staticmethod
+    def create_for_user(user):
+        """Return new token for user, replacing any earlier one."""
+        token = secrets.token_urlsafe(32)
+        ApiToken.objects.update_or_create(user=user, defaults={
+            'token_hash': get_token_hash(token), 'created_time': timezone.now()})
+        return token
+
+    @staticmethod
+    def get_user_id(token):
+        """Return id of active user with token or None, with a single query."""
+        return ApiToken.objects.filter(token_hash=get_token_hash(token),
+                                       user__is_active=True).values_list(
+            'user_id', flat=True).first()
+
+    def __str__(self):
+        return f'{self.user} - {self.created_time}'
@@ -0,0 +1,190 @@
+import base64
+import binascii
+import json
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from django.http import Http404
+
+
+class KeysetPage:
+    """
+    A single page of results from a KeysetPaginator.
+
+    Unlike django.core.paginator.Page this does not know the total number of
+    items or pages, only whether there are items before or after it and the
+    opaque cursors used to request them.
+    """
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor based paginator which seeks directly to a page using the values of
+    the ordering fields of the last row seen instead of OFFSET, so fetching
+    a page costs the same no matter how deep into the list it is.  No COUNT
+    query is made.
+
+    The primary key is appended to the ordering as a tie breaker so the
+    ordering is total.  NULL values are placed where the database places them
+    natively (last for ascending on PostgreSQL, first on SQLite and MySQL) so
+    the ordering can be served by the indexes on Article.
+
+    Querysets of values() dicts may be paginated too as long as they include
+    the attname (ie. 'category_id') of each ordering field and the primary key.
+    """
+    def __init__(self, queryset, ordering, per_page):
+        """
+        :param queryset: Unordered queryset to paginate.
+        :type queryset: QuerySet
+        :param ordering: Field names to order by, prefix with '-' for descending.
+        :type ordering: tuple
+        :param per_page: Number of items on each page.
+        :type per_page: int
+        """
+        self.queryset = queryset
+        self.per_page = per_page
+        self.model = queryset.model
+
+        self._terms = []
+        for order_col in tuple(ordering) + ('pk',):
+            name = order_col.lstrip('-')
+            if name == 'pk':
+                field = self.model._meta.pk
+            else:
+                field = self.model._meta.get_field(name)
+            self._terms.append((field, order_col.startswith('-')))
+
+        # key used to tie cursors to the ordering they were created with
+        self._ordering_key = ','.join(ordering)
+
+        # whether database sorts NULL after all other values when ascending
+        self._nulls_largest = connections[queryset.db].vendor in ('postgresql', 'oracle')
+
+    def values(self, *fields):
+        """
+        Paginate dicts of fields instead of model instances, adding the
+        ordering fields needed to make cursors.
+        """
+        attnames = [field.attname for field, _ in self._terms]
+        self.queryset = self.queryset.values(*dict.fromkeys(fields + tuple(attnames)))
+        return self
+
+    def _order_by(self, reverse):
+        """Return order_by() expressions, flipped when paging backwards."""
+        exprs = []
+        for field, descending in self._terms:
+            if descending != reverse:
+                exprs.append(F(field.attname).desc())
+            else:
+                exprs.append(F(field.attname).asc())
+        return exprs
+
+    def _seek_filter(self, values, reverse):
+        """
+        Build filter selecting rows which sort strictly after the row with
+        the given ordering values (strictly before when reverse=True).
+        """
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self._terms, values):
+            name = field.attname
+            ascending = descending == reverse
+            nulls_at_end = ascending == self._nulls_largest
+            if value is None:
+                # nothing sorts after NULL if NULLs are at the end
+                after = None if nulls_at_end else Q(**{f'{name}__isnull': False})
+            else:
+                after = Q(**{f'{name}__gt' if ascending else f'{name}__lt': value})
+                if nulls_at_end and field.null:
+                    after |= Q(**{f'{name}__isnull': True})
+
+            if after is not None:
+                condition |= equal & after
+
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+            else:
+                equal &= Q(**{name: value})
+        return condition
+
+    def _encode_cursor(self, obj, direction):
+        if isinstance(obj, dict):
+            # row from values(), fields read values with getattr()
+            obj = SimpleNamespace(**obj)
+        values = []
+        for field, _ in self._terms:
+            if getattr(obj, field.attname) is None:
+                values.append(None)
+            else:
+                values.append(field.value_to_string(obj))
+        data = json.dumps({'o': self._ordering_key, 'd': direction, 'v': values},
+                          separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def _decode_cursor(self, cursor):
+        """Return (direction, values) for a cursor or raise Http404 if invalid."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if data['o'] != self._ordering_key or data['d'] not in ('n', 'p'):
+                raise ValueError('Cursor does not match ordering')
+            if len(data['v']) != len(self._terms):
+                raise ValueError('Cursor has wrong number of values')
+            values = [None if v is None else field.to_python(v)
+                      for (field, _), v in zip(self._terms, data['v'])]
+        except (ValueError, TypeError, KeyError, binascii.Error, ValidationError):
+            raise Http404('Invalid page cursor.')
+        return data['d'], values
+
+    def page(self, cursor=None):
+        """
+        Return the page of results following/preceding the given cursor.
+
+        :param cursor: Opaque cursor from a previous page or None for first page.
+        :type cursor: str
+        :return: Requested page.
+        :rtype: KeysetPage
+        """
+        direction, values = ('n', None) if not cursor else self._decode_cursor(cursor)
+        reverse = direction == 'p'
+
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, reverse))
+        rows = list(queryset.order_by(*self._order_by(reverse))[:self.per_page + 1])
+
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if (not reverse and has_more) or (reverse and values is not None):
+                next_cursor = self._encode_cursor(rows[-1], 'n')
+            if (reverse and has_more) or (not reverse and values is not None):
+                previous_cursor = self._encode_cursor(rows[0], 'p')
+
+        return KeysetPage(rows, next_cursor=next_cursor,
+                          previous_cursor=previous_cursor)
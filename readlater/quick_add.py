@@ -0,0 +1,224 @@
+"""
+Quick-add of articles for bookmarklets and browser extensions.
+
+Requests are authenticated with an 'Authorization: Token <token>' header (see
+ApiToken) instead of the session, so no session is loaded or saved, CSRF
+does not apply and no template is rendered.  Adding any number of articles
+takes one query to check the token, one to find articles already using the
+URLs or titles and one INSERT, plus bumping the list version and recording
+the change events.
+
+Any origin may call the endpoint as browsers never send the token on their
+own.
+"""
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.csrf import csrf_exempt
+
+from .events import get_event_fields
+from .models import ApiToken, Article, ArticleEvent, ArticleListVersion, get_url_hash
+from .ranking import get_next_ranks
+from .registry import category_registry
+
+# most articles added by one request
+MAX_BATCH_SIZE = 100
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Authorization, Content-Type',
+    'Access-Control-Max-Age': '86400',
+}
+
+_validate_url = URLValidator()
+
+
+class QuickAddError(Exception):
+    """Invalid request, answered with status 400."""
+
+
+def get_items(request):
+    """
+    Return list of item dicts with 'url' and optional 'title' and 'category'
+    from request.
+
+    The body is either form fields of one item, a JSON object for one item,
+    a JSON list of items or a JSON object with the list in 'articles'.
+    """
+    if request.content_type != 'application/json':
+        return [{name: request.POST.get(name) for name in ('url', 'title', 'category')}]
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        raise QuickAddError('body is not valid JSON')
+    if isinstance(data, dict):
+        data = data['articles'] if 'articles' in data else [data]
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise QuickAddError('body must be an article object or a list of them')
+    if not 1 <= len(data) <= MAX_BATCH_SIZE:
+        raise QuickAddError(f'add from 1 to {MAX_BATCH_SIZE} articles at a time')
+    return data
+
+
+def _clean_item(item, categories):
+    """
+    Return (url, name, category) of item.
+
+    :raises QuickAddError: If the url or category are invalid.
+    """
+    url = str(item.get('url') or '').strip()
+    try:
+        if len(url) > Article._meta.get_field('url').max_length:
+            raise ValidationError('too long')
+        _validate_url(url)
+    except ValidationError:
+        raise QuickAddError('url must be a valid URL')
+    name = str(item.get('title') or '').strip() or url
+    name = name[:Article._meta.get_field('name').max_length]
+
+    category = None
+    if item.get('category'):
+        category = categories.get(str(item['category']))
+        if category is None:
+            raise QuickAddError('unknown category')
+    return url, name, category
+
+
+def quick_add(user_id, items):
+    """
+    Add the articles items for user, skipping URLs already saved.
+
+    Titles already used by another of the user's articles are replaced by
+    the URL.
+
+    :param items: Dicts with 'url' and optional 'title' and 'category' name.
+    :type items: list
+    :return: List of dicts for each item with 'url' and either 'id' and
+        'created' or 'error'.
+    :rtype: list
+    """
+    categories = {category.name: category
+                  for category in category_registry.get_categories(user_id)}
+    results = []
+    cleaned = []
+    for item in items:
+        try:
+            url, name, category = _clean_item(item, categories)
+        except QuickAddError as e:
+            results.append({'url': item.get('url'), 'error': str(e)})
+            continue
+        results.append({'url': url})
+        cleaned.append((results[-1], url, get_url_hash(url), name, category))
+
+    # articles with the same URL and names which are taken in one query
+    hashes = {url_hash for _, _, url_hash, _, _ in cleaned}
+    names = {name for _, _, _, name, _ in cleaned} | {url for _, url, _, _, _ in cleaned}
+    existing_ids = {}
+    used_names = set()
+    for url_hash, name, pk in Article.objects.filter(
+            Q(url_hash__in=hashes) | Q(name__in=names), created_by_id=user_id).values_list(
+                'url_hash', 'name', 'id'):
+        existing_ids[url_hash] = pk
+        used_names.add(name)
+
+    now = timezone.now()
+    new_articles = {}
+    for result, url, url_hash, name, category in cleaned:
+        if url_hash in existing_ids or url_hash in new_articles:
+            result['created'] = False
+            continue
+        if name in used_names:
+            name = url[:Article._meta.get_field('name').max_length]
+            if name in used_names:
+                result['error'] = 'title and url are used as names by other articles'
+                continue
+        used_names.add(name)
+        article = Article(name=name, url=url, category=category, added_time=now,
+                          created_by_id=user_id)
+        # bulk_create does not call save() which sets the hash
+        article.url_hash = url_hash
+        new_articles[url_hash] = article
+        result['created'] = True
+
+    if new_articles:
+        articles = list(new_articles.values())
+        for article, rank in zip(articles, get_next_ranks(user_id, len(articles))):
+            article.rank = rank
+        with transaction.atomic():
+            Article.objects.bulk_create(articles)
+            if articles[0].pk is None:
+                # database does not return ids from a bulk insert
+                ids = dict(Article.objects.filter(created_by_id=user_id,
+                                                  url_hash__in=new_articles).values_list(
+                    'url_hash', 'id'))
+                for article in articles:
+                    article.pk = ids[article.url_hash]
+            # bulk_create does not send signals
+            ArticleListVersion.bump(user_id)
+            ArticleEvent.publish(user_id, [article.pk for article in articles],
+                                 ArticleEvent.ACTION_CREATED,
+                                 [get_event_fields(article) for article in articles])
+        existing_ids.update((article.url_hash, article.pk) for article in articles)
+
+    for result, _, url_hash, _, _ in cleaned:
+        if 'created' in result:
+            result['id'] = existing_ids[url_hash]
+    return results
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class QuickAddView(generic.View):
+    """
+    Add articles for the user owning the token in the Authorization header.
+
+    Answers {"results": [...]} as described by quick_add(), with status 201
+    if any article was added, 200 if they were all saved already, 400 for
+    an invalid body and 401 for a missing or unknown token.
+    """
+    http_method_names = ['post', 'options']
+
+    def _get_user_id(self, request):
+        scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme.lower() != 'token' or not token.strip():
+            return None
+        return ApiToken.get_user_id(token.strip())
+
+    def _json(self, data, status=200):
+        response = JsonResponse(data, status=status)
+        for header, value in CORS_HEADERS.items():
+            response[header] = value
+        return response
+
+    def options(self, request, *args, **kwargs):
+        """Answer CORS preflight requests."""
+        response = HttpResponse()
+        for header, value in CORS_HEADERS.items():
+            response[header] = value
+        return response
+
+    def post(self, request, *args, **kwargs):
+        user_id = self._get_user_id(request)
+        if user_id is None:
+            response = self._json({'error': 'missing or invalid token'}, status=401)
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        try:
+            items = get_items(request)
+        except QuickAddError as e:
+            return self._json({'error': str(e)}, status=400)
+
+        try:
+            results = quick_add(user_id, items)
+        except IntegrityError:
+            # the same article added by another request at the same time
+            return self._json({'error': 'conflicting change, please retry'}, status=409)
+        created = any(result.get('created') for result in results)
+        return self._json({'results': results}, status=201 if created else 200)
@@ -0,0 +1,201 @@
+"""
+Manual ordering of a user's articles by Article.rank.
+
+Ranks are integers with gaps between them so an article is moved by giving it
+a rank half way between its new neighbours, which writes a single row.  When
+neighbours have no room left between them only the fewest following articles
+needed are spread out to make room.  The rebalance_ranks management command
+gives crowded lists evenly spaced ranks again ahead of time so moves rarely
+have to.
+"""
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import Max, Min, Q
+
+from .models import RANK_GAP, Article, get_default_rank
+
+# rebalance_ranks command rebalances lists with a gap smaller than this
+MIN_RANK_GAP = RANK_GAP >> 10
+
+
+def get_next_ranks(user_id, count):
+    """
+    Return list of count ranks RANK_GAP apart which put articles after all
+    of the user's existing articles, for articles created together with
+    bulk_create().
+
+    Ranks end at the default rank of an article added now where there is
+    room, so articles added one at a time afterwards still go last.
+    """
+    last = Article.objects.filter(created_by_id=user_id).aggregate(rank=Max('rank'))['rank']
+    start = get_default_rank() - (count - 1) * RANK_GAP
+    if last is not None:
+        start = max(start, last + RANK_GAP)
+    return [start + i * RANK_GAP for i in range(count)]
+
+
+def _get_following(article, target, after):
+    """
+    Return queryset of (rank, pk) of the user's articles, other than article,
+    on the side of target given by after, nearest first.
+    """
+    others = Article.objects.filter(created_by_id=target.created_by_id).exclude(pk=article.pk)
+    if after:
+        others = others.filter(Q(rank__gt=target.rank) | Q(rank=target.rank, pk__gt=target.pk))
+        others = others.order_by('rank', 'pk')
+    else:
+        others = others.filter(Q(rank__lt=target.rank) | Q(rank=target.rank, pk__lt=target.pk))
+        others = others.order_by('-rank', '-pk')
+    return others.values_list('rank', 'pk')
+
+
+def _get_neighbour_rank(article, target, after):
+    """
+    Return rank of article next to target in the user's list, on the side
+    given by after, or None if target is at that end of the list.
+    """
+    neighbour = _get_following(article, target, after).first()
+    return neighbour[0] if neighbour is not None else None
+
+
+def _get_new_rank(article, after, before):
+    """Return rank placing article as described by move_article() or None if there is no room."""
+    if after is None and before is None:
+        lowest = Article.objects.filter(created_by_id=article.created_by_id).exclude(
+            pk=article.pk).aggregate(rank=Min('rank'))['rank']
+        return article.rank if lowest is None else lowest - RANK_GAP
+
+    target = after if after is not None else before
+    neighbour = _get_neighbour_rank(article, target, after is not None)
+    if neighbour is None:
+        return target.rank + RANK_GAP if after is not None else target.rank - RANK_GAP
+
+    low, high = sorted((target.rank, neighbour))
+    if high - low < 2:
+        return None
+    return (low + high) // 2
+
+
+def move_article(article, after=None, before=None):
+    """
+    Move article directly after or before another of the user's articles, or to
+    the top of the list if neither is given.
+
+    :param article: Article to move.
+    :type article: Article
+    :param after: Article to place article after.
+    :type after: Article
+    :param before: Article to place article before.
+    :type before: Article
+    :return: Number of articles given a new rank, 1 unless room had to be
+        made.  The new rank is set on article.
+    :rtype: int
+    """
+    rank = _get_new_rank(article, after, before)
+    moved = 0
+    if rank is None:
+        # neighbours are adjacent so spread out the articles which follow
+        if after is None:
+            # room is made after the article before 'before', which exists
+            # as there is always room at the top of the list
+            after = Article(created_by_id=before.created_by_id,
+                            **dict(zip(('rank', 'pk'),
+                                       _get_following(article, before, False).first())))
+        with transaction.atomic():
+            rank, moved = _make_room(article, after)
+
+    Article.objects.filter(pk=article.pk).update(rank=rank)
+    article.rank = rank
+    return moved + 1
+
+
+def _make_room(article, target):
+    """
+    Give new ranks to the fewest articles following target needed to leave
+    gaps of at least MIN_RANK_GAP, and return (rank for article directly after
+    target, number of articles given new ranks).
+    """
+    moved = []
+    end = None
+    for rank, pk in _get_following(article, target, True).iterator(chunk_size=100):
+        # room for article and the articles moved so far before this one
+        if rank - target.rank >= (len(moved) + 2) * MIN_RANK_GAP:
+            end = rank
+            break
+        moved.append(pk)
+    step = RANK_GAP if end is None else (end - target.rank) // (len(moved) + 2)
+    moved = set_ranks((pk, target.rank + (i + 2) * step) for i, pk in enumerate(moved))
+    return target.rank + step, moved
+
+
+def get_min_rank_gap(user_id):
+    """Return smallest gap between ranks of user's articles or None if fewer than two."""
+    ranks = Article.objects.filter(created_by_id=user_id).order_by('rank').values_list(
+        'rank', flat=True)
+    min_gap = None
+    previous = None
+    for rank in ranks.iterator(chunk_size=5000):
+        if previous is not None and (min_gap is None or rank - previous < min_gap):
+            min_gap = rank - previous
+        previous = rank
+    return min_gap
+
+
+def set_ranks(ranks, batch_size=2000):
+    """
+    Set rank of many articles.
+
+    Uses a single parameterized UPDATE executed for each article, which is
+    much quicker than bulk_update() building a CASE over every id.
+
+    :param ranks: Iterable of (article id, rank) pairs.
+    :type ranks: iterable
+    :param batch_size: Number of articles sent to the database at a time.
+    :type batch_size: int
+    :return: Number of articles updated.
+    :rtype: int
+    """
+    table = connection.ops.quote_name(Article._meta.db_table)
+    sql = (f'UPDATE {table} SET {connection.ops.quote_name("rank")} = %s '
+           f'WHERE {connection.ops.quote_name("id")} = %s')
+    ranks = iter(ranks)
+    count = 0
+    with connection.cursor() as cursor:
+        while True:
+            batch = [(rank, pk) for pk, rank in islice(ranks, batch_size)]
+            if not batch:
+                break
+            cursor.executemany(sql, batch)
+            # rowcount of executemany() is not reliable on every backend
+            count += len(batch)
+    return count
+
+
+def rebalance_ranks(user_id, batch_size=2000):
+    """
+    Give user's articles ranks RANK_GAP apart keeping their current order.
+
+    :param user_id: Id of user whose articles are re-ranked.
+    :type user_id: int
+    :param batch_size: Number of articles updated at a time.
+    :type batch_size: int
+    :return: Number of articles re-ranked.
+    :rtype: int
+    """
+    with transaction.atomic():
+        pks = list(Article.objects.filter(created_by_id=user_id).order_by(
+            'rank', 'pk').values_list('pk', flat=True))
+        set_ranks(((pk, (i + 1) * RANK_GAP) for i, pk in enumerate(pks)),
+                  batch_size=batch_size)
+    return len(pks)
+
+
+def get_users_to_rebalance(min_gap=MIN_RANK_GAP):
+    """Yield ids of users with articles whose ranks are closer than min_gap."""
+    user_ids = Article.objects.order_by('created_by').values_list(
+        'created_by', flat=True).distinct()
+    for user_id in user_ids:
+        gap = get_min_rank_gap(user_id)
+        if gap is not None and gap < min_gap:
+            yield user_id
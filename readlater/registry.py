@@ -0,0 +1,124 @@
+"""
+Per-user lookup of categories without querying the database.
+
+Pages showing the category filter, category selects or the settings list all
+need the request user's categories.  The registry keeps each user's
+categories, in tree order, in this process and in the shared cache so they are
+only read from the database after they change.
+
+Each user has a generation token, ArticleListVersion.category_token, which is
+replaced when any of their categories is created, edited or deleted (see
+readlater.signals).  The token is kept in the database so every process sees
+the change whatever cache backend is configured, and reading it is a single
+primary key lookup.  Views pass in the token read with the rest of the
+request user's ArticleListVersion so it is read once per request.  Entries are stored under the token they were read for so
+a copy loaded by any process before a change is never used after it.  The
+token is read before the categories so a change made while a copy is being
+loaded replaces the token the copy is stored under.
+"""
+import threading
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ArticleListVersion, Category, get_category_token
+
+# number of users whose categories are kept in this process
+LOCAL_REGISTRY_SIZE = getattr(settings, 'READLATER_CATEGORY_REGISTRY_SIZE', 1000)
+
+# seconds each user's categories are kept in the shared cache, copies for old
+# tokens are never read again
+CACHE_TIMEOUT = 24 * 3600
+
+
+class CategoryRegistry:
+    """Cached map of each user's categories, see module docstring."""
+
+    def __init__(self, local_size=LOCAL_REGISTRY_SIZE):
+        self.local_size = local_size
+        # user id -> (token, entries, name -> entries) most recently used last
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entries_key(user_id, token):
+        return f'readlater.categories.{user_id}.{token}'
+
+    def _get_token(self, user_id):
+        """Return user's generation token, starting a new generation if there is none."""
+        token = ArticleListVersion.objects.filter(user_id=user_id).values_list(
+            'category_token', flat=True).first()
+        if token is None:
+            token = ArticleListVersion.objects.get_or_create(user_id=user_id)[0].category_token
+        return token
+
+    def _load(self, user_id):
+        """Return (id, name, parent id, path) of user's categories in tree order."""
+        categories = Category.objects.filter(created_by_id=user_id).only(
+            'id', 'name', 'parent', 'path')
+        return tuple((c.pk, c.name, c.parent_id, c.path) for c in Category.tree_order(categories))
+
+    def _get_local(self, user_id, token=None):
+        """Return (token, entries, name -> entries) for user, loading them if needed."""
+        if token is None:
+            token = self._get_token(user_id)
+        with self._lock:
+            local = self._local.get(user_id)
+            if local is not None and local[0] == token:
+                self._local.move_to_end(user_id)
+                return local
+
+        entries_key = self._entries_key(user_id, token)
+        entries = cache.get(entries_key)
+        if entries is None:
+            entries = self._load(user_id)
+            cache.set(entries_key, entries, CACHE_TIMEOUT)
+        by_name = defaultdict(list)
+        for entry in entries:
+            by_name[entry[1]].append(entry)
+        local = (token, entries, dict(by_name))
+
+        with self._lock:
+            self._local[user_id] = local
+            self._local.move_to_end(user_id)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+        return local
+
+    def get_categories(self, user_id, token=None):
+        """
+        Return user's categories in tree order, see Category.tree_order().
+
+        Categories are new unsaved instances with only id, name, parent and
+        path set so callers may add attributes to them.
+
+        :param user_id: Id of user.
+        :type user_id: int
+        :param token: User's category_token if already read, else it is read
+            from the database.
+        :type token: str
+        :rtype: list
+        """
+        return [Category(id=pk, name=name, parent_id=parent_id, path=path,
+                         created_by_id=user_id)
+                for pk, name, parent_id, path in self._get_local(user_id, token)[1]]
+
+    def get_id(self, user_id, name, token=None):
+        """Return id of user's first category with name in tree order or None."""
+        entries = self._get_local(user_id, token)[2].get(name)
+        return entries[0][0] if entries else None
+
+    def get_paths(self, user_id, name, token=None):
+        """Return paths of user's categories with name."""
+        return [entry[3] for entry in self._get_local(user_id, token)[2].get(name, [])]
+
+    def invalidate(self, user_id):
+        """Forget user's categories in every process after they change."""
+        ArticleListVersion.objects.filter(user_id=user_id).update(
+            category_token=get_category_token())
+        with self._lock:
+            self._local.pop(user_id, None)
+
+
+category_registry = CategoryRegistry()
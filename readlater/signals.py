@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Article, ArticleListVersion, Category
+from .registry import category_registry
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_list_version(sender, instance, **kwargs):
+    """Invalidate cached article list renderings for owner of changed record."""
+    ArticleListVersion.bump(instance.created_by_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_registry(sender, instance, **kwargs):
+    """Reload owner's categories into the registry after any of them change."""
+    category_registry.invalidate(instance.created_by_id)
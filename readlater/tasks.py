@@ -0,0 +1,62 @@
+"""
+Running work after a response has been returned.
+
+The project has no task queue so how background work runs is chosen with the
+READLATER_BACKGROUND_TASKS setting:
+
+  'thread'  - (default) run in a daemon thread once the current transaction
+              commits
+  'sync'    - run straight away in the calling thread, for tests and scripts
+  'command' - do nothing, the work is picked up by a management command run
+              periodically (eg. process_category_deletions)
+
+Tasks must be safe to run again, as work left by a stopped process is picked
+up by the management commands.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_MODES = ('thread', 'sync', 'command')
+
+
+def get_background_mode():
+    """Return how background tasks are run, one of BACKGROUND_MODES."""
+    mode = getattr(settings, 'READLATER_BACKGROUND_TASKS', 'thread')
+    if mode not in BACKGROUND_MODES:
+        raise ValueError(f'Invalid READLATER_BACKGROUND_TASKS "{mode}", '
+                         f'use one of {", ".join(BACKGROUND_MODES)}')
+    return mode
+
+
+def _run(func, args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Background task %s%r failed', func.__name__, args)
+    finally:
+        # each thread has its own database connections
+        connections.close_all()
+
+
+def run_in_background(func, *args):
+    """
+    Run func(*args) outside of the current request.
+
+    :param func: Function to run, arguments should be ids not model instances.
+    :type func: callable
+    :return: True if func was run or scheduled to run, False if it is left
+             for a management command.
+    :rtype: bool
+    """
+    mode = get_background_mode()
+    if mode == 'sync':
+        func(*args)
+    elif mode == 'thread':
+        transaction.on_commit(lambda: threading.Thread(
+            target=_run, args=(func, args), daemon=True).start())
+    return mode != 'command'
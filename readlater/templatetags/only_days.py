@@ -23,6 +23,28 @@ register = Library()
 #     return new_value
 
 
+# (unit name, seconds in unit) from largest to smallest unit
+TIME_UNITS = (
+    ('yr', 365.25 * 24 * 3600),
+    ('mon', 30 * 24 * 3600),
+    ('wk', 7 * 24 * 3600),
+    ('d', 24 * 3600),
+    ('h', 3600),
+    ('min', 60),
+    ('sec', 1),
+)
+
+
+def _format_seconds(secs):
+    """Return string for largest time unit which is non-zero for secs."""
+    # want to return largest time unit which is non-zero
+    for u, s in TIME_UNITS:
+        sdiv = secs / s
+        if sdiv > 1:
+            return f'{int(sdiv)} {u}'
+    return '0 seconds ago'
+
+
 @register.filter
 def nice_timesince(value, utc_offset=0):
     """
@@ -44,33 +66,55 @@ def nice_timesince(value, utc_offset=0):
     if not isinstance(value, datetime):
         return value
 
-    dt = datetime.now(timezone(timedelta(hours=utc_offset))) - value
-    secs = dt.total_seconds()
+    now = datetime.now(timezone(timedelta(hours=utc_offset)))
+    return _format_seconds((now - value).total_seconds())
 
-    # want to return largest time unit which is non-zero
-    tunits = {
-        'year': 365.25 * 24 * 3600,
-        'month': 30 * 24 * 3600,
-        'week': 7 * 24 * 3600,
-        'day': 24 * 3600,
-        'hour': 3600,
-        'minute': 60,
-        'second': 1
-    }
-    tunits_sm = {
-        'yr': 365.25 * 24 * 3600,
-        'mon': 30 * 24 * 3600,
-        'wk': 7 * 24 * 3600,
-        'd': 24 * 3600,
-        'h': 3600,
-        'min': 60,
-        'sec': 1
-    }
-    for u, s in tunits_sm.items():
-        sdiv = secs / s
-        if sdiv > 1:
-            #ustr = u if sdiv < -2 else u + 's'
-            ustr = u
-            return f'{int(sdiv)} {ustr}'
-    else:
-        return '0 seconds ago'
+
+@register.filter
+def nice_timesince_from(value, now):
+    """
+    Same as nice_timesince but relative to 'now' instead of reading the clock.
+
+    Lets a template use a single 'now' for every row it renders.
+
+    Example usage in template:
+
+    {{ my_datetime|nice_timesince_from:now }}
+
+    """
+    if not isinstance(value, datetime):
+        return value
+
+    return _format_seconds((now - value).total_seconds())
+
+
+def nice_timesince_batch(values, now):
+    """
+    Return list of nice_timesince strings for a column of values in one pass.
+
+    Values which are not datetimes are returned unchanged (ie. None).
+
+    :param values: Datetimes to compute time since for.
+    :type values: iterable
+    :param now: Time to compute time since relative to.
+    :type now: datetime
+    :return: List of strings for each value.
+    :rtype: list
+    """
+    # bind to locals to avoid global lookups inside loop
+    units = TIME_UNITS
+    is_datetime = isinstance
+    result = []
+    append = result.append
+    for value in values:
+        if not is_datetime(value, datetime):
+            append(value)
+            continue
+        secs = (now - value).total_seconds()
+        for u, s in units:
+            if secs > s:
+                append(f'{int(secs / s)} {u}')
+                break
+        else:
+            append('0 seconds ago')
+    return result
@@ -0,0 +1,128 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.api import ARTICLE_FIELDS, MAX_PAGE_SIZE
+from readlater.models import Article, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class ArticleApiTest(TestUserMixin, TestCase):
+    NUM_ARTICLES = 7
+
+    def setUp(self):
+        super().setUp()
+        self.news = Category.objects.create(name='News', created_by=self.user)
+        self.sport = Category.objects.create(name='Sport', parent=self.news,
+                                             created_by=self.user)
+        self.articles = [Article.objects.create(name=f'Article {i}',
+                                                url=f'http://example.org/{i}',
+                                                category=self.sport if i % 2 else self.news,
+                                                priority=Article.PRIORITY_HIGH if i < 2
+                                                else Article.PRIORITY_NORMAL,
+                                                progress=100 if i == 0 else i,
+                                                created_by=self.user)
+                         for i in range(self.NUM_ARTICLES)]
+        other_user = User.objects.create_user('OtherUser')
+        Article.objects.create(name='Not mine', url='http://example.org',
+                               created_by=other_user)
+
+    def _get(self, url_name='api_article_list', status=200, **params):
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def test_default_fields(self):
+        self._login()
+        data = self._get()
+        self.assertEqual(len(data['results']), self.NUM_ARTICLES - 1)
+        self.assertEqual(list(data['results'][0]), list(ARTICLE_FIELDS))
+        self.assertIsNone(data['next'])
+        self.assertIsNone(data['previous'])
+
+    def test_sparse_fields(self):
+        self._login()
+        with CaptureQueriesContext(connection) as queries:
+            data = self._get(fields='id,name,progress')
+        self.assertEqual(list(data['results'][0]), ['id', 'name', 'progress'])
+        select = [q['sql'] for q in queries if 'FROM "readlater_article"' in q['sql']][0]
+        self.assertNotIn('"notes"', select)
+        self.assertNotIn('"url"', select)
+
+    def test_unknown_field(self):
+        self._login()
+        data = self._get(status=400, fields='id,password')
+        self.assertIn('fields must be', data['error'])
+
+    def test_same_order_and_filters_as_article_list(self):
+        self._login()
+        params = {'orderby': '-progress', 'filter_category': 'News'}
+        data = self._get(fields='id', **params)
+        response = self.client.get(reverse('article_list'), params)
+        self.assertEqual([row['id'] for row in data['results']],
+                         [a.pk for a in response.context['article_list']])
+        # sub-categories are included
+        self.assertEqual(len(data['results']), self.NUM_ARTICLES - 1)
+
+        data = self._get(fields='name', filter_priority='High')
+        self.assertEqual([row['name'] for row in data['results']], ['Article 1'])
+
+    def test_read_state(self):
+        self._login()
+        response = self.client.get(reverse('api_article_list_with_state',
+                                           kwargs={'state': 'read'}), {'fields': 'name'})
+        self.assertEqual(response.json()['results'], [{'name': 'Article 0'}])
+        response = self.client.get(reverse('api_article_list_with_state',
+                                           kwargs={'state': 'other'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_pagination(self):
+        self._login()
+        seen = []
+        # most progress first, as in ArticleList
+        data = self._get(fields='id', limit=2, orderby='progress')
+        while True:
+            seen.extend(row['id'] for row in data['results'])
+            if data['next'] is None:
+                break
+            data = self.client.get(data['next']).json()
+        self.assertEqual(seen, [a.pk for a in reversed(self.articles[1:])])
+        # back again
+        data = self.client.get(data['previous']).json()
+        self.assertEqual([row['id'] for row in data['results']], seen[-4:-2])
+
+    def test_invalid_parameters(self):
+        self._login()
+        self._get(status=400, limit=MAX_PAGE_SIZE + 1)
+        self._get(status=400, limit='x')
+        self._get(status=400, cursor='not a cursor')
+        self._get(status=400, orderby='objects')
+
+    def test_conditional_get_for_api_only_user(self):
+        # never opened the article list so has no list version yet
+        api_user = User.objects.create_user('ApiUser')
+        self.client.force_login(api_user)
+        for url_name in ('api_article_list', 'api_category_list'):
+            response = self.client.get(reverse(url_name))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Last-Modified', response)
+            response = self.client.get(reverse(url_name), HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+
+    def test_requires_login(self):
+        response = self.client.get(reverse('api_article_list'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_categories(self):
+        self._login()
+        data = self._get('api_category_list')
+        self.assertEqual(data['results'], [
+            {'id': self.news.pk, 'name': 'News', 'parent': None, 'path': self.news.path},
+            {'id': self.sport.pk, 'name': 'Sport', 'parent': self.news.pk,
+             'path': self.sport.path},
+        ])
+        data = self._get('api_category_list', fields='name', limit=1)
+        self.assertEqual(data['results'], [{'name': 'News'}])
+        self.assertIsNotNone(data['next'])
@@ -0,0 +1,150 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.models import Article, ArticleListVersion, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class ArticleBulkActionTest(TestUserMixin, TestCase):
+    NUM_ARTICLES = 6
+
+    def setUp(self):
+        super().setUp()
+        self.categ = Category.objects.create(name='Category 1', created_by=self.user)
+        self.articles = [Article.objects.create(name=f'Article {i}',
+                                                url=f'http://example.org/{i}',
+                                                progress=100 if i == 0 else 0,
+                                                created_by=self.user)
+                         for i in range(self.NUM_ARTICLES)]
+        self.other_user = User.objects.create_user('OtherUser')
+        self.other_article = Article.objects.create(name='Not mine', url='http://example.org',
+                                                    created_by=self.other_user)
+        self.version = ArticleListVersion.get_for_user(self.user).version
+
+    def _post(self, action, articles, **data):
+        data.update(action=action, articles=[a.pk for a in articles],
+                    next='/readlater/articles/read')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('article_bulk_action'), data=data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, '/readlater/articles/read')
+        return [q['sql'] for q in queries if 'readlater_article"' in q['sql']]
+
+    def _assert_version_bumped(self):
+        self.assertGreater(ArticleListVersion.get_for_user(self.user).version, self.version)
+
+    def test_mark_read(self):
+        self._login()
+        queries = self._post('mark_read', self.articles[1:3])
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith('UPDATE'))
+        for article in Article.objects.filter(pk__in=[a.pk for a in self.articles[1:3]]):
+            self.assertEqual(article.progress, 100)
+            self.assertIsNotNone(article.updated_time)
+            self.assertIsNotNone(article.finished_time)
+        self.assertEqual(Article.objects.filter(progress=100).count(), 3)
+        self._assert_version_bumped()
+
+    def test_set_priority_keeps_timestamp_rules(self):
+        self._login()
+        self._post('set_priority', self.articles[:2], priority=Article.PRIORITY_HIGHER)
+        read, unread = Article.objects.filter(pk__in=[a.pk for a in self.articles[:2]]).order_by('pk')
+        self.assertEqual((read.priority, unread.priority),
+                         (Article.PRIORITY_HIGHER, Article.PRIORITY_HIGHER))
+        # same as saving each article with ArticleEditView
+        self.assertIsNotNone(read.updated_time)
+        self.assertIsNotNone(read.finished_time)
+        self.assertIsNotNone(unread.updated_time)
+        self.assertIsNone(unread.finished_time)
+        self._assert_version_bumped()
+
+    def test_set_priority_requires_priority(self):
+        self._login()
+        self._post('set_priority', self.articles[:2])
+        self.assertFalse(Article.objects.exclude(priority=Article.PRIORITY_NORMAL).exists())
+        response = self.client.get(reverse('article_list'))
+        self.assertContains(response, 'Select the priority to set.')
+
+    def test_move_category(self):
+        self._login()
+        self._post('move_category', self.articles, category=self.categ.pk)
+        self.assertEqual(Article.objects.filter(category=self.categ).count(), self.NUM_ARTICLES)
+        self._post('move_category', self.articles[:2], category='')
+        self.assertEqual(Article.objects.filter(created_by=self.user,
+                                                category__isnull=True).count(), 2)
+
+    def test_move_to_other_users_category_rejected(self):
+        self._login()
+        other_categ = Category.objects.create(name='Other', created_by=self.other_user)
+        self._post('move_category', self.articles, category=other_categ.pk)
+        self.assertFalse(Article.objects.filter(category=other_categ).exists())
+
+    def test_delete(self):
+        self._login()
+        queries = self._post('delete', self.articles[:4])
+        self.assertEqual([q.split()[0] for q in queries], ['DELETE'])
+        self.assertEqual(Article.objects.filter(created_by=self.user).count(),
+                         self.NUM_ARTICLES - 4)
+        self._assert_version_bumped()
+        response = self.client.get(reverse('article_list'))
+        self.assertContains(response, 'Deleted 4 articles.')
+
+    def test_delete_queries_independent_of_count(self):
+        self._login()
+        more = [Article.objects.create(name=f'More {i}', url=f'http://example.org/more/{i}',
+                                       created_by=self.user) for i in range(30)]
+        # session, user, DELETE, version bump and events
+        with self.assertNumQueries(5):
+            self._post('delete', more)
+        self.assertFalse(Article.objects.filter(pk__in=[a.pk for a in more]).exists())
+        self._assert_version_bumped()
+
+    def test_other_users_articles_ignored(self):
+        self._login()
+        self._post('delete', [self.other_article])
+        self._post('mark_read', [self.other_article])
+        self.other_article.refresh_from_db()
+        self.assertEqual(self.other_article.progress, 0)
+        self.assertEqual(ArticleListVersion.get_for_user(self.user).version, self.version)
+
+    def test_no_articles_selected(self):
+        self._login()
+        self._post('delete', [])
+        self.assertEqual(Article.objects.filter(created_by=self.user).count(), self.NUM_ARTICLES)
+
+    def test_too_many_articles(self):
+        self._login()
+        response = self.client.post(reverse('article_bulk_action'), follow=True,
+                                    data={'action': 'delete', 'articles': list(range(1, 502))})
+        self.assertContains(response, 'Select at most 500 articles.')
+        self.assertEqual(Article.objects.filter(created_by=self.user).count(), self.NUM_ARTICLES)
+
+    def test_error_shown_by_conditional_get(self):
+        self._login()
+        url = reverse('article_list')
+        # first request sets the CSRF cookie which is part of the ETag
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        # invalid form does not change the list version
+        self.client.post(reverse('article_bulk_action'), data={'action': 'delete'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'No articles selected.')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_requires_login_and_post(self):
+        response = self.client.post(reverse('article_bulk_action'),
+                                    data={'action': 'delete', 'articles': [self.articles[0].pk]})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Article.objects.filter(created_by=self.user).count(), self.NUM_ARTICLES)
+        self._login()
+        response = self.client.get(reverse('article_bulk_action'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_list_has_checkboxes_and_form(self):
+        self._login()
+        response = self.client.get(reverse('article_list'))
+        self.assertContains(response, 'id="bulk-action-form"')
+        self.assertContains(response, 'form="bulk-action-form"', count=self.NUM_ARTICLES - 1)
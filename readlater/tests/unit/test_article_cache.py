@@ -0,0 +1,88 @@
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.models import Article, ArticleListVersion, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class ArticleListCacheTest(TestUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.categ = Category.objects.create(name='Category 1', created_by=self.user)
+        self.article = Article.objects.create(name='Article 1', url='http://example.org',
+                                              category=self.categ, created_by=self.user)
+
+    def _get_list(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('article_list'))
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in queries]
+
+    @staticmethod
+    def _get_table(response):
+        return str(BeautifulSoup(response.content, 'html.parser').find(id='table-article-list'))
+
+    @staticmethod
+    def _article_queries(queries):
+        return [sql for sql in queries if 'FROM "readlater_article"' in sql]
+
+    def test_cached_table_skips_article_queries(self):
+        self._login()
+        first, _ = self._get_list()
+        second, queries = self._get_list()
+        # the page around the table holds a per request CSRF token
+        self.assertEqual(self._get_table(first), self._get_table(second))
+        self.assertEqual(self._article_queries(queries), [])
+
+    def test_edit_invalidates_cache(self):
+        self._login()
+        self._get_list()
+        response = self.client.post(reverse('article_edit_form', args=(self.article.pk,)),
+                                    data={'name': 'Renamed Article',
+                                          'url': 'http://example.org',
+                                          'category': self.categ.pk,
+                                          'priority': 200,
+                                          'progress': 20})
+        self.assertEqual(response.status_code, 302)
+        response, queries = self._get_list()
+        self.assertContains(response, 'Renamed Article')
+        self.assertNotEqual(self._article_queries(queries), [])
+
+    def test_create_and_delete_invalidate_cache(self):
+        self._login()
+        self._get_list()
+        self.client.post(reverse('article_create_form'),
+                         data={'name': 'Article 2', 'url': 'http://example.org/2',
+                               'category': self.categ.pk, 'priority': 200})
+        response, _ = self._get_list()
+        self.assertContains(response, 'Article 2')
+
+        article = Article.objects.get(name='Article 2')
+        self.client.post(reverse('article_delete_form', args=(article.pk,)))
+        response, _ = self._get_list()
+        self.assertNotContains(response, 'Article 2')
+
+    def test_category_change_invalidates_cache(self):
+        self._login()
+        version = ArticleListVersion.get_for_user(self.user).version
+        self.client.post(reverse('category_edit_form', args=(self.categ.pk,)),
+                         data={'name': 'Renamed Category'})
+        self.assertGreater(ArticleListVersion.get_for_user(self.user).version, version)
+        response, _ = self._get_list()
+        self.assertContains(response, 'Renamed Category')
+
+    def test_other_user_change_keeps_cache(self):
+        other_user = User.objects.create_user('OtherUser')
+        self._login()
+        self._get_list()
+        version = ArticleListVersion.get_for_user(self.user).version
+        Article.objects.create(name='Not mine', url='http://example.org',
+                               created_by=other_user)
+        self.assertEqual(ArticleListVersion.get_for_user(self.user).version, version)
+        _, queries = self._get_list()
+        self.assertEqual(self._article_queries(queries), [])
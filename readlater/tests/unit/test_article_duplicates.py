@@ -0,0 +1,105 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from readlater.importers import import_articles
+from readlater.models import Article, get_url_hash, normalize_url
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class NormalizeUrlTest(TestCase):
+
+    def test_equivalent_urls(self):
+        urls = ['http://example.org/path/?b=2&a=1',
+                'https://www.Example.org/path?a=1&b=2#section',
+                'https://example.org:443/path/?a=1&utm_source=feed&b=2',
+                'http://EXAMPLE.org:80/path?fbclid=abc&b=2&a=1']
+        self.assertEqual({normalize_url(url) for url in urls}, {'//example.org/path?a=1&b=2'})
+        self.assertEqual(len({get_url_hash(url) for url in urls}), 1)
+
+    def test_different_urls(self):
+        urls = ['http://example.org/path', 'http://example.org/Path',
+                'http://example.org:8080/path', 'http://example.org/path?a=1',
+                'http://example.com/path']
+        self.assertEqual(len({get_url_hash(url) for url in urls}), len(urls))
+
+
+class ArticleDuplicateTest(TestUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other_user = User.objects.create_user('OtherUser')
+        self.article = Article.objects.create(name='Article 1', url='http://example.org/1',
+                                              created_by=self.user)
+
+    def test_save_sets_url_hash(self):
+        self.assertEqual(self.article.url_hash, get_url_hash('http://example.org/1'))
+        self.article.url = 'http://example.org/2'
+        self.article.save()
+        self.assertEqual(self.article.url_hash, get_url_hash('http://example.org/2'))
+
+    def test_name_unique_per_user(self):
+        Article.objects.create(name='Article 1', url='http://example.org/1',
+                               created_by=self.other_user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Article.objects.create(name='Article 1', url='http://example.org/2',
+                                   created_by=self.user)
+
+    def test_find_by_url(self):
+        self.assertEqual(Article.find_by_url(self.user, 'https://www.example.org/1/#top'),
+                         self.article)
+        self.assertIsNone(Article.find_by_url(self.other_user, 'http://example.org/1'))
+        with self.assertNumQueries(1):
+            Article.find_by_url(self.user, 'http://example.org/2')
+
+    def _create(self, **data):
+        data = dict({'name': 'Article 2', 'url': 'http://example.org/2', 'priority': 200},
+                    **data)
+        return self.client.post(reverse('article_create_form'), data=data)
+
+    def test_create_rejects_duplicate_url(self):
+        self._login()
+        response = self._create(url='https://example.org/1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'This URL is already saved as &quot;Article 1&quot;.')
+        self.assertEqual(Article.objects.count(), 1)
+
+    def test_create_rejects_duplicate_name(self):
+        self._login()
+        response = self._create(name='Article 1')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'You already have an article with this name.')
+
+    def test_create_allows_other_users_name_and_url(self):
+        self.client.force_login(user=self.other_user)
+        response = self._create(name='Article 1', url='http://example.org/1')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Article.objects.filter(name='Article 1').count(), 2)
+
+    def test_edit_rejects_duplicate_name(self):
+        article = Article.objects.create(name='Article 2', url='http://example.org/2',
+                                         created_by=self.user)
+        self._login()
+        data = {'name': 'Article 1', 'url': article.url, 'priority': 200, 'progress': 0}
+        response = self.client.post(reverse('article_edit_form', args=(article.pk,)), data=data)
+        self.assertContains(response, 'You already have an article with this name.')
+        # saving without renaming is fine
+        data['name'] = 'Article 2'
+        response = self.client.post(reverse('article_edit_form', args=(article.pk,)), data=data)
+        self.assertEqual(response.status_code, 302)
+
+    def test_import_skips_duplicate_urls(self):
+        data = '\n'.join(['{"name": "Same URL", "url": "https://www.example.org/1"}',
+                          '{"name": "New", "url": "http://example.org/3"}',
+                          '{"name": "New again", "url": "http://example.org/3/"}'])
+        result = import_articles(self.user, StringIO(data), 'jsonl')
+        self.assertEqual((result.created, result.skipped), (1, 2))
+        self.assertEqual(Article.objects.get(name='New').url_hash,
+                         get_url_hash('http://example.org/3'))
+
+        # other users can import the same articles
+        result = import_articles(self.other_user, StringIO(data), 'jsonl')
+        self.assertEqual((result.created, result.skipped), (2, 1))
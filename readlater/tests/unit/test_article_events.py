@@ -0,0 +1,205 @@
+import datetime
+import json
+from unittest import mock
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from readlater.async_views import AsyncArticleEventsView
+from readlater.events import get_last_event_id, prune_events
+from readlater.models import Article, ArticleEvent, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+
+def parse_events(response):
+    """Return list of dicts of the fields of each event in response."""
+    events = []
+    for block in response.content.decode().split('\n\n'):
+        event = dict(line.split(': ', 1) for line in block.splitlines())
+        if 'data' in event:
+            event['data'] = json.loads(event['data'])
+        if event:
+            events.append(event)
+    return events
+
+
+class ArticleEventsTest(TestUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.categ = Category.objects.create(name='News', created_by=self.user)
+        self.article = Article.objects.create(name='Article 1', url='http://example.org/1',
+                                              created_by=self.user)
+        self.url = reverse('article_events')
+
+    def _get_events(self, since=0, **extra):
+        response = self.client.get(self.url, {'since': since}, **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return [event for event in parse_events(response) if 'event' in event]
+
+    def test_progress_event(self):
+        self._login()
+        self.client.post(reverse('article_progress', args=(self.article.pk,)),
+                         data={'progress': 100})
+        events = self._get_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['event'], 'changed')
+        self.assertEqual(events[0]['data']['id'], self.article.pk)
+        fields = events[0]['data']['fields']
+        self.assertEqual(set(fields), {'progress', 'updated_time', 'finished_time'})
+        self.assertEqual(fields['progress'], 100)
+        self.assertNotEqual(fields['finished_time'], '')
+
+        # nothing after the last event seen
+        self.assertEqual(self._get_events(since=events[0]['id']), [])
+
+    def test_edit_sends_changed_fields(self):
+        self._login()
+        self.client.post(reverse('article_edit_form', args=(self.article.pk,)),
+                         data={'name': 'Renamed', 'url': self.article.url,
+                               'category': self.categ.pk, 'priority': self.article.priority,
+                               'progress': 0, 'notes': ''})
+        fields = self._get_events()[0]['data']['fields']
+        self.assertEqual(set(fields), {'name', 'category', 'updated_time', 'finished_time'})
+        self.assertEqual((fields['name'], fields['category'], fields['finished_time']),
+                         ('Renamed', 'News', ''))
+
+    def test_create_and_delete_events(self):
+        self._login()
+        self.client.post(reverse('article_create_form'),
+                         data={'name': 'Article 2', 'url': 'http://example.org/2',
+                               'priority': Article.PRIORITY_HIGH})
+        article = Article.objects.get(name='Article 2')
+        self.client.post(reverse('article_delete_form', args=(article.pk,)))
+        events = self._get_events()
+        self.assertEqual([(e['event'], e['data']['id']) for e in events],
+                         [('created', article.pk), ('deleted', article.pk)])
+        self.assertEqual(events[0]['data']['fields']['priority'], 'High')
+        self.assertEqual(events[0]['data']['fields']['category'], 'Uncategorized')
+
+    def test_bulk_action_events(self):
+        self._login()
+        other = Article.objects.create(name='Article 2', url='http://example.org/2',
+                                       created_by=self.user)
+        self.client.post(reverse('article_bulk_action'),
+                         data={'action': 'move_category', 'articles': [self.article.pk, other.pk],
+                               'category': self.categ.pk})
+        events = self._get_events()
+        self.assertEqual(sorted(e['data']['id'] for e in events),
+                         sorted([self.article.pk, other.pk]))
+        self.assertEqual(events[0]['data']['fields']['category'], 'News')
+
+    def test_only_own_events(self):
+        other_user = User.objects.create_user('OtherUser')
+        ArticleEvent.publish(other_user.pk, [1], ArticleEvent.ACTION_DELETED)
+        self._login()
+        self.assertEqual(self._get_events(), [])
+
+    def test_last_event_id_header(self):
+        self._login()
+        ArticleEvent.publish(self.user.pk, [self.article.pk], ArticleEvent.ACTION_DELETED)
+        last_id = ArticleEvent.objects.get().pk
+        # header sent when EventSource reconnects wins over the page's since
+        self.assertEqual(self._get_events(since=0, HTTP_LAST_EVENT_ID=str(last_id)), [])
+
+    def test_cursor_kept_without_events(self):
+        self._login()
+        ArticleEvent.publish(self.user.pk, [self.article.pk], ArticleEvent.ACTION_DELETED)
+        last_id = ArticleEvent.objects.get().pk
+        # without since only later events are sent
+        response = self.client.get(self.url)
+        self.assertEqual(parse_events(response)[-1], {'id': str(last_id)})
+
+    def test_reload_after_prune(self):
+        self._login()
+        for _ in range(3):
+            ArticleEvent.publish(self.user.pk, [self.article.pk], ArticleEvent.ACTION_DELETED)
+        seen, pruned, kept = ArticleEvent.objects.order_by('id')
+        ArticleEvent.objects.filter(pk__in=[seen.pk, pruned.pk]).update(
+            created_time=timezone.now() - datetime.timedelta(days=2))
+        self.assertEqual(prune_events(24 * 3600), 2)
+        events = self._get_events(since=seen.pk)
+        self.assertEqual([e['event'] for e in events], ['reload'])
+        self.assertEqual(events[0]['id'], str(kept.pk))
+        # up to date clients are not reloaded
+        self.assertEqual(len(self._get_events(since=pruned.pk)), 1)
+
+    def test_reload_after_prune_since_no_events(self):
+        self._login()
+        # page loaded before the user had any events listens from 0
+        since = 0
+        for _ in range(3):
+            ArticleEvent.publish(self.user.pk, [self.article.pk], ArticleEvent.ACTION_DELETED)
+        other_user = User.objects.create_user('OtherUser')
+        ArticleEvent.publish(other_user.pk, [None], ArticleEvent.ACTION_RELOAD)
+        ArticleEvent.objects.update(created_time=timezone.now() - datetime.timedelta(days=2))
+        # each user's newest event is kept
+        self.assertEqual(prune_events(24 * 3600), 2)
+        kept = ArticleEvent.objects.get(user=self.user)
+        self.assertTrue(ArticleEvent.objects.filter(user=other_user).exists())
+        events = self._get_events(since=since)
+        self.assertEqual([(e['event'], e['id']) for e in events], [('reload', str(kept.pk))])
+        self.assertEqual(self._get_events(since=kept.pk), [])
+
+    def test_list_page_listens_from_last_event(self):
+        self._login()
+        ArticleEvent.publish(self.user.pk, [self.article.pk], ArticleEvent.ACTION_DELETED)
+        response = self.client.get(reverse('article_list'))
+        self.assertContains(response, f'{self.url}?since={ArticleEvent.objects.get().pk}')
+        self.assertContains(response, 'data-field="progress"')
+
+    def test_requires_login(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(ROOT_URLCONF='readlater_django.asgi_urls',
+                   READLATER_ASYNC_DB_THREAD_SENSITIVE=True)
+class AsyncArticleEventsTest(TestUserMixin, TestCase):
+
+    def _get(self, since):
+        # Django 3.2's AsyncClient drops query parameters passed as data
+        url = f'{reverse("article_events")}?{urlencode({"since": since})}'
+        return async_to_sync(self.async_client.get)(url)
+
+    def test_answers_at_once_with_events(self):
+        self.async_client.force_login(self.user)
+        ArticleEvent.publish(self.user.pk, [1], ArticleEvent.ACTION_DELETED)
+        with mock.patch('asyncio.sleep') as sleep:
+            events = parse_events(self._get(0))
+        sleep.assert_not_called()
+        self.assertEqual([e.get('event') for e in events], [None, 'deleted'])
+        self.assertEqual(events[0], {'retry': str(AsyncArticleEventsView.retry)})
+
+    def test_waits_for_events(self):
+        self.async_client.force_login(self.user)
+        last_id = []
+
+        async def publish(seconds):
+            # event published by another request while waiting
+            if not last_id:
+                await sync_to_async(ArticleEvent.publish)(self.user.pk, [1],
+                                                          ArticleEvent.ACTION_DELETED)
+                last_id.append(await sync_to_async(get_last_event_id)(self.user.pk))
+
+        with mock.patch('asyncio.sleep', publish), \
+                mock.patch.object(AsyncArticleEventsView, 'wait', 3), \
+                mock.patch.object(AsyncArticleEventsView, 'poll_interval', 0):
+            events = parse_events(self._get(0))
+        self.assertEqual(events[-1]['id'], str(last_id[0]))
+        self.assertEqual(events[-1]['event'], 'deleted')
+
+    def test_ends_after_wait(self):
+        self.async_client.force_login(self.user)
+        with mock.patch.object(AsyncArticleEventsView, 'wait', 0.01), \
+                mock.patch.object(AsyncArticleEventsView, 'poll_interval', 0.001):
+            events = parse_events(self._get(5))
+        self.assertEqual(events[-1], {'id': '5'})
+
+    def test_requires_login(self):
+        self.assertEqual(self._get(0).status_code, 403)
@@ -0,0 +1,87 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+
+from readlater.models import Article, Category, get_url_hash
+from readlater.pagination import KeysetPaginator
+from readlater.tests.unit.utils import TestUserMixin
+from readlater.views import ArticleList
+
+
+class ArticleListIndexTest(TestUserMixin, TestCase):
+    """
+    Check the query planner uses the index made for each article list
+    ordering on a dataset large enough that a table scan would be a poor plan.
+    """
+    NUM_OTHER_USERS = 9
+    NUM_ARTICLES = 1000
+    NUM_CATEGORIES = 10
+
+    # expected index for each (state, orderby) combination
+    EXPECTED_INDEXES = {
+        ('unread', 'priority'): 'rl_unread_priority_idx',
+        ('unread', 'category'): 'rl_unread_category_idx',
+        ('unread', 'progress'): 'rl_unread_progress_idx',
+        ('unread', '-added_time'): 'rl_added_idx',
+        ('unread', '-updated_time'): 'rl_updated_idx',
+        ('unread', 'rank'): 'rl_unread_rank_idx',
+        ('read', 'priority'): 'rl_read_priority_idx',
+        ('read', 'category'): 'rl_read_category_idx',
+        ('read', 'progress'): 'rl_read_progress_idx',
+        ('read', '-finished_time'): 'rl_read_finished_idx',
+        ('read', '-added_time'): 'rl_added_idx',
+        ('read', '-updated_time'): 'rl_updated_idx',
+        ('read', 'rank'): 'rl_read_rank_idx',
+    }
+
+    def setUp(self):
+        super().setUp()
+        users = [self.user] + [User.objects.create_user(f'Other {i}')
+                               for i in range(self.NUM_OTHER_USERS)]
+        base = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+        priorities = [value for value, _ in Article.PRIORITY_CHOICES]
+        articles = []
+        for user in users:
+            categs = [Category.objects.create(name=f'Category {i}', created_by=user)
+                      for i in range(self.NUM_CATEGORIES)]
+            for i in range(self.NUM_ARTICLES):
+                progress = 100 if i % 4 == 0 else (i * 7) % 100
+                url = f'http://example.org/{user.pk}/{i}'
+                articles.append(Article(
+                    name=f'{user.username} Article {i}',
+                    url=url,
+                    url_hash=get_url_hash(url),
+                    category=categs[i % self.NUM_CATEGORIES],
+                    priority=priorities[i % len(priorities)],
+                    progress=progress,
+                    added_time=base + datetime.timedelta(hours=i),
+                    updated_time=base + datetime.timedelta(hours=2 * i) if i % 3 else None,
+                    finished_time=base + datetime.timedelta(hours=3 * i) if progress == 100 else None,
+                    created_by=user))
+        Article.objects.bulk_create(articles, batch_size=500)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _get_page_queryset(self, state, order_col):
+        request = RequestFactory().get('/readlater/articles/', {'orderby': order_col})
+        request.user = self.user
+        view = ArticleList()
+        view.setup(request, state=state)
+        paginator = KeysetPaginator(view.get_queryset(), view._get_order_hier(),
+                                    ArticleList.paginate_by)
+        return paginator.queryset.order_by(*paginator._order_by(False))[:paginator.per_page + 1]
+
+    def test_orderings_use_index(self):
+        for (state, order_col), index_name in self.EXPECTED_INDEXES.items():
+            with self.subTest(state=state, orderby=order_col):
+                plan = self._get_page_queryset(state, order_col).explain()
+                self.assertIn(index_name, plan)
+
+    def test_url_lookup_uses_index(self):
+        url = f'http://example.org/{self.user.pk}/10'
+        queryset = Article.objects.filter(created_by=self.user, url_hash=get_url_hash(url))
+        self.assertIn('rl_url_hash_idx', queryset.explain())
+        self.assertEqual(Article.find_by_url(self.user, url).url, url)
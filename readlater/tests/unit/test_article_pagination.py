@@ -0,0 +1,132 @@
+import datetime
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from readlater.models import Article, Category
+from readlater.tests.unit.utils import TestUserMixin
+from readlater.views import ArticleList
+
+PAGE_SIZE = 4
+
+
+def _sort_key(article, order_hier):
+    """
+    Python equivalent of the keyset ordering with NULL values placed as the
+    database does natively and pk as the final tie breaker.
+    """
+    nulls_largest = connection.vendor in ('postgresql', 'oracle')
+    key = []
+    for order_col in order_hier:
+        name = order_col.lstrip('-')
+        value = getattr(article, Article._meta.get_field(name).attname)
+        if isinstance(value, datetime.datetime):
+            value = value.timestamp()
+        # rank NULL against non-NULL values the same way the database does
+        null_rank = (value is None) == nulls_largest
+        if order_col.startswith('-'):
+            key.append((not null_rank, -(value or 0)))
+        else:
+            key.append((null_rank, value or 0))
+    key.append(article.pk)
+    return key
+
+
+@mock.patch.object(ArticleList, 'paginate_by', PAGE_SIZE)
+class ArticleListPaginationTest(TestUserMixin, TestCase):
+    NUM_ARTICLES = 15
+    NUM_CATEGORIES = 3
+
+    def setUp(self):
+        super().setUp()
+        categs = [Category.objects.create(name=f'Category {i}', created_by=self.user)
+                  for i in range(self.NUM_CATEGORIES)] + [None]
+        base = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+        for i in range(self.NUM_ARTICLES):
+            # use repeated values and NULLs so tie breaking is exercised
+            Article.objects.create(name=f'Article {i}',
+                                   category=categs[i % len(categs)],
+                                   priority=(i % 3) * 100,
+                                   progress=(i % 4) * 10,
+                                   added_time=base + datetime.timedelta(days=i % 5),
+                                   updated_time=None if i % 2 else base,
+                                   created_by=self.user)
+
+    def _walk(self, query, direction='next'):
+        """Follow cursors and return list of article pk for each page."""
+        pages = []
+        params = dict(query)
+        while True:
+            response = self.client.get(f'{reverse("article_list")}?{urlencode(params)}')
+            self.assertEqual(response.status_code, 200)
+            page = response.context['page_obj']
+            pages.append([a.pk for a in page.object_list])
+            cursor = page.next_cursor if direction == 'next' else page.previous_cursor
+            if cursor is None:
+                return pages, response
+            params = dict(query, cursor=cursor)
+
+    def test_pages_follow_ordering(self):
+        self._login()
+        for order_col, order_hier in ArticleList._order_hier.items():
+            pages, _ = self._walk({'orderby': order_col})
+            self.assertTrue(all(len(p) <= PAGE_SIZE for p in pages))
+            seen = [pk for p in pages for pk in p]
+
+            articles = list(Article.objects.filter(progress__lt=100))
+            articles.sort(key=lambda a: _sort_key(a, order_hier))
+            self.assertEqual(seen, [a.pk for a in articles])
+
+    def test_pages_single_field_ordering(self):
+        self._login()
+        pages, _ = self._walk({'orderby': '-updated_time'})
+        seen = [pk for p in pages for pk in p]
+        articles = list(Article.objects.filter(progress__lt=100))
+        articles.sort(key=lambda a: _sort_key(a, ('-updated_time',)))
+        self.assertEqual(seen, [a.pk for a in articles])
+
+    def test_previous_cursor_returns_same_pages(self):
+        self._login()
+        forward, response = self._walk({'orderby': 'category'})
+        last_page = response.context['page_obj']
+
+        backward, _ = self._walk({'orderby': 'category',
+                                  'cursor': last_page.previous_cursor},
+                                 direction='previous')
+        self.assertEqual(list(reversed(backward)), forward[:-1])
+
+    def test_first_page_has_no_previous(self):
+        self._login()
+        response = self.client.get(reverse('article_list'))
+        page = response.context['page_obj']
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+        self.assertContains(response, 'id="article-list-next"')
+        self.assertNotContains(response, 'id="article-list-prev"')
+
+    def test_no_offset_or_count(self):
+        self._login()
+        _, response = self._walk({'orderby': 'priority'})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'{reverse("article_list")}?'
+                            f'{urlencode({"cursor": response.context["page_obj"].previous_cursor})}')
+        for query in queries:
+            self.assertNotIn('OFFSET', query['sql'].upper())
+            self.assertNotIn('COUNT(*)', query['sql'].upper())
+
+    def test_cursor_from_other_ordering_rejected(self):
+        self._login()
+        response = self.client.get(f'{reverse("article_list")}?orderby=priority')
+        cursor = response.context['page_obj'].next_cursor
+        response = self.client.get(f'{reverse("article_list")}?'
+                                   f'{urlencode({"orderby": "progress", "cursor": cursor})}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_cursor(self):
+        self._login()
+        response = self.client.get(f'{reverse("article_list")}?cursor=notacursor')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,76 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.models import Article, ArticleListVersion
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class ArticleProgressTest(TestUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.article = Article.objects.create(name='Article 1', url='http://example.org/1',
+                                              created_by=self.user)
+        self.url = reverse('article_progress', args=(self.article.pk,))
+
+    def test_form_post(self):
+        self._login()
+        version = ArticleListVersion.get_for_user(self.user).version
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data={'progress': 40})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['id'], data['progress'], data['finished_time']),
+                         (self.article.pk, 40, None))
+
+        # one UPDATE of the article, no SELECT and nothing rendered
+        article_queries = [q['sql'] for q in queries if 'readlater_article"' in q['sql']]
+        self.assertEqual(len(article_queries), 1)
+        self.assertTrue(article_queries[0].startswith('UPDATE'))
+        self.assertGreater(ArticleListVersion.get_for_user(self.user).version, version)
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.progress, 40)
+        self.assertIsNotNone(self.article.updated_time)
+        self.assertIsNone(self.article.finished_time)
+
+    def test_json_post_finish_and_reopen(self):
+        self._login()
+        response = self.client.post(self.url, data=json.dumps({'progress': 100}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()['finished_time'])
+        self.article.refresh_from_db()
+        self.assertIsNotNone(self.article.finished_time)
+
+        self.client.post(self.url, data={'progress': 90})
+        self.article.refresh_from_db()
+        self.assertIsNone(self.article.finished_time)
+
+    def test_invalid_progress(self):
+        self._login()
+        for data in ({}, {'progress': 'half'}, {'progress': 101}, {'progress': -1}):
+            response = self.client.post(self.url, data=data)
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, data='[1]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_article(self):
+        other_user = User.objects.create_user('OtherUser')
+        self.client.force_login(user=other_user)
+        response = self.client.post(self.url, data={'progress': 50})
+        self.assertEqual(response.status_code, 404)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.progress, 0)
+
+    def test_requires_login_and_post(self):
+        response = self.client.post(self.url, data={'progress': 50})
+        self.assertEqual(response.status_code, 403)
+        self._login()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,140 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.models import Article, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class ArticleQueryBudgetTest(TestUserMixin, TestCase):
+    """
+    Check the number of queries made by each article view does not grow
+    with the number of articles and categories shown.
+    """
+
+    def _add_articles(self, count):
+        start = Article.objects.count()
+        for i in range(start, start + count):
+            categ = Category.objects.create(name=f'Category {i}', created_by=self.user)
+            Article.objects.create(name=f'Article {i}', url=f'http://example.org/{i}',
+                                   category=categ, created_by=self.user)
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def _assert_constant_queries(self, get_url):
+        self._add_articles(2)
+        # first request creates per user records so is not counted
+        self._count_queries(get_url())
+        self._add_articles(1)
+        small = self._count_queries(get_url())
+        self._add_articles(10)
+        large = self._count_queries(get_url())
+        self.assertEqual(small, large)
+
+    def test_article_list_queries(self):
+        self._login()
+        self._assert_constant_queries(lambda: reverse('article_list'))
+
+    def test_article_list_filtered_queries(self):
+        self._login()
+        self._assert_constant_queries(
+            lambda: reverse('article_list') + '?filter_priority=Normal&orderby=category')
+
+    def test_article_edit_queries(self):
+        self._login()
+        self._assert_constant_queries(
+            lambda: reverse('article_edit_form', args=(Article.objects.first().pk,)))
+
+    def test_article_delete_queries(self):
+        self._login()
+        self._assert_constant_queries(
+            lambda: reverse('article_delete_form', args=(Article.objects.first().pk,)))
+
+    def test_admin_article_changelist_queries(self):
+        self.user.is_staff = True
+        self.user.is_superuser = True
+        self.user.save()
+        self._login()
+        self._assert_constant_queries(
+            lambda: reverse('admin:readlater_article_changelist'))
+
+
+class OwnedObjectQueryTest(TestUserMixin, TestCase):
+    """
+    Check edit and delete views fetch their object with one query and answer
+    404 for missing objects and 403 for other users' objects.
+    """
+    URL_NAMES = ['article_edit_form', 'article_delete_form',
+                 'category_edit_form', 'category_delete_form']
+
+    def setUp(self):
+        super().setUp()
+        self.other_user = User.objects.create_user('OtherUser')
+        self.objects = {}
+        for user in (self.user, self.other_user):
+            categ = Category.objects.create(name=f'Category {user.username}', created_by=user)
+            article = Article.objects.create(name=f'Article {user.username}',
+                                             url='http://example.org',
+                                             category=categ, created_by=user)
+            self.objects[user] = {'article': article, 'category': categ}
+
+    def _get(self, url_name, user, pk=None):
+        model_name = url_name.split('_')[0]
+        if pk is None:
+            pk = self.objects[user][model_name].pk
+        table = f'FROM "readlater_{model_name}"'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name, args=(pk,)))
+        lookup = f'"readlater_{model_name}"."id" = {pk}'
+        object_queries = [q['sql'] for q in queries
+                          if q['sql'].startswith('SELECT') and table in q['sql']
+                          and lookup in q['sql'] and f'NOT ({lookup})' not in q['sql']]
+        return response, object_queries
+
+    def test_object_fetched_once(self):
+        self._login()
+        for url_name in self.URL_NAMES:
+            with self.subTest(url_name=url_name):
+                response, object_queries = self._get(url_name, self.user)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(object_queries), 1)
+
+    def test_article_category_fetched_with_article(self):
+        self._login()
+        for url_name in ('article_edit_form', 'article_delete_form'):
+            _, object_queries = self._get(url_name, self.user)
+            self.assertIn('JOIN "readlater_category"', object_queries[0])
+
+    def test_other_users_object_forbidden(self):
+        self._login()
+        for url_name in self.URL_NAMES:
+            with self.subTest(url_name=url_name):
+                response, object_queries = self._get(url_name, self.other_user)
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(len(object_queries), 1)
+
+    def test_missing_object_not_found(self):
+        self._login()
+        for url_name in self.URL_NAMES:
+            with self.subTest(url_name=url_name):
+                response, object_queries = self._get(url_name, self.user, pk=9999)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(len(object_queries), 1)
+
+    def test_other_users_object_not_changed(self):
+        self._login()
+        article = self.objects[self.other_user]['article']
+        response = self.client.post(reverse('article_delete_form', args=(article.pk,)))
+        self.assertEqual(response.status_code, 403)
+        categ = self.objects[self.other_user]['category']
+        response = self.client.post(reverse('category_edit_form', args=(categ.pk,)),
+                                    data={'name': 'Renamed'})
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Article.objects.filter(pk=article.pk).exists())
+        self.assertEqual(Category.objects.get(pk=categ.pk).name, categ.name)
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from bs4 import BeautifulSoup
+from django.test import TestCase
+from django.urls import reverse
+
+from readlater.models import Article, Category
+from readlater.tests.unit.utils import TestUserMixin
+from readlater.views import ArticleList
+
+
+@mock.patch.object(ArticleList, 'paginate_by', 5)
+@mock.patch.object(ArticleList, 'stream_chunk_size', 4)
+class ArticleListStreamTest(TestUserMixin, TestCase):
+    NUM_ARTICLES = 11
+
+    def setUp(self):
+        super().setUp()
+        categ = Category.objects.create(name='Category 1', created_by=self.user)
+        for i in range(self.NUM_ARTICLES):
+            Article.objects.create(name=f'Article {i}', url=f'http://example.org/{i}',
+                                   category=categ if i % 2 else None,
+                                   priority=(i % 5) * 100, progress=i,
+                                   created_by=self.user)
+
+    def _get_names(self, content):
+        table = BeautifulSoup(content, 'html.parser').find(id='table-article-list')
+        return [row.find_all('td')[1].getText() for row in table.find('tbody').find_all('tr')]
+
+    def test_stream_all_articles(self):
+        self._login()
+        response = self.client.get(f'{reverse("article_list")}?orderby=progress&show=all')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+
+        chunks = list(response.streaming_content)
+        # head, one chunk per stream_chunk_size rows, then the rest of the page
+        self.assertEqual(len(chunks), 2 + 3)
+        self.assertIn(b'<h4>Article List', chunks[0])
+        self.assertIn(b'</html>', chunks[-1])
+
+        names = self._get_names(b''.join(chunks))
+        expected = [f'Article {i}' for i in reversed(range(self.NUM_ARTICLES))]
+        self.assertEqual(names, expected)
+
+    def test_stream_applies_filters(self):
+        self._login()
+        response = self.client.get(f'{reverse("article_list")}?show=all&filter_category=Category+1')
+        names = self._get_names(b''.join(response.streaming_content))
+        self.assertEqual(len(names), self.NUM_ARTICLES // 2)
+
+    def test_paginated_links_to_show_all(self):
+        self._login()
+        response = self.client.get(reverse('article_list'))
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'show=all')
@@ -124,6 +124,65 @@ class ArticleListViewTest(TestUserMixin, TestCase):
                 cols = row.find_all('td')
                 self.assertEqual(cols[2].getText(), categ.name)
 
+            # filtering is done by the queryset so context only holds matches
+            self.assertEqual(len(response.context['article_list']), expected_rows)
+
+    def test_view_filter_counts(self):
+        self._login()
+        response = self.client.get('/readlater/articles/')
+        soup = BeautifulSoup(response.content, 'html.parser')
+
+        select = soup.find(id='filtertable-select-category')
+        labels = [option['label'] for option in select.find_all('option')]
+        expected = [f'ALL ({ArticleListViewTest.NUM_ARTICLES})']
+        for categ in Category.objects.order_by('name'):
+            expected.append(f'{categ.name} ({Article.objects.filter(category=categ).count()})')
+        self.assertEqual(labels, expected)
+
+        select = soup.find(id='filtertable-select-priority')
+        labels = {option['value']: option['label'] for option in select.find_all('option')}
+        for value, name in Article.PRIORITY_CHOICES:
+            count = Article.objects.filter(priority=value).count()
+            self.assertEqual(labels[name], f'{name} ({count})')
+
+    def test_view_filter_counts_use_other_filter(self):
+        self._login()
+        query = urlencode(dict(filter_category='Category 1', filter_priority='High'))
+        response = self.client.get(f'/readlater/articles/?{query}')
+        soup = BeautifulSoup(response.content, 'html.parser')
+
+        # category counts are limited to selected priority and vice versa
+        select = soup.find(id='filtertable-select-category')
+        labels = {option['value']: option['label'] for option in select.find_all('option')}
+        count = Article.objects.filter(category__name='Category 1', priority=100).count()
+        self.assertEqual(labels['Category 1'], f'Category 1 ({count})')
+        self.assertEqual(labels['Category 2'], 'Category 2 (0)')
+
+        select = soup.find(id='filtertable-select-priority')
+        labels = {option['value']: option['label'] for option in select.find_all('option')}
+        count = Article.objects.filter(category__name='Category 1').count()
+        self.assertEqual(labels[''], f'ALL ({count})')
+
+    def test_view_filter_priority(self):
+        self._login()
+
+        for value, name in Article.PRIORITY_CHOICES:
+            query = urlencode(dict(filter_priority=name))
+            response = self.client.get(f'/readlater/articles/?{query}')
+            self.assertEqual(response.status_code, 200)
+
+            expected = Article.objects.filter(priority=value, progress__lt=100)
+            self.assertEqual(len(response.context['article_list']), len(expected))
+            for article in response.context['article_list']:
+                self.assertEqual(article.priority, value)
+
+    def test_view_filter_priority_invalid(self):
+        self._login()
+        query = urlencode(dict(filter_priority='Not A Priority'))
+        response = self.client.get(f'/readlater/articles/?{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['article_list']), 0)
+
 
 class ArticleCreateNewViewTest(TestUserMixin, TestCase):
     MAX_NAME_LEN = 100
@@ -0,0 +1,178 @@
+import asyncio
+import csv
+from io import StringIO
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from readlater.asgi_handler import StreamingASGIHandler
+from readlater.models import Article, Category
+from readlater.tests.unit.utils import TestUserMixin, get_login_redirect_url
+from readlater_django.asgi import application
+
+
+def call_asgi(test, app, path, query_string=b'', headers=()):
+    """Return (status, headers, body messages) of a GET of path served by ASGI app."""
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': query_string,
+        'headers': [(b'host', b'testserver')] + list(headers),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async_to_sync(app)(scope, receive, send)
+    start, body = messages[0], messages[1:]
+    test.assertEqual(start['type'], 'http.response.start')
+    # closed by a last empty message
+    test.assertEqual(body[-1], {'type': 'http.response.body'})
+    return start['status'], dict(start['headers']), body
+
+
+# views run on the test's own thread to see data in its transaction
+@override_settings(ROOT_URLCONF='readlater_django.asgi_urls',
+                   READLATER_ASYNC_DB_THREAD_SENSITIVE=True)
+class AsyncViewsTest(TestUserMixin, TestCase):
+    NUM_ARTICLES = 5
+
+    def setUp(self):
+        super().setUp()
+        self.news = Category.objects.create(name='News', created_by=self.user)
+        self.articles = [Article.objects.create(name=f'Article {i}',
+                                                url=f'http://example.org/{i}',
+                                                category=self.news if i % 2 else None,
+                                                progress=i * 10,
+                                                created_by=self.user)
+                         for i in range(self.NUM_ARTICLES)]
+
+    def _get(self, url, params=None, **extra):
+        # Django 3.2's AsyncClient drops query parameters passed as data
+        if params:
+            url = f'{url}?{urlencode(params)}'
+        return async_to_sync(self.async_client.get)(url, **extra)
+
+    def _post(self, url, data):
+        return async_to_sync(self.async_client.post)(
+            url, data, content_type='application/x-www-form-urlencoded')
+
+    def _asgi_get(self, url, params):
+        """
+        Return (status, headers, body messages) of a GET of url by the logged in
+        user served by StreamingASGIHandler, as readlater_django/asgi.py.
+        """
+        # as the test client, keep the connection holding the test's transaction
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        self._login()
+        session_id = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        return call_asgi(self, StreamingASGIHandler(), url, urlencode(params).encode(),
+                         [(b'cookie', f'{settings.SESSION_COOKIE_NAME}={session_id}'.encode())])
+
+    def test_views_are_async(self):
+        for url in (reverse('article_list'),
+                    reverse('article_progress', args=(self.articles[0].pk,)),
+                    reverse('api_article_list'), reverse('api_category_list')):
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(url).func), url)
+        self.assertFalse(asyncio.iscoroutinefunction(resolve(reverse('settings')).func))
+
+    def test_article_list(self):
+        self._login()
+        self.async_client.force_login(self.user)
+        for params in ({}, {'filter_category': 'News'}, {'orderby': 'progress'}):
+            response = self._get(reverse('article_list'), params)
+            self.assertEqual(response.status_code, 200)
+            # so the table is rendered again rather than taken from the cache
+            cache.clear()
+            expected = self.client.get(reverse('article_list'), params)
+            self.assertEqual([a.pk for a in response.context['article_list']],
+                             [a.pk for a in expected.context['article_list']])
+
+    def test_streamed_article_list(self):
+        self.async_client.force_login(self.user)
+        response = self._get(reverse('article_list'), {'show': 'all'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        page = b''.join(response.streaming_content).decode()
+        for article in self.articles:
+            self.assertIn(article.name, page)
+
+    def test_streamed_article_list_asgi(self):
+        status, headers, body = self._asgi_get(reverse('article_list'), {'show': 'all'})
+        self.assertEqual(status, 200)
+        # sent as it is rendered rather than read first
+        self.assertGreater(len(body), 2)
+        page = b''.join(message.get('body', b'') for message in body).decode()
+        for article in self.articles:
+            self.assertIn(article.name, page)
+        self.assertTrue(page.rstrip().endswith('</html>'))
+
+    def test_export_asgi(self):
+        status, headers, body = self._asgi_get(reverse('article_export'), {'format': 'csv'})
+        self.assertEqual(status, 200)
+        self.assertIn(b'attachment;', headers[b'Content-Disposition'])
+        content = b''.join(message.get('body', b'') for message in body).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row['name'] for row in rows], [a.name for a in self.articles])
+
+    def test_api(self):
+        self._login()
+        self.async_client.force_login(self.user)
+        # article list creates the change counter used for the ETag
+        self._get(reverse('article_list'))
+        for url, params in ((reverse('api_article_list'), {'fields': 'id,name', 'limit': 2}),
+                            (reverse('api_category_list'), {})):
+            response = self._get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), self.client.get(url, params).json())
+            # conditional GET still answered without a body
+            # AsyncClient sends extra keyword arguments as header names
+            response = self._get(url, params, **{'If-None-Match': response['ETag']})
+            self.assertEqual(response.status_code, 304)
+
+    def test_progress(self):
+        self.async_client.force_login(self.user)
+        article = self.articles[1]
+        response = self._post(reverse('article_progress', args=(article.pk,)), 'progress=100')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['progress'], 100)
+        article.refresh_from_db()
+        self.assertEqual(article.progress, 100)
+        self.assertIsNotNone(article.finished_time)
+
+    def test_requires_login(self):
+        url = reverse('article_list')
+        response = self._get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, get_login_redirect_url(url))
+        self.assertEqual(self._get(reverse('api_article_list')).status_code, 403)
+        response = self._post(reverse('article_progress', args=(self.articles[0].pk,)),
+                              'progress=50')
+        self.assertIn(response.status_code, (302, 403))
+        self.articles[0].refresh_from_db()
+        self.assertEqual(self.articles[0].progress, 0)
+
+
+class AsgiStaticFilesTest(SimpleTestCase):
+
+    def test_collected_file_served(self):
+        status, headers, body = call_asgi(self, application, '/static/css/bootstrap.min.css')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b'Content-Type'], b'text/css; charset="utf-8"')
+        with open(settings.STATIC_ROOT + '/css/bootstrap.min.css', 'rb') as f:
+            self.assertEqual(b''.join(message.get('body', b'') for message in body), f.read())
+        # conditional GET is answered by WhiteNoise
+        status, _, body = call_asgi(self, application, '/static/css/bootstrap.min.css',
+                                    headers=[(b'if-none-match', headers[b'ETag'])])
+        self.assertEqual((status, body), (304, [{'type': 'http.response.body'}]))
@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.categories import delete_category, reassign_deleted_category
+from readlater.models import Article, ArticleListVersion, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class CategoryDeleteTest(TestUserMixin, TestCase):
+    NUM_ARTICLES = 7
+
+    def setUp(self):
+        super().setUp()
+        self.categ = Category.objects.create(name='Category 1', created_by=self.user)
+        self.target = Category.objects.create(name='Category 2', created_by=self.user)
+        for i in range(self.NUM_ARTICLES):
+            Article.objects.create(name=f'Article {i}', url=f'http://example.org/{i}',
+                                   category=self.categ, created_by=self.user)
+
+    def _post_delete(self, **data):
+        return self.client.post(reverse('category_delete_form', args=(self.categ.pk,)),
+                                data=data)
+
+    @override_settings(READLATER_BACKGROUND_TASKS='command')
+    def test_delete_returns_before_moving_articles(self):
+        self._login()
+        version = ArticleListVersion.get_for_user(self.user).version
+        with CaptureQueriesContext(connection) as queries:
+            response = self._post_delete(reassign_to=self.target.pk)
+        self.assertRedirects(response, reverse('settings'))
+        # no articles were touched by the request
+        self.assertFalse([q for q in queries if 'UPDATE "readlater_article"' in q['sql']])
+        self.assertEqual(Article.objects.filter(category=self.categ).count(), self.NUM_ARTICLES)
+
+        # category is hidden at once
+        self.assertFalse(Category.objects.filter(pk=self.categ.pk).exists())
+        self.assertGreater(ArticleListVersion.get_for_user(self.user).version, version)
+        response = self.client.get(reverse('settings'))
+        self.assertNotContains(response, 'Category 1')
+        response = self.client.get(reverse('article_create_form'))
+        self.assertNotContains(response, 'Category 1')
+
+        out = StringIO()
+        call_command('process_category_deletions', stdout=out)
+        self.assertIn(f'Deleted category {self.categ.pk}, moved {self.NUM_ARTICLES} articles',
+                      out.getvalue())
+        self.assertEqual(Article.objects.filter(category=self.target).count(), self.NUM_ARTICLES)
+        self.assertFalse(Category.all_objects.filter(pk=self.categ.pk).exists())
+
+    @override_settings(READLATER_BACKGROUND_TASKS='sync')
+    def test_delete_to_uncategorized(self):
+        self._login()
+        response = self._post_delete()
+        self.assertRedirects(response, reverse('settings'))
+        self.assertEqual(Article.objects.filter(category__isnull=True).count(), self.NUM_ARTICLES)
+        self.assertFalse(Category.all_objects.filter(pk=self.categ.pk).exists())
+
+    def test_delete_starts_thread_after_commit(self):
+        self._login()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self._post_delete()
+        self.assertEqual(len(callbacks), 1)
+
+    @override_settings(READLATER_BACKGROUND_TASKS='command')
+    def test_reassign_in_batches(self):
+        delete_category(self.categ, self.target)
+        with CaptureQueriesContext(connection) as queries:
+            moved = reassign_deleted_category(self.categ.pk, batch_size=3)
+        self.assertEqual(moved, self.NUM_ARTICLES)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "readlater_article"')]
+        self.assertEqual(len(updates), 3)
+        # running again does nothing
+        self.assertEqual(reassign_deleted_category(self.categ.pk), 0)
+
+    @override_settings(READLATER_BACKGROUND_TASKS='command')
+    def test_deleted_target_followed(self):
+        other = Category.objects.create(name='Category 3', created_by=self.user)
+        delete_category(self.categ, self.target)
+        delete_category(self.target, other)
+        reassign_deleted_category(self.categ.pk)
+        self.assertEqual(Article.objects.filter(category=other).count(), self.NUM_ARTICLES)
+
+    @override_settings(READLATER_BACKGROUND_TASKS='command')
+    def test_cannot_move_to_other_users_category(self):
+        other_user = User.objects.create_user('OtherUser')
+        other_categ = Category.objects.create(name='Other', created_by=other_user)
+        self._login()
+        response = self._post_delete(reassign_to=other_categ.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Category.objects.filter(pk=self.categ.pk).exists())
+
+    @override_settings(READLATER_BACKGROUND_TASKS='command')
+    def test_delete_form_lists_other_categories(self):
+        self._login()
+        response = self.client.get(reverse('category_delete_form', args=(self.categ.pk,)))
+        self.assertContains(response, 'Uncategorized')
+        self.assertContains(response, f'<option value="{self.target.pk}">Category 2</option>')
+        self.assertNotContains(response, f'<option value="{self.categ.pk}">')
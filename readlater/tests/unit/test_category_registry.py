@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.models import Article, Category
+from readlater.registry import CategoryRegistry, category_registry
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class CategoryRegistryTest(TestUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.news = Category.objects.create(name='News', created_by=self.user)
+        self.sport = Category.objects.create(name='Sport', parent=self.news,
+                                             created_by=self.user)
+        self.tech = Category.objects.create(name='Tech', created_by=self.user)
+        self.other_user = User.objects.create_user('OtherUser')
+        self.other_categ = Category.objects.create(name='Tech', created_by=self.other_user)
+
+    def _category_queries(self, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            result = func(*args, **kwargs)
+        return result, [q['sql'] for q in queries if 'FROM "readlater_category"' in q['sql']]
+
+    def test_lookups(self):
+        self.assertEqual([c.name for c in category_registry.get_categories(self.user.pk)],
+                         ['News', 'Sport', 'Tech'])
+        self.assertEqual(category_registry.get_id(self.user.pk, 'Tech'), self.tech.pk)
+        self.assertEqual(category_registry.get_id(self.other_user.pk, 'Tech'),
+                         self.other_categ.pk)
+        self.assertIsNone(category_registry.get_id(self.user.pk, 'Missing'))
+        self.assertEqual(category_registry.get_paths(self.user.pk, 'Sport'), [self.sport.path])
+
+    def test_loaded_once(self):
+        _, queries = self._category_queries(category_registry.get_categories, self.user.pk)
+        self.assertEqual(len(queries), 1)
+        _, queries = self._category_queries(category_registry.get_categories, self.user.pk)
+        self.assertEqual(queries, [])
+
+    def test_shared_between_processes(self):
+        category_registry.get_categories(self.user.pk)
+        # another process has its own registry but the same shared cache
+        other_process = CategoryRegistry()
+        categories, queries = self._category_queries(other_process.get_categories,
+                                                     self.user.pk)
+        self.assertEqual(queries, [])
+        self.assertEqual(len(categories), 3)
+
+        # a change made in one process is seen by the other
+        Category.objects.create(name='Music', created_by=self.user)
+        self.assertIn('Music', [c.name for c in other_process.get_categories(self.user.pk)])
+
+    def test_change_seen_without_shared_cache(self):
+        category_registry.get_categories(self.user.pk)
+        # made by a process with its own cache, which only changes the database
+        with mock.patch('readlater.registry.cache', LocMemCache('other', {})):
+            Category.objects.create(name='Music', created_by=self.user)
+        self.assertIn('Music', [c.name for c in category_registry.get_categories(self.user.pk)])
+
+    def test_invalidated_on_change(self):
+        category_registry.get_categories(self.user.pk)
+        self.tech.name = 'Science'
+        self.tech.save()
+        self.assertEqual(category_registry.get_id(self.user.pk, 'Science'), self.tech.pk)
+        self.sport.parent = self.tech
+        self.sport.save()
+        self.assertEqual([c.name for c in category_registry.get_categories(self.user.pk)],
+                         ['News', 'Science', 'Sport'])
+        self.sport.delete()
+        self.assertIsNone(category_registry.get_id(self.user.pk, 'Sport'))
+
+    def test_views_do_not_query_categories(self):
+        Article.objects.create(name='Article', url='http://example.org', category=self.tech,
+                               created_by=self.user)
+        self._login()
+        for url in (reverse('article_list') + '?filter_category=News', reverse('settings'),
+                    reverse('article_create_form'), reverse('article_list')):
+            # first request loads the registry
+            self.client.get(url)
+            response, queries = self._category_queries(self.client.get, url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(queries, [], url)
+
+    def test_token_read_once_per_request(self):
+        Article.objects.create(name='Article', url='http://example.org', category=self.tech,
+                               created_by=self.user)
+        self._login()
+        url = reverse('article_list') + '?filter_category=News'
+        self.client.get(url)
+        # session, user, list version with category token and last event id, the
+        # table and filter counts are cached
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_initial_category_scoped_to_user(self):
+        self._login()
+        response = self.client.get(reverse('article_create_form'), {'filter_category': 'Tech'})
+        self.assertEqual(response.context['form'].initial['category'], self.tech.pk)
+        response = self.client.get(reverse('article_create_form'),
+                                   {'filter_category': 'Missing'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['form'].initial.get('category'))
+
+    def test_create_form_choices(self):
+        self._login()
+        response = self.client.get(reverse('article_create_form'))
+        choices = [label for value, label in response.context['form'].fields['category'].choices]
+        self.assertEqual(choices, ['---------', 'News', '— Sport', 'Tech'])
+        # other user's category is rejected even though the options are cached
+        response = self.client.post(reverse('article_create_form'),
+                                    data={'name': 'Article', 'url': 'http://example.org',
+                                          'category': self.other_categ.pk,
+                                          'priority': Article.PRIORITY_NORMAL})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('category', response.context['form'].errors)
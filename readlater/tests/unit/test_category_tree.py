@@ -0,0 +1,151 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.categories import delete_category
+from readlater.forms import CategoryEditForm
+from readlater.models import MAX_CATEGORY_DEPTH, Article, Category, get_path_segment
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class CategoryTreeTest(TestUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # News
+        #   Politics
+        #     Local
+        #   Sport
+        # Tech
+        self.news = self._create('News')
+        self.politics = self._create('Politics', self.news)
+        self.local = self._create('Local', self.politics)
+        self.sport = self._create('Sport', self.news)
+        self.tech = self._create('Tech')
+        for i, categ in enumerate([self.news, self.politics, self.local, self.sport,
+                                   self.tech, None]):
+            Article.objects.create(name=f'Article {i}', url=f'http://example.org/{i}',
+                                   category=categ, created_by=self.user)
+
+    def _create(self, name, parent=None):
+        return Category.objects.create(name=name, parent=parent, created_by=self.user)
+
+    def _subtree_names(self, categ):
+        return sorted(Article.objects.filter(
+            Category.subtree_q([categ.path], prefix='category__')).values_list(
+            'category__name', flat=True))
+
+    def test_path(self):
+        self.assertEqual(self.news.path, get_path_segment(self.news.pk))
+        self.assertEqual(self.local.path, self.news.path + get_path_segment(self.politics.pk) +
+                         get_path_segment(self.local.pk))
+        self.assertEqual(self.local.depth, 2)
+        self.assertEqual(self.local.ancestor_ids, [self.news.pk, self.politics.pk])
+        self.local.refresh_from_db()
+        self.assertEqual(self.local.depth, 2)
+
+    def test_subtree_articles_single_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            names = self._subtree_names(self.news)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(names, ['Local', 'News', 'Politics', 'Sport'])
+        self.assertEqual(self._subtree_names(self.politics), ['Local', 'Politics'])
+        self.assertEqual(self._subtree_names(self.tech), ['Tech'])
+
+    def test_move_updates_descendants(self):
+        self.politics.parent = self.tech
+        with CaptureQueriesContext(connection) as queries:
+            self.politics.save()
+        # the category itself then its subtree's paths
+        self.assertEqual(len([q for q in queries
+                              if q['sql'].startswith('UPDATE "readlater_category"')]), 2)
+        self.local.refresh_from_db()
+        self.assertEqual(self.local.ancestor_ids, [self.tech.pk, self.politics.pk])
+        self.assertEqual(self._subtree_names(self.news), ['News', 'Sport'])
+        self.assertEqual(self._subtree_names(self.tech), ['Local', 'Politics', 'Tech'])
+
+    def test_get_descendants(self):
+        self.assertEqual({c.name for c in self.news.get_descendants()},
+                         {'Politics', 'Local', 'Sport'})
+        self.assertEqual(list(self.local.get_descendants()), [])
+
+    def test_tree_order(self):
+        ordered = Category.tree_order(Category.objects.filter(created_by=self.user))
+        self.assertEqual([c.name for c in ordered],
+                         ['News', 'Politics', 'Local', 'Sport', 'Tech'])
+
+    def test_filter_includes_descendants(self):
+        self._login()
+        response = self.client.get(reverse('article_list'), {'filter_category': 'Politics'})
+        self.assertEqual(sorted(a.category.name for a in response.context['article_list']),
+                         ['Local', 'Politics'])
+        # counts of a category include its descendants
+        counts = {c.name: c.article_count for c in response.context['categories']}
+        self.assertEqual(counts, {'News': 4, 'Politics': 2, 'Local': 1, 'Sport': 1, 'Tech': 1})
+        self.assertEqual(response.context['category_all_count'], 6)
+        self.assertContains(response, 'label="— — Local (1)"')
+        self.assertContains(response, 'label="News (4)"')
+
+    def test_filter_ignores_other_users_categories(self):
+        other_user = User.objects.create_user('OtherUser')
+        other = Category.objects.create(name='Politics', created_by=other_user)
+        Article.objects.create(name='Not mine', url='http://example.org/other',
+                               category=other, created_by=other_user)
+        self._login()
+        response = self.client.get(reverse('article_list'), {'filter_category': 'Politics'})
+        self.assertEqual(len(response.context['article_list']), 2)
+
+    def test_settings_tree(self):
+        self._login()
+        response = self.client.get(reverse('settings'))
+        self.assertEqual([c.name for c in response.context['category_list']],
+                         ['News', 'Politics', 'Local', 'Sport', 'Tech'])
+        self.assertContains(response, '<td>— — Local</td>', html=True)
+
+    def test_create_with_parent(self):
+        self._login()
+        response = self.client.post(reverse('category_create_form'),
+                                    data={'name': 'Football', 'parent': self.sport.pk})
+        self.assertRedirects(response, reverse('settings'))
+        football = Category.objects.get(name='Football')
+        self.assertEqual(football.ancestor_ids, [self.news.pk, self.sport.pk])
+
+    def test_parent_choices_exclude_descendants(self):
+        form = CategoryEditForm(instance=self.politics)
+        self.assertEqual({c.name for c in form.fields['parent'].queryset},
+                         {'News', 'Sport', 'Tech'})
+        # a category can not be moved under its own descendant
+        form = CategoryEditForm(data={'name': 'Politics', 'parent': self.local.pk},
+                                instance=self.politics)
+        self.assertFalse(form.is_valid())
+        self.assertIn('parent', form.errors)
+
+    def test_parent_choices_only_own_categories(self):
+        other = Category.objects.create(name='Other', created_by=User.objects.create_user('Other'))
+        form = CategoryEditForm(data={'name': 'Tech', 'parent': other.pk}, instance=self.tech)
+        self.assertFalse(form.is_valid())
+
+    def test_max_depth(self):
+        parent = self.tech
+        while parent.depth < MAX_CATEGORY_DEPTH - 2:
+            parent = self._create(f'Level {parent.depth + 1}', parent)
+        form = CategoryEditForm(data={'name': 'Sport', 'parent': parent.pk},
+                                instance=self.sport)
+        self.assertTrue(form.is_valid())
+        # moving a subtree counts the levels below it
+        form = CategoryEditForm(data={'name': 'Politics', 'parent': parent.pk},
+                                instance=self.politics)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['parent'][0],
+                         f'Categories can be nested at most {MAX_CATEGORY_DEPTH} deep.')
+
+    @override_settings(READLATER_BACKGROUND_TASKS='sync')
+    def test_delete_moves_children_up(self):
+        delete_category(self.politics)
+        self.local.refresh_from_db()
+        self.assertEqual(self.local.parent, self.news)
+        self.assertEqual(self.local.ancestor_ids, [self.news.pk])
+        self.assertFalse(Category.all_objects.filter(pk=self.politics.pk).exists())
+        self.assertEqual(self._subtree_names(self.news), ['Local', 'News', 'Sport'])
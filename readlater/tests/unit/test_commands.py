@@ -0,0 +1,209 @@
+import datetime
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from readlater.models import ApiToken, Article, ArticleEvent, Category
+from readlater.management.benchmark import BenchmarkCommand
+from readlater.management.commands.benchmark_asgi import run_benchmark as run_asgi_benchmark
+from readlater.management.commands.benchmark_categories import \
+    run_benchmark as run_category_benchmark
+from readlater.management.commands.benchmark_quick_add import \
+    run_benchmark as run_quick_add_benchmark
+from readlater.management.commands.benchmark_ranks import run_benchmark as run_rank_benchmark
+from readlater.management.commands.benchmark_timesince import \
+    run_benchmark as run_timesince_benchmark
+from readlater.management.commands.benchmark_views import run_benchmark
+
+
+class SeedArticlesCommandTest(TestCase):
+
+    def test_seed_articles(self):
+        out = StringIO()
+        call_command('seed_articles', users=2, categories=3, articles=50, seed=1,
+                     batch_size=20, stdout=out)
+        self.assertIn('Seeded 2 users', out.getvalue())
+
+        users = User.objects.filter(username__startswith='seed_user_')
+        self.assertEqual(users.count(), 2)
+        for user in users:
+            self.assertEqual(Category.objects.filter(created_by=user).count(), 3)
+            articles = Article.objects.filter(created_by=user)
+            self.assertEqual(articles.count(), 50)
+            # finished articles have a finished time and others do not
+            self.assertFalse(articles.filter(progress=100, finished_time__isnull=True).exists())
+            self.assertFalse(articles.filter(progress__lt=100, finished_time__isnull=False).exists())
+            # articles only use the user's own categories
+            self.assertFalse(articles.exclude(category__isnull=True).exclude(
+                category__created_by=user).exists())
+
+    def test_seed_articles_adds_difference(self):
+        call_command('seed_articles', articles=30, stdout=StringIO())
+        call_command('seed_articles', articles=45, stdout=StringIO())
+        self.assertEqual(Article.objects.count(), 45)
+        self.assertEqual(Category.objects.count(), 10)
+
+
+class PruneArticleEventsCommandTest(TestCase):
+
+    def test_prune_article_events(self):
+        user = User.objects.create_user('TestUser')
+        ArticleEvent.publish(user.pk, [1, 2], ArticleEvent.ACTION_DELETED)
+        ArticleEvent.objects.filter(article_id=1).update(
+            created_time=timezone.now() - datetime.timedelta(hours=2))
+        out = StringIO()
+        call_command('prune_article_events', max_age=3600, stdout=out)
+        self.assertIn('Deleted 1 article events', out.getvalue())
+        self.assertEqual(list(ArticleEvent.objects.values_list('article_id', flat=True)), [2])
+
+
+class CreateApiTokenCommandTest(TestCase):
+
+    def test_create_api_token(self):
+        user = User.objects.create_user('TestUser')
+        out = StringIO()
+        call_command('create_api_token', 'TestUser', stdout=out)
+        self.assertEqual(ApiToken.get_user_id(out.getvalue().strip()), user.pk)
+        with self.assertRaises(CommandError):
+            call_command('create_api_token', 'Unknown', stdout=StringIO())
+
+
+class StubBenchmarkCommand(BenchmarkCommand):
+
+    def __init__(self, results, **kwargs):
+        super().__init__(**kwargs)
+        self.results = results
+        self.calls = []
+
+    def setup_databases(self):
+        self.calls.append('setup_databases')
+        return 'old config'
+
+    def teardown_databases(self, old_config):
+        self.calls.append(('teardown_databases', old_config))
+
+    def get_results(self, **options):
+        for result in self.results:
+            if isinstance(result, Exception):
+                raise result
+            yield result
+
+
+# the test runner has already set up the test environment
+@mock.patch('readlater.management.benchmark.teardown_test_environment')
+@mock.patch('readlater.management.benchmark.setup_test_environment')
+class BenchmarkCommandTest(TestCase):
+
+    def test_results_written_as_json_lines(self, setup_env, teardown_env):
+        command = StubBenchmarkCommand([{'a': 1}, {'b': [2]}])
+        out = StringIO()
+        call_command(command, stdout=out)
+        self.assertEqual(out.getvalue(), '{"a": 1}\n{"b": [2]}\n')
+        self.assertEqual(command.calls, ['setup_databases', ('teardown_databases', 'old config')])
+        setup_env.assert_called_once_with()
+        teardown_env.assert_called_once_with()
+
+    def test_output_file(self, setup_env, teardown_env):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'results.jsonl')
+            out = StringIO()
+            call_command(StubBenchmarkCommand([{'a': 1}]), output=path, stdout=out)
+            with open(path) as f:
+                self.assertEqual(f.read(), '{"a": 1}\n')
+        self.assertEqual(out.getvalue(), '')
+
+    def test_teardown_after_error(self, setup_env, teardown_env):
+        command = StubBenchmarkCommand([{'a': 1}, ValueError('failed')])
+        out = StringIO()
+        with self.assertRaises(ValueError):
+            call_command(command, stdout=out)
+        self.assertEqual(out.getvalue(), '{"a": 1}\n')
+        self.assertEqual(command.calls, ['setup_databases', ('teardown_databases', 'old config')])
+        teardown_env.assert_called_once_with()
+
+
+class BenchmarkViewsTest(TestCase):
+
+    def test_run_benchmark(self):
+        results = list(run_benchmark([10, 20], categories=2, requests=2))
+        names = {result['url_name'] for result in results}
+        self.assertIn('article_list', names)
+        self.assertIn('article_list_with_state:read', names)
+        self.assertIn('article_edit_form', names)
+        self.assertEqual({result['articles'] for result in results}, {10, 20})
+        for result in results:
+            self.assertIn(result['status'], (200, 302))
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            for key in ('queries', 'peak_memory_kib'):
+                self.assertIn(key, result)
+
+
+class BenchmarkTimesinceTest(TestCase):
+
+    def test_run_benchmark(self):
+        results = list(run_timesince_benchmark(rows=50, repeat=1))
+        self.assertEqual([result['implementation'] for result in results],
+                         ['original', 'filter', 'batch'])
+        self.assertEqual(results[0]['speedup'], 1)
+        for result in results:
+            self.assertGreater(result['ns_per_row'], 0)
+
+
+class BenchmarkRanksTest(TestCase):
+
+    def test_run_benchmark(self):
+        results = {result['operation']: result for result in run_rank_benchmark([30], moves=5)}
+        self.assertEqual(set(results), {'rebalance', 'gap_rank_move', 'renumber_move'})
+        self.assertEqual(results['gap_rank_move']['rows_written_per_move'], 1)
+        self.assertGreater(results['renumber_move']['rows_written_per_move'], 1)
+
+
+class BenchmarkCategoriesTest(TestCase):
+
+    def test_run_benchmark(self):
+        results = list(run_category_benchmark(['deep', 'bushy'], articles=100, repeat=2))
+        subtree_results = [result for result in results if 'method' in result]
+        self.assertEqual(len(subtree_results), 2 * 2 * 2)
+        for result in subtree_results:
+            if result['method'] == 'path_range':
+                self.assertEqual(result['queries'], 1)
+            else:
+                self.assertGreater(result['queries'], 1)
+        self.assertEqual([result['shape'] for result in results if 'view' in result],
+                         ['deep', 'bushy'])
+
+
+class BenchmarkAsgiTest(TestCase):
+
+    # requests from other threads would not see the test's transaction
+    @override_settings(READLATER_ASYNC_DB_THREAD_SENSITIVE=True)
+    def test_run_benchmark(self):
+        results = list(run_asgi_benchmark(articles=20, concurrency_levels=[1, 2], requests=4,
+                                          modes=['asgi_sync', 'asgi_async']))
+        self.assertEqual({result['target'] for result in results},
+                         {'article_list', 'api_article_list', 'article_progress'})
+        self.assertEqual(len(results), 3 * 2 * 2)
+        for result in results:
+            self.assertEqual(result['errors'], 0)
+            self.assertEqual(result['requests'], 4)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+
+class BenchmarkQuickAddTest(TestCase):
+
+    def test_run_benchmark(self):
+        results = list(run_quick_add_benchmark(articles=20, requests=3, batch_size=4))
+        self.assertEqual([result['flow'] for result in results],
+                         ['quick_add', 'quick_add_batch', 'create_form'])
+        for result in results:
+            self.assertEqual(result['errors'], 0)
+            self.assertEqual(result['requests'], 3)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(Article.objects.filter(url__startswith='https://benchmark').count(),
+                         3 + 3 * 4 + 3)
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.models import Article, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class ConditionalGetTest(TestUserMixin, TestCase):
+    URL_NAMES = ['article_list', 'settings', 'api_article_list', 'api_category_list']
+
+    def setUp(self):
+        super().setUp()
+        self.categ = Category.objects.create(name='Category 1', created_by=self.user)
+        Article.objects.create(name='Article 1', url='http://example.org',
+                               category=self.categ, created_by=self.user)
+
+    API_URL_NAMES = ['api_article_list', 'api_category_list']
+
+    def _get_validators(self, url):
+        # first request creates the change counter for the user
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        return response['ETag'], response.get('Last-Modified')
+
+    def test_etag_not_modified(self):
+        self._login()
+        for url_name in self.URL_NAMES:
+            url = reverse(url_name)
+            etag, _ = self._get_validators(url)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+            for query in queries:
+                self.assertNotIn('readlater_article"', query['sql'])
+                self.assertNotIn('readlater_category"', query['sql'])
+
+    def test_last_modified_not_modified(self):
+        self._login()
+        for url_name in self.API_URL_NAMES:
+            url = reverse(url_name)
+            _, last_modified = self._get_validators(url)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 304)
+
+    def test_html_pages_have_no_last_modified(self):
+        # relative times and the CSRF token change without the list changing
+        self._login()
+        for url_name in ('article_list', 'settings'):
+            url = reverse(url_name)
+            _, last_modified = self._get_validators(url)
+            self.assertIsNone(last_modified)
+            response = self.client.get(url,
+                                       HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+            self.assertEqual(response.status_code, 200)
+
+    def test_change_returns_full_response(self):
+        self._login()
+        for url_name in self.URL_NAMES:
+            url = reverse(url_name)
+            etag, _ = self._get_validators(url)
+            Category.objects.create(name=f'New {url_name}', created_by=self.user)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_differs_between_users(self):
+        self._login()
+        url = reverse('article_list')
+        etag, _ = self._get_validators(url)
+
+        other_user = User.objects.create_user('OtherUser')
+        self.client.force_login(user=other_user)
+        other_etag, _ = self._get_validators(url)
+        self.assertNotEqual(etag, other_etag)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_differs_after_csrf_token_change(self):
+        self._login()
+        url = reverse('article_list')
+        etag, _ = self._get_validators(url)
+        # logging in again rotates the token held by the page's forms
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = 'x' * 64
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
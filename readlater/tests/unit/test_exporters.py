@@ -0,0 +1,102 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from readlater.exporters import ARTICLE_FIELDS, export_articles
+from readlater.importers import import_articles
+from readlater.models import Article, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class ArticleExportTest(TestUserMixin, TestCase):
+    NUM_ARTICLES = 7
+
+    def setUp(self):
+        super().setUp()
+        self.categ = Category.objects.create(name='Category 1', created_by=self.user)
+        Category.objects.create(name='Empty', created_by=self.user)
+        for i in range(self.NUM_ARTICLES):
+            Article.objects.create(name=f'Article {i}', url=f'http://example.org/{i}',
+                                   category=self.categ if i % 2 else None,
+                                   notes='a, "quoted" note' if i == 0 else '',
+                                   created_by=self.user)
+        other_user = User.objects.create_user('OtherUser')
+        Article.objects.create(name='Not mine', url='http://example.org',
+                               created_by=other_user)
+
+    def _export(self, file_format, **kwargs):
+        return b''.join(export_articles(self.user, file_format, **kwargs)).decode('utf-8')
+
+    def test_export_csv(self):
+        rows = list(csv.DictReader(StringIO(self._export('csv'))))
+        self.assertEqual(len(rows), self.NUM_ARTICLES)
+        self.assertEqual(list(rows[0]), list(ARTICLE_FIELDS))
+        self.assertEqual(rows[0]['notes'], 'a, "quoted" note')
+        self.assertEqual(rows[0]['category'], '')
+        self.assertEqual(rows[1]['category'], 'Category 1')
+        self.assertEqual(rows[0]['finished_time'], '')
+
+    def test_export_jsonl(self):
+        records = [json.loads(line) for line in self._export('jsonl').splitlines()]
+        self.assertEqual([r['name'] for r in records if r['type'] == 'category'],
+                         ['Category 1', 'Empty'])
+        articles = [r for r in records if r['type'] == 'article']
+        self.assertEqual([a['name'] for a in articles],
+                         [f'Article {i}' for i in range(self.NUM_ARTICLES)])
+
+    def test_export_streams_chunks(self):
+        chunks = list(export_articles(self.user, 'csv', chunk_size=3))
+        # header then one chunk per 3 articles
+        self.assertEqual(len(chunks), 1 + 3)
+
+    def test_export_gzip(self):
+        data = b''.join(export_articles(self.user, 'jsonl', compress=True))
+        self.assertEqual(gzip.decompress(data).decode('utf-8'), self._export('jsonl'))
+
+    def test_export_import_round_trip(self):
+        exported = self._export('jsonl')
+        Article.objects.filter(created_by=self.user).delete()
+        Category.objects.filter(created_by=self.user).delete()
+        result = import_articles(self.user, StringIO(exported), 'jsonl')
+        self.assertEqual((result.created, result.errors), (self.NUM_ARTICLES, 0))
+        self.assertEqual(Category.objects.filter(created_by=self.user).count(), 2)
+        self.assertEqual(Article.objects.get(name='Article 1').category.name, 'Category 1')
+
+    def test_export_view(self):
+        self._login()
+        response = self.client.get(reverse('article_export'), {'format': 'jsonl', 'gzip': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('readlater-TestUser.jsonl.gz', response['Content-Disposition'])
+        content = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8')
+        self.assertNotIn('Not mine', content)
+        self.assertEqual(content.count('"type": "article"'), self.NUM_ARTICLES)
+
+    def test_export_view_unknown_format(self):
+        self._login()
+        response = self.client.get(reverse('article_export'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_view_requires_login(self):
+        response = self.client.get(reverse('article_export'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command('export_articles', self.user.username, stdout=out)
+        self.assertEqual(out.getvalue(), self._export('csv'))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'export.csv.gz')
+            call_command('export_articles', self.user.username, '--gzip', '-o', path)
+            with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+                self.assertEqual(f.read(), self._export('csv'))
@@ -0,0 +1,197 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from readlater.importers import import_articles, parse_csv, parse_html, parse_jsonl
+from readlater.models import Article, Category
+from readlater.tests.unit.utils import TestUserMixin
+
+NETSCAPE_HTML = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><A HREF="http://example.org/top" ADD_DATE="1609459200">Top Level</A>
+    <DT><H3 ADD_DATE="1609459200">Python</H3>
+    <DL><p>
+        <DT><A HREF="http://example.org/python1" ADD_DATE="1609459300">Python &amp; Django</A>
+        <DT><H3>Nested</H3>
+        <DL><p>
+            <DT><A HREF="http://example.org/nested">Nested Link</A>
+        </DL><p>
+        <DT><A HREF="http://example.org/python2">Python 2</A>
+    </DL><p>
+</DL><p>
+"""
+
+POCKET_HTML = """<!DOCTYPE html>
+<html><head><title>Pocket Export</title></head><body>
+<h1>Unread</h1>
+<ul>
+<li><a href="http://example.org/unread" time_added="1609459200" tags="news,tech">Unread Article</a></li>
+</ul>
+<h1>Read Archive</h1>
+<ul>
+<li><a href="http://example.org/read" time_added="1609459200" tags="">Read Article</a></li>
+</ul>
+</body></html>
+"""
+
+CSV_DATA = """title,url,category,priority,progress,notes,added_time
+CSV One,http://example.org/csv1,Reading,High,0,A note,2021-01-01T10:00:00Z
+CSV Two,http://example.org/csv2,,300,100,,
+CSV Bad,http://example.org/csv3,,Urgent,0,,
+"""
+
+POCKET_CSV = """title,url,time_added,tags,status
+Pocket CSV,http://example.org/pcsv,1609459200,go|rust,archive
+"""
+
+
+class BookmarkParserTest(TestCase):
+
+    def test_parse_netscape_html(self):
+        records = list(parse_html(StringIO(NETSCAPE_HTML)))
+        self.assertEqual([r['url'] for r in records],
+                         ['http://example.org/top', 'http://example.org/python1',
+                          'http://example.org/nested', 'http://example.org/python2'])
+        self.assertNotIn('category', records[0])
+        self.assertEqual(records[1]['name'], 'Python & Django')
+        self.assertEqual(records[1]['category'], 'Python')
+        self.assertEqual(records[1]['added_time'], '1609459300')
+        self.assertEqual(records[2]['category'], 'Nested')
+        self.assertEqual(records[3]['category'], 'Python')
+
+    def test_parse_html_small_reads(self):
+        # links split across reads are still parsed
+        with mock.patch('readlater.importers.READ_SIZE', 7):
+            records = list(parse_html(StringIO(NETSCAPE_HTML)))
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[1]['name'], 'Python & Django')
+
+    def test_parse_pocket_html(self):
+        records = list(parse_html(StringIO(POCKET_HTML)))
+        self.assertEqual(records[0]['category'], 'news')
+        self.assertNotIn('progress', records[0])
+        self.assertEqual(records[1]['progress'], 100)
+
+    def test_parse_csv(self):
+        records = list(parse_csv(StringIO(CSV_DATA)))
+        self.assertEqual(records[0], {'name': 'CSV One', 'url': 'http://example.org/csv1',
+                                      'category': 'Reading', 'priority': 'High',
+                                      'progress': '0', 'notes': 'A note',
+                                      'added_time': '2021-01-01T10:00:00Z'})
+        records = list(parse_csv(StringIO(POCKET_CSV)))
+        self.assertEqual(records[0]['category'], 'go')
+        self.assertEqual(records[0]['progress'], 100)
+
+    def test_parse_jsonl(self):
+        data = '\n'.join([json.dumps({'title': 'J', 'url': 'http://example.org/j'}),
+                          '', 'not json', '[1, 2]'])
+        records = list(parse_jsonl(StringIO(data)))
+        self.assertEqual(records, [{'name': 'J', 'url': 'http://example.org/j'}, {}, {}])
+
+    def test_import_timestamps(self):
+        user = User.objects.create_user('ImportUser')
+        data = '\n'.join(json.dumps({'title': title, 'url': f'http://example.org/{title}',
+                                     'time_added': value})
+                         for title, value in (('seconds', 1609459200),
+                                              ('milliseconds', 1609459200000),
+                                              ('too_large', 10 ** 30)))
+        import_articles(user, StringIO(data), 'jsonl')
+        added = dict(Article.objects.filter(created_by=user).values_list('name', 'added_time'))
+        self.assertEqual(added['seconds'], added['milliseconds'])
+        self.assertEqual(added['seconds'].year, 2021)
+        # invalid times are left to the default
+        self.assertGreater(added['too_large'], added['seconds'])
+
+
+class ArticleImportTest(TestUserMixin, TestCase):
+
+    def test_import_netscape_html(self):
+        result = import_articles(self.user, StringIO(NETSCAPE_HTML), 'html')
+        self.assertEqual(result.created, 4)
+        self.assertEqual(set(Category.objects.filter(created_by=self.user).values_list(
+            'name', flat=True)), {'Python', 'Nested'})
+        article = Article.objects.get(url='http://example.org/python1')
+        self.assertEqual(article.category.name, 'Python')
+        self.assertEqual(article.added_time.timestamp(), 1609459300)
+        self.assertEqual(article.priority, Article.PRIORITY_NORMAL)
+
+    def test_import_csv(self):
+        Category.objects.create(name='Reading', created_by=self.user)
+        result = import_articles(self.user, StringIO(CSV_DATA), 'csv')
+        self.assertEqual((result.created, result.errors), (2, 1))
+        # existing category is reused
+        self.assertEqual(Category.objects.filter(name='Reading').count(), 1)
+
+        article = Article.objects.get(name='CSV One')
+        self.assertEqual(article.priority, Article.PRIORITY_HIGH)
+        self.assertEqual(article.notes, 'A note')
+        self.assertIsNone(article.finished_time)
+        article = Article.objects.get(name='CSV Two')
+        self.assertEqual(article.progress, 100)
+        self.assertIsNotNone(article.finished_time)
+        self.assertIsNone(article.category)
+
+    def test_import_rejects_non_http_urls(self):
+        data = NETSCAPE_HTML.replace(
+            '<DT><A HREF="http://example.org/top"',
+            '<DT><A HREF="javascript:alert(document.cookie)">Bookmarklet</A>\n'
+            '    <DT><A HREF="place:sort=8&maxResults=10">Most Visited</A>\n'
+            '    <DT><A HREF="http://example.org/top"')
+        result = import_articles(self.user, StringIO(data), 'html')
+        self.assertEqual((result.created, result.errors), (4, 2))
+        self.assertFalse(Article.objects.exclude(url__startswith='http://').exists())
+
+    def test_import_skips_duplicates(self):
+        import_articles(self.user, StringIO(POCKET_HTML), 'html')
+        result = import_articles(self.user, StringIO(POCKET_HTML + POCKET_HTML), 'html')
+        self.assertEqual((result.created, result.skipped), (0, 4))
+        self.assertEqual(Article.objects.count(), 2)
+
+    def test_import_batches(self):
+        lines = [json.dumps({'title': f'Article {i}', 'url': f'http://example.org/{i}',
+                             'category': f'Category {i % 3}'})
+                 for i in range(250)]
+        result = import_articles(self.user, StringIO('\n'.join(lines)), 'jsonl',
+                                 batch_size=40)
+        self.assertEqual(result.created, 250)
+        self.assertEqual(Article.objects.filter(created_by=self.user).count(), 250)
+        self.assertEqual(Category.objects.filter(created_by=self.user).count(), 3)
+        self.assertGreater(result.rate, 0)
+        self.assertIn('Imported 250 articles', str(result))
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(CSV_DATA)
+        try:
+            out = StringIO()
+            call_command('import_bookmarks', self.user.username, f.name, stdout=out)
+        finally:
+            os.unlink(f.name)
+        self.assertIn('Imported 2 articles', out.getvalue())
+
+    def test_import_view(self):
+        self._login()
+        upload = SimpleUploadedFile('bookmarks.html', NETSCAPE_HTML.encode())
+        response = self.client.post(reverse('article_import_form'), data={'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Imported 4 articles')
+        self.assertEqual(Article.objects.filter(created_by=self.user).count(), 4)
+
+    def test_import_view_unknown_format(self):
+        self._login()
+        upload = SimpleUploadedFile('bookmarks.txt', b'hello')
+        response = self.client.post(reverse('article_import_form'), data={'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Cannot guess format')
+        self.assertEqual(Article.objects.count(), 0)
@@ -0,0 +1,198 @@
+import collections
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from readlater.metadata import MetadataError, fetch_page, fetch_pending_metadata, \
+    get_queue_depth, parse_metadata
+from readlater.models import Article, ArticleListVersion
+from readlater.tests.unit.utils import TestUserMixin
+
+ARTICLE_PAGE = """<html><head><title> Stub
+  article </title><link rel="canonical" href="/canonical"><script>var words = 1;</script>
+</head><body><nav>Home About</nav><h1>Heading</h1><p>{}</p></body></html>"""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves StubHandler.pages, path -> (status, content type, body, delay
+    seconds), counting the most requests for each path at once, and
+    StubHandler.redirects, path -> location, keeping the Host header of each
+    request.
+    """
+    pages = {}
+    redirects = {}
+    # Host header of each request
+    hosts = []
+    lock = threading.Lock()
+    active = collections.Counter()
+    max_active = collections.Counter()
+
+    def do_GET(self):
+        cls = StubHandler
+        cls.hosts.append(self.headers['Host'])
+        if self.path in cls.redirects:
+            self.send_response(302)
+            self.send_header('Location', cls.redirects[self.path])
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        status, content_type, body, delay = cls.pages.get(self.path, (404, 'text/html', '', 0))
+        with cls.lock:
+            cls.active[self.path] += 1
+            cls.max_active[self.path] = max(cls.max_active[self.path], cls.active[self.path])
+        time.sleep(delay)
+        # before answering so the client can not have started its next request
+        with cls.lock:
+            cls.active[self.path] -= 1
+        body = body.encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # client gave up waiting
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+# the stub server is on a loopback address
+@override_settings(READLATER_METADATA_ALLOW_PRIVATE=True)
+class FetchMetadataTest(TestUserMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        StubHandler.pages = {
+            '/article': (200, 'text/html; charset=utf-8',
+                         ARTICLE_PAGE.format(' '.join(['word'] * 500)), 0),
+            '/image': (200, 'image/png', 'png', 0),
+            '/slow': (200, 'text/html', '<title>Slow</title>', 2),
+        }
+        StubHandler.redirects = {'/redirect': '/article'}
+        StubHandler.max_active.clear()
+        StubHandler.hosts = []
+
+    def _add(self, path, name=None):
+        return Article.objects.create(name=name or path, url=self.base_url + path,
+                                      created_by=self.user)
+
+    def test_parse_metadata(self):
+        values = parse_metadata(ARTICLE_PAGE.format('one two three'), 'https://example.org/a')
+        self.assertEqual(values, {'page_title': 'Stub article',
+                                  'canonical_url': 'https://example.org/canonical',
+                                  'word_count': 4, 'reading_time': 1})
+        # og tags are used without title and canonical link
+        values = parse_metadata('<meta property="og:title" content="OG title">'
+                                '<meta property="og:url" content="javascript:alert(1)">',
+                                'https://example.org/a')
+        self.assertEqual((values['page_title'], values['canonical_url'], values['word_count']),
+                         ('OG title', '', 0))
+
+    def test_fetch_pending(self):
+        article = self._add('/article')
+        missing = self._add('/missing')
+        image = self._add('/image')
+        slow = self._add('/slow')
+        version = ArticleListVersion.get_for_user(self.user).version
+        stats = fetch_pending_metadata(timeout=0.5)
+        self.assertEqual((stats['fetched'], stats['failed'], stats['queued']), (1, 3, 0))
+        self.assertGreater(stats['pages_per_second'], 0)
+
+        article.refresh_from_db()
+        self.assertEqual((article.page_title, article.canonical_url, article.word_count,
+                          article.reading_time, article.metadata_error),
+                         ('Stub article', self.base_url + '/canonical', 501, 3, ''))
+        self.assertIsNotNone(article.metadata_time)
+        errors = dict(Article.objects.filter(pk__in=[missing.pk, image.pk, slow.pk]).values_list(
+            'pk', 'metadata_error'))
+        self.assertEqual(errors[missing.pk], 'HTTP status 404')
+        self.assertEqual(errors[image.pk], 'not an HTML page (image/png)')
+        self.assertIn('timed out', errors[slow.pk])
+        self.assertEqual(ArticleListVersion.get_for_user(self.user).version, version + 1)
+
+        # failed pages are not fetched again
+        self.assertEqual(fetch_pending_metadata()['fetched'], 0)
+
+    def test_per_host_limit_and_queue_depth(self):
+        StubHandler.pages['/article'] = StubHandler.pages['/article'][:3] + (0.1,)
+        for i in range(6):
+            self._add('/article', name=f'Article {i}')
+        stats = fetch_pending_metadata(batch_size=4, concurrency=4, per_host=2)
+        self.assertEqual((stats['fetched'], stats['queued']), (4, 2))
+        self.assertEqual(StubHandler.max_active['/article'], 2)
+        self.assertEqual(get_queue_depth(), 2)
+
+    def test_private_addresses_not_fetched(self):
+        port = self.server.server_address[1]
+        with override_settings(READLATER_METADATA_ALLOW_PRIVATE=False):
+            for url in (self.base_url + '/article', 'http://localhost/',
+                        'http://[::ffff:10.0.0.1]/', 'http://169.254.169.254/latest/'):
+                with self.assertRaisesMessage(MetadataError, 'not a public address'):
+                    fetch_page(url)
+            # host is public but redirects to a private one
+            with mock.patch('readlater.metadata._is_public_address', side_effect=[True, False]):
+                with self.assertRaisesMessage(MetadataError, 'not a public address'):
+                    fetch_page(self.base_url + '/redirect')
+        self.assertEqual(StubHandler.max_active['/article'], 0)
+        # followed when allowed
+        self.assertEqual(fetch_page(self.base_url + '/redirect')[0], self.base_url + '/article')
+
+    def test_connects_to_checked_address(self):
+        # rebind.test is only resolved by the patched _resolve, so the page can
+        # only be fetched from the address which was checked
+        url = f'http://rebind.test:{self.server.server_address[1]}/article'
+        with mock.patch('readlater.metadata._resolve', return_value=['127.0.0.1']):
+            self.assertEqual(fetch_page(url)[0], url)
+            with override_settings(READLATER_METADATA_ALLOW_PRIVATE=False):
+                with self.assertRaisesMessage(MetadataError, 'not a public address'):
+                    fetch_page(url)
+        # sent with the url's host name
+        self.assertEqual(StubHandler.hosts, [urlsplit(url).netloc])
+
+    def test_changed_url_fetched_again(self):
+        article = self._add('/article')
+        fetch_pending_metadata()
+        self._login()
+        self.client.post(reverse('article_edit_form', args=(article.pk,)),
+                         data={'name': article.name, 'url': self.base_url + '/image',
+                               'priority': article.priority, 'progress': 0, 'notes': ''})
+        article.refresh_from_db()
+        self.assertEqual((article.metadata_time, article.page_title, article.word_count),
+                         (None, '', None))
+
+    def test_command(self):
+        self._add('/article')
+        self._add('/missing')
+        out = StringIO()
+        call_command('fetch_article_metadata', batch_size=1, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertRegex(lines[0], r'^Fetched 1 pages \(0 failed\) in [\d.]+s, [\d.]+ pages/s, '
+                                   r'1 queued$')
+        self.assertIn('(1 failed)', lines[1])
+        self.assertTrue(lines[1].endswith('0 queued'))
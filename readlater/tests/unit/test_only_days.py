@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from readlater.templatetags.only_days import nice_timesince, nice_timesince_batch, \
+    nice_timesince_from
+
+NOW = datetime(2021, 6, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+class NiceTimesinceTest(SimpleTestCase):
+
+    CASES = [
+        (timedelta(days=800), '2 yr'),
+        (timedelta(days=45), '1 mon'),
+        (timedelta(days=20), '2 wk'),
+        (timedelta(days=3, hours=5), '3 d'),
+        (timedelta(days=1), '24 h'),
+        (timedelta(minutes=150), '2 h'),
+        (timedelta(seconds=125), '2 min'),
+        (timedelta(seconds=30), '30 sec'),
+        (timedelta(seconds=0), '0 seconds ago'),
+    ]
+
+    def test_nice_timesince_from(self):
+        for delta, expected in self.CASES:
+            self.assertEqual(nice_timesince_from(NOW - delta, NOW), expected)
+
+    def test_nice_timesince_uses_clock(self):
+        value = datetime.now(timezone.utc) - timedelta(days=3, hours=1)
+        self.assertEqual(nice_timesince(value), '3 d')
+
+    def test_non_datetime_passed_through(self):
+        self.assertEqual(nice_timesince(''), '')
+        self.assertEqual(nice_timesince_from(None, NOW), None)
+
+    def test_batch_matches_single(self):
+        values = [NOW - delta for delta, _ in self.CASES] + [None, '']
+        expected = [nice_timesince_from(v, NOW) for v in values]
+        self.assertEqual(nice_timesince_batch(values, NOW), expected)
+        self.assertEqual(nice_timesince_batch(iter(values), NOW), expected)
@@ -0,0 +1,152 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.models import ApiToken, Article, ArticleEvent, ArticleListVersion, Category
+from readlater.quick_add import MAX_BATCH_SIZE
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class QuickAddTest(TestUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.token = ApiToken.create_for_user(self.user)
+        self.categ = Category.objects.create(name='News', created_by=self.user)
+        self.url = reverse('api_quick_add')
+
+    def _post(self, data, status=201, token=None):
+        response = self.client.post(self.url, data=json.dumps(data),
+                                    content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Token {token or self.token}')
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def test_form_post(self):
+        response = self.client.post(self.url, data={'url': 'http://example.org/1',
+                                                    'title': 'Article 1', 'category': 'News'},
+                                    HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(response.status_code, 201)
+        article = Article.objects.get(created_by=self.user)
+        self.assertEqual(response.json(), {'results': [
+            {'url': 'http://example.org/1', 'created': True, 'id': article.pk}]})
+        self.assertEqual((article.name, article.category), ('Article 1', self.categ))
+        self.assertEqual(Article.find_by_url(self.user, 'http://example.org/1'), article)
+
+    def test_batch_skips_saved_urls(self):
+        existing = Article.objects.create(name='Existing', url='http://example.org/a',
+                                          created_by=self.user)
+        data = self._post({'articles': [
+            {'url': 'http://example.org/a/', 'title': 'Same page'},
+            {'url': 'http://example.org/b', 'title': 'B'},
+            {'url': 'http://example.org/b', 'title': 'B again'},
+        ]})
+        new = Article.objects.get(url='http://example.org/b')
+        self.assertEqual([(r['created'], r['id']) for r in data['results']],
+                         [(False, existing.pk), (True, new.pk), (False, new.pk)])
+        self.assertEqual(Article.objects.filter(created_by=self.user).count(), 2)
+        # adding again changes nothing
+        data = self._post([{'url': 'http://example.org/b'}], status=200)
+        self.assertEqual(data['results'][0]['id'], new.pk)
+
+    def test_used_title_replaced_by_url(self):
+        Article.objects.create(name='Home', url='http://example.org/a', created_by=self.user)
+        data = self._post([{'url': 'http://example.org/b', 'title': 'Home'},
+                           {'url': 'http://example.org/c', 'title': 'Home'}])
+        names = Article.objects.filter(pk__in=[r['id'] for r in data['results']]).order_by(
+            'url').values_list('name', flat=True)
+        self.assertEqual(list(names), ['http://example.org/b', 'http://example.org/c'])
+
+    def test_invalid_items(self):
+        other_categ = Category.objects.create(name='Other',
+                                              created_by=User.objects.create_user('Other'))
+        data = self._post([{'url': 'not a url'}, {'title': 'No url'},
+                           {'url': 'http://example.org/1', 'category': other_categ.name},
+                           {'url': 'http://example.org/2'}])
+        self.assertEqual([r.get('error') for r in data['results']],
+                         ['url must be a valid URL', 'url must be a valid URL',
+                          'unknown category', None])
+        self.assertEqual(Article.objects.filter(created_by=self.user).count(), 1)
+
+    def test_invalid_body(self):
+        response = self.client.post(self.url, data='{', content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(response.status_code, 400)
+        self._post([], status=400)
+        self._post(['http://example.org'], status=400)
+        self._post([{'url': f'http://example.org/{i}'} for i in range(MAX_BATCH_SIZE + 1)],
+                   status=400)
+
+    def test_token_required(self):
+        self.assertEqual(self._post({'url': 'http://example.org'}, status=401, token='wrong'),
+                         {'error': 'missing or invalid token'})
+        response = self.client.post(self.url, data={'url': 'http://example.org'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+        # a logged in session is not enough
+        self._login()
+        response = self.client.post(self.url, data={'url': 'http://example.org'})
+        self.assertEqual(response.status_code, 401)
+
+        self.user.is_active = False
+        self.user.save()
+        self._post({'url': 'http://example.org'}, status=401)
+        self.assertFalse(Article.objects.exists())
+
+    def test_new_token_replaces_old(self):
+        old_token = self.token
+        self.token = ApiToken.create_for_user(self.user)
+        self._post({'url': 'http://example.org'}, status=401, token=old_token)
+        self._post({'url': 'http://example.org'})
+
+    def _count_queries(self, count, start=0):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data=json.dumps(
+                [{'url': f'http://example.org/{i}'} for i in range(start, start + count)]),
+                content_type='application/json', HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.templates, [])
+        self.assertFalse(response.cookies)
+        sql = [q['sql'] for q in queries]
+        self.assertFalse([q for q in sql if 'django_session' in q or 'FROM "auth_user"' in q])
+        self.assertEqual(len([q for q in sql if q.startswith('INSERT INTO "readlater_article"')]),
+                         1)
+        return len(sql)
+
+    def test_constant_queries_without_session_or_template(self):
+        # first request loads the category registry
+        self._count_queries(1)
+        self.assertEqual(self._count_queries(1, start=1), self._count_queries(10, start=2))
+
+    def test_list_version_and_events(self):
+        ArticleListVersion.get_for_user(self.user)
+        data = self._post({'url': 'http://example.org', 'title': 'Article 1'})
+        self.assertEqual(ArticleListVersion.get_for_user(self.user).version, 1)
+        event = ArticleEvent.objects.get(user=self.user)
+        self.assertEqual((event.action, event.article_id, event.fields['name']),
+                         (ArticleEvent.ACTION_CREATED, data['results'][0]['id'], 'Article 1'))
+
+    def test_cors(self):
+        response = self.client.options(self.url, HTTP_ORIGIN='https://example.org',
+                                       HTTP_ACCESS_CONTROL_REQUEST_METHOD='POST')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Access-Control-Allow-Origin'], '*')
+        self.assertIn('Authorization', response['Access-Control-Allow-Headers'])
+        response = self.client.post(self.url, data={'url': 'http://example.org'},
+                                    HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(response['Access-Control-Allow-Origin'], '*')
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_create_token_in_settings(self):
+        self._login()
+        response = self.client.post(reverse('settings'))
+        self.assertEqual(response.status_code, 200)
+        token = response.context['api_token']
+        self.assertContains(response, token)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self._post({'url': 'http://example.org'}, token=token)
+        self.assertNotContains(self.client.get(reverse('settings')), token)
@@ -0,0 +1,169 @@
+import json
+from io import StringIO
+
+from bs4 import BeautifulSoup
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from readlater.models import RANK_GAP, Article, ArticleListVersion
+from readlater.importers import import_articles
+from readlater.ranking import MIN_RANK_GAP, get_min_rank_gap, move_article, rebalance_ranks
+from readlater.tests.unit.utils import TestUserMixin
+
+
+class RankingTest(TestUserMixin, TestCase):
+    NUM_ARTICLES = 5
+
+    def setUp(self):
+        super().setUp()
+        self.articles = [Article.objects.create(name=f'Article {i}',
+                                                url=f'http://example.org/{i}',
+                                                created_by=self.user)
+                         for i in range(self.NUM_ARTICLES)]
+
+    def _names(self):
+        return list(Article.objects.filter(created_by=self.user).order_by(
+            'rank', 'pk').values_list('name', flat=True))
+
+    def test_new_articles_go_last(self):
+        ranks = [a.rank for a in self.articles]
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual(len(set(ranks)), len(ranks))
+
+    def test_move_writes_one_row(self):
+        article, target = self.articles[4], self.articles[1]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(move_article(article, after=target), 1)
+        writes = [q['sql'] for q in queries if not q['sql'].startswith('SELECT')]
+        self.assertEqual(len(writes), 1)
+        self.assertIn(f'WHERE "readlater_article"."id" = {article.pk}', writes[0])
+        self.assertEqual(self._names(), ['Article 0', 'Article 1', 'Article 4',
+                                         'Article 2', 'Article 3'])
+
+    def test_move_before_and_to_ends(self):
+        move_article(self.articles[3], before=self.articles[0])
+        self.assertEqual(self._names()[0], 'Article 3')
+        move_article(self.articles[3], after=self.articles[4])
+        self.assertEqual(self._names()[-1], 'Article 3')
+        move_article(self.articles[2])
+        self.assertEqual(self._names()[0], 'Article 2')
+
+    def test_repeated_moves_into_same_gap_make_room(self):
+        rebalance_ranks(self.user.id)
+        first, second = Article.objects.filter(created_by=self.user).order_by('rank')[:2]
+        # halving the gap runs out after log2(RANK_GAP) moves
+        for article in self.articles[2:] * 10:
+            article.refresh_from_db()
+            move_article(article, after=first)
+            self.assertEqual(self._names()[1], article.name)
+        self.assertGreaterEqual(get_min_rank_gap(self.user.id), 1)
+        self.assertEqual(self._names()[0], first.name)
+
+    def test_move_without_room_respaces_few_articles(self):
+        ranks = [10, 11, 12, 10 + 10 * MIN_RANK_GAP, 10 + 10 * MIN_RANK_GAP + RANK_GAP]
+        for article, rank in zip(self.articles, ranks):
+            Article.objects.filter(pk=article.pk).update(rank=rank)
+            article.rank = rank
+        with CaptureQueriesContext(connection) as queries:
+            # moved article and the two given room
+            self.assertEqual(move_article(self.articles[4], after=self.articles[0]), 3)
+        self.assertEqual(self._names(), ['Article 0', 'Article 4', 'Article 1',
+                                         'Article 2', 'Article 3'])
+        # articles 1 and 2 are given new ranks, later ones are left alone
+        writes = [q['sql'] for q in queries if 'UPDATE' in q['sql']]
+        self.assertEqual(len(writes), 2)
+        self.assertTrue(writes[0].startswith('2 times: UPDATE'))
+        self.articles[3].refresh_from_db()
+        self.assertEqual(self.articles[3].rank, ranks[3])
+        ranks = list(Article.objects.filter(created_by=self.user).exclude(
+            pk=self.articles[3].pk).order_by('rank').values_list('rank', flat=True))
+        self.assertGreaterEqual(min(b - a for a, b in zip(ranks, ranks[1:])), MIN_RANK_GAP)
+
+    def test_bulk_created_articles_spaced(self):
+        data = '\n'.join(json.dumps({'title': f'Imported {i}', 'url': f'http://example.org/i{i}'})
+                         for i in range(3))
+        import_articles(self.user, StringIO(data), 'jsonl')
+        ranks = list(Article.objects.filter(created_by=self.user, name__startswith='Imported')
+                     .order_by('rank').values_list('rank', flat=True))
+        self.assertEqual([b - a for a, b in zip(ranks, ranks[1:])], [RANK_GAP, RANK_GAP])
+        self.assertEqual(self._names()[-3:], ['Imported 0', 'Imported 1', 'Imported 2'])
+        # articles added after an import still go last
+        self._login()
+        self.client.post(reverse('article_create_form'),
+                         data={'name': 'New', 'url': 'http://example.org/new',
+                               'priority': Article.PRIORITY_NORMAL})
+        self.assertEqual(self._names()[-1], 'New')
+
+    def test_rebalance_keeps_order(self):
+        Article.objects.filter(pk=self.articles[3].pk).update(rank=self.articles[1].rank)
+        expected = self._names()
+        self.assertEqual(rebalance_ranks(self.user.id, batch_size=2), self.NUM_ARTICLES)
+        self.assertEqual(self._names(), expected)
+        self.assertEqual(get_min_rank_gap(self.user.id), RANK_GAP)
+
+    def test_rebalance_command(self):
+        other_user = User.objects.create_user('OtherUser')
+        Article.objects.create(name='Other', url='http://example.org', created_by=other_user)
+        Article.objects.filter(pk=self.articles[3].pk).update(rank=self.articles[2].rank + 1)
+
+        out = StringIO()
+        call_command('rebalance_ranks', stdout=out)
+        self.assertIn(f'Rebalanced {self.NUM_ARTICLES} articles for user {self.user.id}',
+                      out.getvalue())
+        self.assertNotIn(f'user {other_user.id}', out.getvalue())
+        self.assertEqual(get_min_rank_gap(self.user.id), RANK_GAP)
+
+        out = StringIO()
+        call_command('rebalance_ranks', stdout=out)
+        self.assertEqual(out.getvalue(), '')
+
+
+class ArticleMoveViewTest(TestUserMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.articles = [Article.objects.create(name=f'Article {i}',
+                                                url=f'http://example.org/{i}',
+                                                created_by=self.user)
+                         for i in range(3)]
+
+    def _move(self, article, **data):
+        return self.client.post(reverse('article_move', args=(article.pk,)), data=data)
+
+    def _list_names(self):
+        response = self.client.get(reverse('article_list'), {'orderby': 'rank'})
+        table = BeautifulSoup(response.content, 'html.parser').find(id='table-article-list')
+        return [row.find_all('td')[1].getText() for row in table.find('tbody').find_all('tr')]
+
+    def test_move_view(self):
+        self._login()
+        version = ArticleListVersion.get_for_user(self.user).version
+        self.assertEqual(self._list_names(), ['Article 0', 'Article 1', 'Article 2'])
+        response = self._move(self.articles[2], before=self.articles[1].pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.articles[2].pk)
+        self.assertGreater(ArticleListVersion.get_for_user(self.user).version, version)
+        self.assertEqual(self._list_names(), ['Article 0', 'Article 2', 'Article 1'])
+
+        self._move(self.articles[1])
+        self.assertEqual(self._list_names(), ['Article 1', 'Article 0', 'Article 2'])
+
+    def test_move_view_errors(self):
+        other_user = User.objects.create_user('OtherUser')
+        other = Article.objects.create(name='Other', url='http://example.org',
+                                       created_by=other_user)
+        self._login()
+        self.assertEqual(self._move(self.articles[0], after='x').status_code, 400)
+        self.assertEqual(self._move(self.articles[0], after=self.articles[1].pk,
+                                    before=self.articles[2].pk).status_code, 400)
+        self.assertEqual(self._move(self.articles[0], after=self.articles[0].pk).status_code,
+                         400)
+        self.assertEqual(self._move(self.articles[0], after=other.pk).status_code, 404)
+        self.assertEqual(self._move(other).status_code, 404)
+
+    def test_move_view_requires_login(self):
+        self.assertEqual(self._move(self.articles[0]).status_code, 403)
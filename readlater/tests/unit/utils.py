@@ -1,4 +1,5 @@
 from django.contrib.auth.models import User
+from django.core.cache import cache
 
 
 def get_login_redirect_url(url):
@@ -12,6 +13,9 @@ class TestUserMixin:
     TEST_PASSWORD = 'testuserpassword'
 
     def setUp(self):
+        # cached article list renderings are keyed by user id which is reused
+        # between tests
+        cache.clear()
         self.user = User.objects.create_user(self.TEST_USERNAME, self.TEST_EMAIL,
                                              self.TEST_PASSWORD)
 
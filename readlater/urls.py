@@ -1,6 +1,7 @@
 from django.urls import path, include
 from django.views.generic.base import RedirectView
-from . import views
+from . import api, events, quick_add, views
+from . import async_views as async_views_module
 
 
 #
@@ -18,19 +19,84 @@ from . import views
 # 'article/delete/<int:pk> - Handles deleting the article in database with private key == pk.
 #                          When successful return to root page.
 #
+# 'article/progress/<int:pk>' - Set reading progress of the article with private key == pk.
+#                               POST only, answers with JSON.
 #
+# 'article/move/<int:pk>' - Move the article with private key == pk in the manually
+#                           ordered list.  POST only, answers with JSON.
+#
+# 'article/bulk' - Apply an action (mark read, set priority, move category or delete)
+#                  to the articles selected in the article list.
+#
+# 'article/import' - Import articles from an uploaded file of bookmarks.
+#
+# 'article/export' - Download the user's categories and articles as CSV or JSON Lines,
+#                    optionally gzip compressed.
+#
+# 'api/articles', 'api/articles/<str:state>' - Page of the user's unread or read articles
+#                                              as JSON, see readlater/api.py.
+#
+# 'api/categories' - Page of the user's categories as JSON.
+#
+# 'api/quick-add' - Add articles from a bookmarklet or browser extension, authenticated
+#                   with a token instead of the session, see readlater/quick_add.py.
+#
+# 'article/events' - The user's article changes as server-sent events, used by the article
+#                    list to update its rows in place, see readlater/events.py.
+#
+# Serving with ASGI uses readlater_django/asgi_urls.py which swaps in async versions of
+# the article list, progress, API and events views, see readlater/async_views.py.
+#
+#
+
+def get_urlpatterns(async_views=False):
+    """
+    Return url patterns for the readlater app.
+
+    :param async_views: Use the async versions of the article list, progress
+        update, API read and events views, for serving with ASGI.
+    :type async_views: bool
+    """
+    if async_views:
+        article_list = async_views_module.AsyncArticleList.as_view()
+        article_progress = async_views_module.AsyncArticleProgressView.as_view()
+        api_article_list = async_views_module.AsyncArticleApiView.as_view()
+        api_category_list = async_views_module.AsyncCategoryApiView.as_view()
+        article_events = async_views_module.AsyncArticleEventsView.as_view()
+    else:
+        article_list = views.ArticleList.as_view()
+        article_progress = views.ArticleProgressView.as_view()
+        api_article_list = api.ArticleApiView.as_view()
+        api_category_list = api.CategoryApiView.as_view()
+        article_events = events.ArticleEventsView.as_view()
+
+    return [
+        path('', RedirectView.as_view(pattern_name='article_list'), name='home'),
+        path('settings/', views.SettingsView.as_view(), name='settings'),
+        path('category/create/new', views.CategoryCreateView.as_view(),
+             name='category_create_form'),
+        path('category/edit/<int:pk>', views.CategoryEditView.as_view(),
+             name='category_edit_form'),
+        path('category/delete/<int:pk>', views.CategoryDeleteView.as_view(),
+             name='category_delete_form'),
+        path('articles/', article_list, name='article_list'),
+        path('articles/<str:state>', article_list, name='article_list_with_state'),
+        path('article/create/new', views.ArticleCreateView.as_view(), name='article_create_form'),
+        path('article/edit/<int:pk>', views.ArticleEditView.as_view(), name='article_edit_form'),
+        path('article/delete/<int:pk>', views.ArticleDeleteView.as_view(),
+             name='article_delete_form'),
+        path('article/progress/<int:pk>', article_progress, name='article_progress'),
+        path('article/move/<int:pk>', views.ArticleMoveView.as_view(), name='article_move'),
+        path('article/bulk', views.ArticleBulkActionView.as_view(), name='article_bulk_action'),
+        path('article/import', views.ArticleImportView.as_view(), name='article_import_form'),
+        path('article/export', views.ArticleExportView.as_view(), name='article_export'),
+        path('article/events', article_events, name='article_events'),
+        path('api/articles', api_article_list, name='api_article_list'),
+        path('api/articles/<str:state>', api_article_list, name='api_article_list_with_state'),
+        path('api/categories', api_category_list, name='api_category_list'),
+        path('api/quick-add', quick_add.QuickAddView.as_view(), name='api_quick_add'),
+        path('accounts/', include('django.contrib.auth.urls')),
+    ]
 
-urlpatterns = [
-    path('', RedirectView.as_view(pattern_name='article_list'), name='home'),
-    path('settings/', views.SettingsView.as_view(), name='settings'),
-    path('category/create/new', views.CategoryCreateView.as_view(), name='category_create_form'),
-    path('category/edit/<int:pk>', views.CategoryEditView.as_view(), name='category_edit_form'),
-    path('category/delete/<int:pk>', views.CategoryDeleteView.as_view(), name='category_delete_form'),
-    path('articles/', views.ArticleList.as_view(), name='article_list'),
-    path('articles/<str:state>', views.ArticleList.as_view(), name='article_list_with_state'),
-    path('article/create/new', views.ArticleCreateView.as_view(), name='article_create_form'),
-    path('article/edit/<int:pk>', views.ArticleEditView.as_view(), name='article_edit_form'),
-    path('article/delete/<int:pk>', views.ArticleDeleteView.as_view(), name='article_delete_form'),
-    path('accounts/', include('django.contrib.auth.urls')),
 
-]
+urlpatterns = get_urlpatterns()
@@ -1,18 +1,141 @@
 import copy
 import datetime
+import hashlib
+import io
+import itertools
+import json
+import time
 import urllib
+from collections import defaultdict
 from operator import itemgetter
 
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import Http404
-from django.utils.http import urlencode
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models import Case, Count, Value, When
+from django.http import Http404, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+from django.utils.http import url_has_allowed_host_and_scheme, urlencode
 from django.views import generic
 from django.urls import reverse_lazy, reverse
 
+from .categories import delete_category
+from .events import EVENT_FIELDS, get_event_fields, get_last_event_id
+from .models import ApiToken
 from .models import Article
+from .models import ArticleEvent
+from .models import ArticleListVersion
 from .models import Category
-from .forms import ArticleCreateForm, ArticleEditForm
-from .forms import CategoryCreateForm, CategoryEditForm
+from .pagination import KeysetPaginator
+from .ranking import get_next_ranks, move_article
+from .registry import category_registry
+from .templatetags.only_days import nice_timesince_batch
+from .forms import ArticleBulkActionForm, ArticleCreateForm, ArticleEditForm, ArticleImportForm
+from .importers import guess_format, import_articles
+from .exporters import CONTENT_TYPES, FORMATS as EXPORT_FORMATS
+from .exporters import export_articles, get_export_filename
+from .forms import CategoryCreateForm, CategoryDeleteForm, CategoryEditForm
+
+
+def _get_list_version_row(request):
+    """
+    Return (version, changed_time, category_token) of ArticleListVersion for
+    request user, creating it if needed so the first response, eg. to an API
+    only client, can already be validated.  Result is remembered on request so
+    the ETag, Last-Modified, cache keys and category registry only make one
+    query between them.
+    """
+    if not hasattr(request, '_readlater_list_version'):
+        list_version = ArticleListVersion.objects.filter(user=request.user).values_list(
+            'version', 'changed_time', 'category_token').first()
+        if list_version is None:
+            created = ArticleListVersion.get_for_user(request.user)
+            list_version = (created.version, created.changed_time, created.category_token)
+        request._readlater_list_version = list_version
+    return request._readlater_list_version
+
+
+def _get_list_version(request):
+    """
+    Return (version, changed_time, category_token) of ArticleListVersion for
+    request user for conditional GET, or None while messages are waiting to be
+    shown, as a 304 would leave them for some later page.
+    """
+    if len(messages.get_messages(request)):
+        return None
+    return _get_list_version_row(request)
+
+
+def _get_category_token(request):
+    """Return request user's category registry token."""
+    return _get_list_version_row(request)[2]
+
+
+def list_version_etag(request, *args, **kwargs):
+    """
+    ETag for pages showing the request user's articles or categories.
+
+    Includes a time bucket matching the rendered table cache timeout so the
+    relative times shown for articles are refreshed, and a hash of the CSRF
+    cookie so pages holding a token from before logging in again are not kept.
+    """
+    list_version = _get_list_version(request)
+    if list_version is None:
+        return None
+    bucket = int(time.time() // ArticleList.table_cache_timeout)
+    csrf = hashlib.sha1(request.META.get('CSRF_COOKIE', '').encode()).hexdigest()[:8]
+    return f'{request.user.pk}-{list_version[0]}-{bucket}-{csrf}'
+
+
+def list_version_last_modified(request, *args, **kwargs):
+    """
+    Last-Modified for JSON responses of the request user's articles or
+    categories.  Not used for HTML pages, whose relative times and CSRF token
+    change without the list changing.
+    """
+    list_version = _get_list_version(request)
+    if list_version is None:
+        return None
+    return list_version[1]
+
+
+# answer conditional GET of HTML pages with 304 without rendering anything
+list_version_condition = method_decorator(condition(etag_func=list_version_etag), name='get')
+
+
+class OwnedObjectMixin:
+    """
+    For use with detail, update and delete class views of records with a
+    'created_by' owner.
+
+    The object is fetched with a single query the first time it is needed
+    and reused for the rest of the request.  Missing objects give 404 and
+    objects owned by another user give 403, both without a second query.
+    """
+    # relations fetched in the same query as the object
+    object_select_related = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.object_select_related:
+            queryset = queryset.select_related(*self.object_select_related)
+        return queryset
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_owned_object'):
+            obj = super().get_object()
+            if obj.created_by_id != self.request.user.id:
+                raise PermissionDenied
+            self._owned_object = obj
+        return self._owned_object
 
 
 class SortUserCategorySelectionMixin:
@@ -24,16 +147,22 @@ class SortUserCategorySelectionMixin:
     def get_form(self, form_class=None):
         """limit category choices to those defined by request user"""
         form = super().get_form(form_class)
-        form.fields['category'].queryset = Category.objects.filter(
-            created_by=self.request.user).order_by('name')
+        field = form.fields['category']
+        # queryset validates the submitted choice, the options shown come
+        # from the registry so rendering the form needs no query
+        field.queryset = Category.objects.filter(created_by=self.request.user)
+        field.choices = [('', field.empty_label)] + [
+            (categ.pk, '\u2014 ' * categ.depth + categ.name)
+            for categ in category_registry.get_categories(
+                self.request.user.pk, _get_category_token(self.request))]
         return form
 
 
-class ArticleList(LoginRequiredMixin, generic.ListView):
-    """ Show unfinished articles """
-    model = Article
-    context_object_name = 'article_list'
-
+class ArticleQueryMixin:
+    """
+    Ownership, read state, filter and ordering rules for listing the request
+    user's articles, shared by the HTML list and the JSON API.
+    """
     # default field to order by if no valid no given
     _order_field = 'priority'
 
@@ -45,6 +174,9 @@ class ArticleList(LoginRequiredMixin, generic.ListView):
         '-progress', 'priority', 'updated_time', '-added_time', '-category'),
     }
 
+    # map priority display label to stored value for filtering
+    _priority_values = {name: value for value, name in Article.PRIORITY_CHOICES}
+
     @staticmethod
     def _clean_order_col(order_col):
         """ Remove any ordering punctuation from a order column specification"""
@@ -75,6 +207,77 @@ class ArticleList(LoginRequiredMixin, generic.ListView):
 
         return order_col
 
+    def _get_filter_via_url(self, name):
+        """
+        Return value of filter query parameter or None if not given.
+
+        :param name: Query parameter name (ie. 'filter_category').
+        :type name: str
+        :return: Filter value or None.
+        :rtype: str
+        """
+        return self.request.GET.get(name, None) or None
+
+    def _get_order_hier(self):
+        """Return tuple of fields to order list of articles by."""
+        order_col = self._get_order_col_via_url(clean=False)
+
+        # find secondary ordering priorities if any
+        return self._order_hier.get(self._clean_order_col(order_col),
+                                    (order_col,))
+
+    def _get_state_queryset(self):
+        """Return queryset of request user's articles for read or unread state."""
+        if self.kwargs.get('state') == 'read':
+            return self.model.objects.filter(progress=100, created_by=self.request.user)
+        else:
+            return self.model.objects.filter(progress__lt=100, created_by=self.request.user)
+
+    def _filter_queryset(self, queryset):
+        """Apply category and priority filters from query parameters to queryset."""
+        filter_category = self._get_filter_via_url('filter_category')
+        if filter_category is not None:
+            # articles in the category and all its descendants are one range
+            # of the category path index
+            paths = category_registry.get_paths(self.request.user.pk, filter_category,
+                                                _get_category_token(self.request))
+            queryset = queryset.filter(Category.subtree_q(paths, prefix='category__'))
+
+        filter_priority = self._get_filter_via_url('filter_priority')
+        if filter_priority is not None:
+            priority = self._priority_values.get(filter_priority)
+            if priority is None:
+                return queryset.none()
+            queryset = queryset.filter(priority=priority)
+        return queryset
+
+
+@list_version_condition
+class ArticleList(LoginRequiredMixin, ArticleQueryMixin, generic.ListView):
+    """ Show unfinished articles """
+    model = Article
+    context_object_name = 'article_list'
+
+    # number of articles per page, pages are selected with an opaque 'cursor'
+    # query parameter rather than a page number
+    paginate_by = 50
+
+    # template rendering the table of articles which is cached per user
+    table_template_name = 'readlater/article_table.html'
+
+    # seconds to keep rendered table in cache, this bounds how out of date the
+    # relative times shown for each article can be
+    table_cache_timeout = getattr(settings, 'READLATER_TABLE_CACHE_TIMEOUT', 60)
+
+    # template rendering the rows of the table of articles
+    rows_template_name = 'readlater/article_table_rows.html'
+
+    # number of articles fetched and rendered at a time when streaming
+    stream_chunk_size = 500
+
+    # placeholder in rendered page where streamed rows are inserted
+    _stream_rows_marker = mark_safe('<!-- readlater stream rows -->')
+
     def get(self, request, *args, **kwargs):
         """Reject invalid state request (read or unread only allowed)."""
         state = kwargs.get('state')
@@ -84,60 +287,208 @@ class ArticleList(LoginRequiredMixin, generic.ListView):
 
         return super().get(self, request, *args, **kwargs)
 
+    def _is_streaming(self):
+        """
+        Return True if all articles should be streamed as they are rendered
+        instead of showing a single page.
+        """
+        return self.request.GET.get('show') == 'all'
+
+    def _get_facet_counts(self, categories, filter_category, filter_priority):
+        """
+        Count articles for each category and priority filter option.
+
+        Counts for one filter take the selection in the other filter into account.
+        All counts come from a single query grouped by category and priority.
+
+        :param categories: Request user's categories.
+        :type categories: list
+        :param filter_category: Selected category name or None.
+        :type filter_category: str
+        :param filter_priority: Selected priority name or None.
+        :type filter_priority: str
+        :return: Tuple of dicts (category id -> count, priority value -> count).
+        :rtype: tuple
+        """
+        # a category filter includes articles in its descendants
+        selected_ids = {categ.id for categ in categories if categ.name == filter_category}
+        filter_category_ids = {categ.id for categ in categories
+                               if selected_ids.intersection(categ.ancestor_ids + [categ.id])}
+        filter_priority_value = self._priority_values.get(filter_priority)
+
+        category_counts = defaultdict(int)
+        priority_counts = defaultdict(int)
+        groups = self._get_state_queryset().order_by().values(
+            'category', 'priority').annotate(count=Count('id'))
+        for group in groups:
+            if filter_priority is None or group['priority'] == filter_priority_value:
+                category_counts[group['category']] += group['count']
+            if filter_category is None or group['category'] in filter_category_ids:
+                priority_counts[group['priority']] += group['count']
+        return category_counts, priority_counts
+
+    def _get_cache_key(self, name, *parts):
+        """
+        Return cache key for request user which changes whenever any of the
+        user's articles or categories change.
+        """
+        digest = hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()
+        return f'readlater.{name}.{self.request.user.pk}.{self._list_version}.{digest}'
+
     def get_queryset(self):
         """Create queryset based on possible query arguments."""
-        order_col = self._get_order_col_via_url(clean=False)
+        order_hier = self._get_order_hier()
+        # category name is shown for each row so fetch it in the same query
+        queryset = self._get_state_queryset().select_related('category')
 
-        # find secondary ordering priorities if any
-        order_hier = self._order_hier.get(self._clean_order_col(order_col),
-                                          (order_col,))
-        if self.kwargs.get('state') == 'read':
-            return self.model.objects.filter(progress=100,
-                                             created_by=self.request.user).order_by(
-                *order_hier)
-        else:
-            return self.model.objects.filter(progress__lt=100,
-                                             created_by=self.request.user).order_by(
-                *order_hier)
+        # apply category and priority filters in the database rather than
+        # dropping rows in the template
+        queryset = self._filter_queryset(queryset)
+
+        return queryset.order_by(*order_hier)
+
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate using keyset cursors so deep pages need no OFFSET or COUNT."""
+        paginator = KeysetPaginator(queryset, self._get_order_hier(), page_size)
+        page = paginator.page(self.request.GET.get('cursor'))
+
+        self._add_time_since(page.object_list)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_paginate_by(self, queryset):
+        """Do not paginate when streaming all articles."""
+        if self._is_streaming():
+            return None
+        return super().get_paginate_by(queryset)
+
+    def _add_time_since(self, articles):
+        """
+        Compute time since strings for each time column of articles in one pass
+        using a single 'now' for the whole request.
+        """
+        if not hasattr(self, '_now'):
+            self._now = timezone.now()
+        for column in ('updated_time', 'added_time', 'finished_time'):
+            since = nice_timesince_batch([getattr(a, column) for a in articles], self._now)
+            for article, value in zip(articles, since):
+                setattr(article, f'{column}_since', value)
+
+    def _stream_rows(self, context):
+        """Yield rendered table rows for all articles a chunk at a time."""
+        template = get_template(self.rows_template_name)
+        rows_context = {'state': context['state'], 'current_url': context['current_url']}
+        chunk = []
+        for article in self.object_list.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(article)
+            if len(chunk) == self.stream_chunk_size:
+                self._add_time_since(chunk)
+                yield template.render(dict(rows_context, article_list=chunk), self.request)
+                chunk = []
+        if chunk:
+            self._add_time_since(chunk)
+            yield template.render(dict(rows_context, article_list=chunk), self.request)
+
+    def render_to_response(self, context, **response_kwargs):
+        """
+        When streaming send the page up to the table rows right away, then the
+        rows as they are fetched and rendered, then the rest of the page.
+        """
+        if not self._is_streaming():
+            return super().render_to_response(context, **response_kwargs)
+
+        page = render_to_string(self.get_template_names(), context, self.request)
+        head, tail = page.split(self._stream_rows_marker, 1)
+        return StreamingHttpResponse(
+            itertools.chain((head,), self._stream_rows(context), (tail,)),
+            **response_kwargs)
 
     def get_context_data(self, *, object_list=None, **kwargs):
         """Add required parameters to context."""
+        self._list_version = _get_list_version_row(self.request)[0]
+
+        # full path covers state, ordering, filters and page cursor
+        streaming = self._is_streaming()
+        table_key = self._get_cache_key('article_table', self.request.get_full_path())
+        article_table = None if streaming else cache.get(table_key)
+        if article_table is not None:
+            # table is already rendered so skip fetching the articles
+            object_list = self.object_list.none()
+
         # Call the base implementation first to get a context
-        context = super().get_context_data(**kwargs)
+        context = super().get_context_data(object_list=object_list, **kwargs)
 
         # if state is not defined then default to unread listing
         context['state'] = self.kwargs.get('state') or 'unread'
+        # changes after this are sent to the page as events
+        context['last_event_id'] = get_last_event_id(self.request.user.pk)
 
         # see if any list ordering specified
         context['order_col'] = self._get_order_col_via_url()
-        filter_category = self.request.GET.get('filter_category', None)
-        if not filter_category:
-            filter_category = None
+        filter_category = self._get_filter_via_url('filter_category')
         context['filter_category'] = filter_category
-        context['categories'] = Category.objects.filter(created_by=self.request.user).order_by('name')
+        categories = category_registry.get_categories(self.request.user.pk,
+                                                      _get_category_token(self.request))
 
-        filter_priority = self.request.GET.get('filter_priority', None)
-        if not filter_priority:
-            filter_priority = None
+        filter_priority = self._get_filter_via_url('filter_priority')
         context['filter_priority'] = filter_priority
 
+        # number of matching articles shown next to each filter option
+        facet_key = self._get_cache_key('article_facets', context['state'],
+                                        filter_category, filter_priority)
+        facet_counts = cache.get(facet_key)
+        if facet_counts is None:
+            facet_counts = self._get_facet_counts(categories, filter_category,
+                                                  filter_priority)
+            cache.set(facet_key, facet_counts, None)
+        category_counts, priority_counts = facet_counts
+        # count for a category includes the articles of its descendants
+        for categ in categories:
+            categ.article_count = 0
+        categories_by_id = {categ.id: categ for categ in categories}
+        for categ in categories:
+            for pk in categ.ancestor_ids + [categ.id]:
+                if pk in categories_by_id:
+                    categories_by_id[pk].article_count += category_counts[categ.id]
+            categ.indent = '\u2014 ' * categ.depth
+        context['categories'] = categories
+        context['category_all_count'] = sum(category_counts.values())
+        context['priority_all_count'] = sum(priority_counts.values())
+
         # pull out display values for choices for priority and filter out
         # any like '-------' and sort from highest to lower priority
         # HIGHEST priority corresponds to LOWEST priority value
         priority_choices = [(a,b) for a,b in Article.priority.field.get_choices() if isinstance(a, int)]
         priority_choices.sort(key=itemgetter(0))
-        context['priorities'] = [b for (a, b) in priority_choices]
+        context['priority_counts'] = [(b, priority_counts[a]) for (a, b) in priority_choices]
 
         # pass all query params but orderby
         query_params = copy.deepcopy(self.request.GET)
         context['full_query_params'] = query_params
-        exclude_params = ['orderby']
+        exclude_params = ['orderby', 'cursor']
         for exclude in exclude_params:
             if exclude in query_params:
                 del query_params[exclude]
         context['filter_query_params'] = query_params
 
+        # pass all query params but cursor for the page navigation links
+        page_query_params = copy.deepcopy(self.request.GET)
+        if 'cursor' in page_query_params:
+            del page_query_params['cursor']
+        context['page_query_params'] = page_query_params
+
         context['current_url'] = self.request.get_full_path()
+        context['priority_choices'] = priority_choices
+
+        if streaming:
+            # rows are rendered as they are streamed
+            context['stream_rows_marker'] = self._stream_rows_marker
+            article_table = render_to_string(self.table_template_name, context,
+                                             self.request)
+        elif article_table is None:
+            article_table = render_to_string(self.table_template_name, context,
+                                             self.request)
+            cache.set(table_key, article_table, self.table_cache_timeout)
+        context['article_table'] = article_table
         return context
 
 
@@ -147,14 +498,21 @@ class ArticleCreateView(LoginRequiredMixin, SortUserCategorySelectionMixin,
     form_class = ArticleCreateForm
     template_name_suffix = '_create_form'
 
+    def get_form_kwargs(self):
+        # owner is needed to validate the name and URL are not already used
+        kwargs = super().get_form_kwargs()
+        kwargs['instance'] = Article(created_by=self.request.user)
+        return kwargs
+
     def get_initial(self):
         initial = super().get_initial()
         initial['next'] = self.request.GET.get('next')
         cur_categ_name = self.request.GET.get('filter_category')
         if cur_categ_name:
-            categ = Category.objects.get(name=cur_categ_name)
-            if categ:
-                initial['category'] = categ.id
+            categ_id = category_registry.get_id(self.request.user.pk, cur_categ_name,
+                                                _get_category_token(self.request))
+            if categ_id is not None:
+                initial['category'] = categ_id
         cur_priority_name = self.request.GET.get('filter_priority')
         if cur_priority_name:
             for value, name in Article.priority.field.get_choices():
@@ -165,8 +523,13 @@ class ArticleCreateView(LoginRequiredMixin, SortUserCategorySelectionMixin,
 
     def form_valid(self, form):
         form.instance.created_by = self.request.user
+        # after any imported articles whose ranks run ahead of the clock
+        form.instance.rank = get_next_ranks(self.request.user.id, 1)[0]
         self.success_url = form.cleaned_data.get('next')
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        ArticleEvent.publish(self.request.user.id, [self.object.pk], ArticleEvent.ACTION_CREATED,
+                             get_event_fields(self.object))
+        return response
 
     def get_success_url(self):
         # make sure we go back to page that we were called from
@@ -177,15 +540,12 @@ class ArticleCreateView(LoginRequiredMixin, SortUserCategorySelectionMixin,
             return reverse('article_list')
 
 
-class ArticleEditView(LoginRequiredMixin, UserPassesTestMixin,
+class ArticleEditView(LoginRequiredMixin, OwnedObjectMixin,
                       SortUserCategorySelectionMixin, generic.UpdateView):
     model = Article
     form_class = ArticleEditForm
     template_name_suffix = '_edit_form'
-
-    def test_func(self):
-        obj = self.get_object()
-        return obj.created_by == self.request.user
+    object_select_related = ('category',)
 
     def get_initial(self):
         initial = super().get_initial()
@@ -201,8 +561,17 @@ class ArticleEditView(LoginRequiredMixin, UserPassesTestMixin,
                 tz=datetime.timezone.utc)
         else:
             self.object.finished_time = None
+        if 'url' in form.changed_data:
+            # fetched again for the new url by fetch_article_metadata
+            self.object.page_title = self.object.canonical_url = self.object.metadata_error = ''
+            self.object.word_count = self.object.reading_time = self.object.metadata_time = None
         self.success_url = form.cleaned_data.get('next')
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        changed = [name for name in EVENT_FIELDS
+                   if name in form.changed_data or name in ('updated_time', 'finished_time')]
+        ArticleEvent.publish(self.request.user.id, [self.object.pk], ArticleEvent.ACTION_CHANGED,
+                             get_event_fields(self.object, changed))
+        return response
 
     def get_success_url(self):
         # make sure we go back to page that we were called from
@@ -214,17 +583,226 @@ class ArticleEditView(LoginRequiredMixin, UserPassesTestMixin,
             return reverse('article_list_with_state', kwargs={'state': state})
 
 
-class ArticleDeleteView(LoginRequiredMixin, UserPassesTestMixin, generic.DeleteView):
+class ArticleProgressView(LoginRequiredMixin, generic.View):
+    """
+    Set reading progress of an article without rendering any form or page.
+
+    Accepts 'progress' as a form field or in a JSON body and answers with the
+    new progress and timestamps as JSON.  Timestamps follow the same rules as
+    ArticleEditView.form_valid.  The article is changed with a single UPDATE
+    restricted to the request user's articles.
+    """
+    http_method_names = ['post']
+    # answer 403 instead of redirecting API clients to the login page
+    raise_exception = True
+
+    def _get_progress(self, request):
+        """Return progress from request or None if missing or invalid."""
+        if request.content_type == 'application/json':
+            try:
+                progress = json.loads(request.body).get('progress')
+            except (ValueError, AttributeError):
+                return None
+        else:
+            progress = request.POST.get('progress')
+        try:
+            progress = int(progress)
+        except (TypeError, ValueError):
+            return None
+        return progress if 0 <= progress <= 100 else None
+
+    def post(self, request, pk, *args, **kwargs):
+        progress = self._get_progress(request)
+        if progress is None:
+            return JsonResponse({'error': 'progress must be an integer from 0 to 100'},
+                                status=400)
+
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        finished_time = now if progress == 100 else None
+        updated = Article.objects.filter(pk=pk, created_by=request.user).update(
+            progress=progress, updated_time=now, finished_time=finished_time)
+        if not updated:
+            return JsonResponse({'error': 'article not found'}, status=404)
+
+        # update does not send signals
+        ArticleListVersion.bump(request.user.id)
+        ArticleEvent.publish(request.user.id, [pk], ArticleEvent.ACTION_CHANGED, get_event_fields(
+            Article(progress=progress, updated_time=now, finished_time=finished_time),
+            ('progress', 'updated_time', 'finished_time')))
+        return JsonResponse({'id': pk, 'progress': progress, 'updated_time': now,
+                             'finished_time': finished_time})
+
+
+class ArticleMoveView(LoginRequiredMixin, generic.View):
+    """
+    Move an article in the manually ordered (orderby=rank) list.
+
+    Accepts 'after' or 'before' holding the id of the article to place it
+    next to, with neither the article is moved to the top.  Only the moved
+    article's rank is written, see readlater.ranking.  Answers with the new
+    rank as JSON.
+    """
+    http_method_names = ['post']
+    # answer 403 instead of redirecting API clients to the login page
+    raise_exception = True
+
+    def post(self, request, pk, *args, **kwargs):
+        targets = {}
+        for name in ('after', 'before'):
+            value = request.POST.get(name)
+            if value:
+                try:
+                    targets[name] = int(value)
+                except ValueError:
+                    return JsonResponse({'error': f'{name} must be an article id'}, status=400)
+        if len(targets) > 1:
+            return JsonResponse({'error': 'give only one of after or before'}, status=400)
+
+        # fetch moved article and target together
+        articles = Article.objects.filter(created_by=request.user,
+                                          pk__in=[pk, *targets.values()]).only(
+            'id', 'rank', 'created_by')
+        articles = {article.pk: article for article in articles}
+        if pk not in articles or any(t not in articles for t in targets.values()):
+            return JsonResponse({'error': 'article not found'}, status=404)
+        if pk in targets.values():
+            return JsonResponse({'error': 'cannot move an article next to itself'}, status=400)
+
+        move_article(articles[pk], **{name: articles[t] for name, t in targets.items()})
+        rank = articles[pk].rank
+
+        # update does not send signals
+        ArticleListVersion.bump(request.user.id)
+        ArticleEvent.publish(request.user.id, [pk], ArticleEvent.ACTION_CHANGED, {'rank': rank})
+        return JsonResponse({'id': pk, 'rank': rank})
+
+
+class ArticleImportView(LoginRequiredMixin, generic.FormView):
+    """Import articles from an uploaded file of bookmarks."""
+    form_class = ArticleImportForm
+    template_name = 'readlater/article_import_form.html'
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        file_format = form.cleaned_data['format'] or guess_format(upload.name)
+        if file_format is None:
+            form.add_error('format', 'Cannot guess format from file name, please select one.')
+            return self.form_invalid(form)
+
+        # uploads are read from the temporary file a chunk at a time
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8', errors='replace',
+                                  newline='')
+        result = import_articles(self.request.user, stream, file_format)
+        if result.created:
+            # too many to send one at a time
+            ArticleEvent.publish(self.request.user.id, [None], ArticleEvent.ACTION_RELOAD)
+        return self.render_to_response(self.get_context_data(form=form, result=result))
+
+
+class ArticleExportView(LoginRequiredMixin, generic.View):
+    """
+    Download the request user's categories and articles.
+
+    Query parameters are 'format' (one of exporters.FORMATS, default 'csv')
+    and 'gzip' (compress when '1').  The export is streamed while it is read
+    from the database.
+    """
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            raise Http404(f'Unknown export format "{file_format}"')
+        compress = request.GET.get('gzip') == '1'
+
+        response = StreamingHttpResponse(
+            export_articles(request.user, file_format, compress=compress),
+            content_type='application/gzip' if compress else CONTENT_TYPES[file_format])
+        filename = get_export_filename(request.user, file_format, compress=compress)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ArticleBulkActionView(LoginRequiredMixin, generic.FormView):
+    """
+    Apply an action to the articles selected in the article list.
+
+    Each action is a single UPDATE or DELETE restricted to the request user's
+    articles, so ids of other users' articles are ignored.  Timestamps follow
+    the same rules as ArticleEditView.form_valid.
+    """
+    form_class = ArticleBulkActionForm
+    http_method_names = ['post']
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def _redirect(self, form):
+        next_url = form.data.get('next')
+        if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={self.request.get_host()}):
+            next_url = reverse('article_list')
+        return HttpResponseRedirect(next_url)
+
+    def form_valid(self, form):
+        action = form.cleaned_data['action']
+        queryset = Article.objects.filter(created_by=self.request.user,
+                                          pk__in=form.cleaned_data['articles'])
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        # saving an article always sets updated time and sets or clears
+        # finished time depending on progress
+        finished_time = Case(When(progress=100, then=Value(now)), default=Value(None))
+
+        event = ArticleEvent.ACTION_CHANGED
+        if action == ArticleBulkActionForm.ACTION_DELETE:
+            # nothing references articles, so delete with one DELETE rather
+            # than loading each article for its post_delete signal, the
+            # version bump and event below do the signal's work once
+            count = queryset._raw_delete(queryset.db)
+            verb = 'Deleted'
+            event, event_fields = ArticleEvent.ACTION_DELETED, {}
+        elif action == ArticleBulkActionForm.ACTION_MARK_READ:
+            count = queryset.update(progress=100, updated_time=now, finished_time=now)
+            verb = 'Marked read'
+            event_fields = get_event_fields(
+                Article(progress=100, updated_time=now, finished_time=now),
+                ('progress', 'updated_time', 'finished_time'))
+        elif action == ArticleBulkActionForm.ACTION_SET_PRIORITY:
+            count = queryset.update(priority=form.cleaned_data['priority'],
+                                    updated_time=now, finished_time=finished_time)
+            verb = 'Changed priority of'
+            event_fields = get_event_fields(
+                Article(priority=form.cleaned_data['priority'], updated_time=now),
+                ('priority', 'updated_time'))
+        else:
+            count = queryset.update(category=form.cleaned_data['category'],
+                                    updated_time=now, finished_time=finished_time)
+            verb = 'Moved'
+            event_fields = get_event_fields(
+                Article(category=form.cleaned_data['category'], updated_time=now),
+                ('category', 'updated_time'))
+
+        # set based changes do not send signals
+        if count:
+            ArticleListVersion.bump(self.request.user.id)
+            # selected ids which are not the user's articles match no rows in
+            # the user's lists
+            ArticleEvent.publish(self.request.user.id, form.cleaned_data['articles'], event,
+                                 event_fields)
+        messages.success(self.request, f'{verb} {count} article{"s" if count != 1 else ""}.')
+        return self._redirect(form)
+
+    def form_invalid(self, form):
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(self.request, error)
+        return self._redirect(form)
+
+
+class ArticleDeleteView(LoginRequiredMixin, OwnedObjectMixin, generic.DeleteView):
     model = Article
     success_url = reverse_lazy('article_list')
     template_name_suffix = '_delete_form'
-
-    def test_func(self):
-        obj = self.get_object()
-        return obj.created_by == self.request.user
-
-    def get_queryset(self):
-        return super().get_queryset().filter(created_by=self.request.user)
+    object_select_related = ('category',)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
@@ -233,7 +811,11 @@ class ArticleDeleteView(LoginRequiredMixin, UserPassesTestMixin, generic.DeleteV
 
     def post(self, request, *args, **kwargs):
         self.success_url = request.POST.get('next')
-        return super().post(request, *args, **kwargs)
+        # fetched once for the owner check and kept, unlike its id, after deleting
+        article_id = self.get_object().pk
+        response = super().post(request, *args, **kwargs)
+        ArticleEvent.publish(request.user.id, [article_id], ArticleEvent.ACTION_DELETED)
+        return response
 
     def get_success_url(self):
         # make sure we go back to page that we were called from
@@ -245,6 +827,7 @@ class ArticleDeleteView(LoginRequiredMixin, UserPassesTestMixin, generic.DeleteV
             return reverse('article_list_with_state', kwargs={'state': state})
 
 
+@list_version_condition
 class SettingsView(LoginRequiredMixin, generic.base.TemplateView):
     template_name = 'readlater/settings_base.html'
 
@@ -252,12 +835,22 @@ class SettingsView(LoginRequiredMixin, generic.base.TemplateView):
         # Call the base implementation first to get a context
         context = super().get_context_data(**kwargs)
 
-        # if state is not defined then default to unread listing
-        context['category_list'] = Category.objects.all().order_by('name').filter(
-            created_by=self.request.user)
+        # categories are listed with each followed by its sub-categories
+        category_list = category_registry.get_categories(self.request.user.pk,
+                                                         _get_category_token(self.request))
+        for category in category_list:
+            category.indent = '\u2014 ' * category.depth
+        context['category_list'] = category_list
 
         return context
 
+    def post(self, request, *args, **kwargs):
+        """Create a new quick-add token, shown only in this response."""
+        context = self.get_context_data(api_token=ApiToken.create_for_user(request.user))
+        response = self.render_to_response(context)
+        response['Cache-Control'] = 'no-store'
+        return response
+
 
 class CategoryCreateView(LoginRequiredMixin, generic.CreateView):
     model = Category
@@ -265,30 +858,44 @@ class CategoryCreateView(LoginRequiredMixin, generic.CreateView):
     success_url = reverse_lazy('settings')
     template_name_suffix = '_create_form'
 
+    def get_form_kwargs(self):
+        # owner is needed to restrict the parent choices
+        kwargs = super().get_form_kwargs()
+        kwargs['instance'] = Category(created_by=self.request.user)
+        return kwargs
+
     def form_valid(self, form):
         form.instance.created_by = self.request.user
         return super().form_valid(form)
 
 
-class CategoryEditView(LoginRequiredMixin, UserPassesTestMixin, generic.UpdateView):
+class CategoryEditView(LoginRequiredMixin, OwnedObjectMixin, generic.UpdateView):
     model = Category
     form_class = CategoryEditForm
     success_url = reverse_lazy('settings')
     template_name_suffix = '_edit_form'
 
-    def test_func(self):
-        obj = self.get_object()
-        return obj.created_by == self.request.user
-
 
-class CategoryDeleteView(LoginRequiredMixin, UserPassesTestMixin,
-                         generic.DeleteView):
+class CategoryDeleteView(LoginRequiredMixin, OwnedObjectMixin, generic.DeleteView):
+    """
+    Delete a category, moving its articles to another category or
+    Uncategorized.  The category is hidden straight away and its articles are
+    moved in the background so large categories do not hold up the request.
+    """
     model = Category
     success_url = reverse_lazy('settings')
     error_url = reverse_lazy('category_delete_failed.html')
 
     template_name_suffix = '_delete_form'
 
-    def test_func(self):
-        obj = self.get_object()
-        return obj.created_by == self.request.user
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('form', CategoryDeleteForm(category=self.object))
+        return super().get_context_data(**kwargs)
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        form = CategoryDeleteForm(request.POST, category=self.object)
+        if not form.is_valid():
+            return self.render_to_response(self.get_context_data(form=form))
+        delete_category(self.object, form.cleaned_data['reassign_to'])
+        return HttpResponseRedirect(self.get_success_url())
@@ -3,14 +3,30 @@ ASGI config for readlater_django project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving with ASGI uses async versions of the article list, progress update,
+API read and article events views and leaves out the synchronous WhiteNoise middleware, see
+READLATER_SERVER in settings.py.  Streamed responses are read in a worker
+thread and collected static files are served with WhiteNoise, see
+readlater/asgi_handler.py.  Run with an ASGI worker, eg.
+
+    gunicorn readlater_django.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+
+from readlater.asgi_handler import StaticRootASGIHandler, StreamingASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'readlater_django.settings')
+os.environ.setdefault('READLATER_SERVER', 'asgi')
 
-application = get_asgi_application()
+# as get_asgi_application() with StreamingASGIHandler
+django.setup(set_prefix=False)
+# static files without the WhiteNoise middleware, files which have not been
+# collected, eg. in development, are found by the staticfiles finders
+application = StaticRootASGIHandler(ASGIStaticFilesHandler(StreamingASGIHandler()))
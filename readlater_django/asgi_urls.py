@@ -0,0 +1,15 @@
+"""
+URL configuration used when serving with ASGI, see readlater_django/asgi.py.
+
+Same as readlater_django/urls.py except the article list, progress update,
+API read and article events paths use async views.
+"""
+from django.contrib import admin
+from django.urls import path, include
+from readlater.urls import get_urlpatterns
+from readlater_django.utils import load_env
+
+urlpatterns = [
+    path('readlater/', include(get_urlpatterns(async_views=True))),
+    path(load_env('ADMIN_SECRET_URL'), admin.site.urls),
+]
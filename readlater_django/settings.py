@@ -67,6 +67,16 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'readlater_django.urls'
 
+# 'wsgi' or 'asgi', readlater_django/asgi.py sets 'asgi' before settings are loaded
+READLATER_SERVER = load_env('READLATER_SERVER', default='wsgi', enforce=False)
+if READLATER_SERVER == 'asgi':
+    # WhiteNoise middleware is synchronous so under ASGI it would put every
+    # request through Django's single thread for synchronous code, static
+    # files are served by asgi.py instead
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+    # async versions of the busiest views
+    ROOT_URLCONF = 'readlater_django.asgi_urls'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -109,6 +119,11 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# how background work such as moving articles of deleted categories is run,
+# one of 'thread', 'sync' or 'command' (see readlater/tasks.py)
+READLATER_BACKGROUND_TASKS = load_env('READLATER_BACKGROUND_TASKS', default='thread',
+                                      enforce=False)
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
 